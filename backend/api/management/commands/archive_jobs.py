@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.job_storage import archive_jobs
+
+class Command(BaseCommand):
+    help = 'Move jobs older than JOB_ARCHIVE_AFTER_DAYS from the live catalog into the job archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'JOB_ARCHIVE_AFTER_DAYS', 90),
+            help='Archive jobs posted more than this many days ago'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+
+        created_before = datetime.now() - timedelta(days=options['days'])
+        archived = archive_jobs(created_before=created_before)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {len(archived)} jobs posted before {created_before.date().isoformat()}.'
+        ))
@@ -0,0 +1,102 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.job_samples import generate_jobs
+from api.utils.job_snapshot import write_binary_snapshot
+
+# Loads one file in a fresh interpreter and prints the load time and the
+# memory it added, so every measurement is a cold start
+LOAD_SCRIPT = '''
+import json, resource, sys, time
+
+def status_kb(field):
+    # ru_maxrss would include the parent's peak, which survives exec on Linux
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def rss_kb():
+    return status_kb('VmRSS')
+
+from api.utils.job_snapshot import read_binary_snapshot
+
+fmt, path = sys.argv[1], sys.argv[2]
+before = rss_kb()
+start = time.perf_counter()
+if fmt == 'json':
+    with open(path) as f:
+        data = json.load(f)
+else:
+    data = read_binary_snapshot(path)
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_kb': rss_kb() - before,
+    'peak_kb': status_kb('VmHWM') - before,
+    'jobs': len(data['jobs'])
+}))
+'''
+
+class Command(BaseCommand):
+    help = 'Compare the cold-load time and memory of jobs.json and the binary job snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated catalog sizes')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+
+        self.stdout.write(f'{"jobs":>9}  {"format":<8} {"file MB":>8} {"load s":>8} {"RSS MB":>8} {"peak MB":>8}')
+
+        with tempfile.TemporaryDirectory() as directory:
+            for size in sizes:
+                json_path = os.path.join(directory, 'jobs.json')
+                snapshot_path = os.path.join(directory, 'jobs.snap')
+
+                data = {
+                    "meta": {"total_count": size, "last_updated": datetime.now().isoformat()},
+                    "jobs": generate_jobs(size)
+                }
+                with open(json_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+                write_binary_snapshot(snapshot_path, data)
+
+                # Free the generated catalog before the measured processes start
+                del data
+                gc.collect()
+
+                for fmt, path in (('json', json_path), ('snapshot', snapshot_path)):
+                    result = self.measure(fmt, path)
+                    self.stdout.write(
+                        f'{size:>9}  {fmt:<8} {os.path.getsize(path) / 2**20:>8.1f} '
+                        f'{result["seconds"]:>8.2f} {result["rss_kb"] / 1024:>8.1f} '
+                        f'{result["peak_kb"] / 1024:>8.1f}'
+                    )
+
+    def measure(self, fmt, path):
+        """Load one file in a fresh interpreter and return its measurements"""
+        completed = subprocess.run(
+            [sys.executable, '-c', LOAD_SCRIPT, fmt, path],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True
+        )
+        if completed.returncode != 0:
+            raise CommandError(f'Loading {path} failed:\n{completed.stderr}')
+        return json.loads(completed.stdout)
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Employer
+from api.utils.db_job_backend import DatabaseJobBackend
+from api.utils.job_storage import JOB_FILE_PATH
+
+class Command(BaseCommand):
+    help = 'Copy the jobs stored in data/jobs.json into the api.Job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=str(JOB_FILE_PATH), help='Jobs JSON file to import')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per INSERT statement')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'r') as f:
+                jobs = json.load(f).get('jobs', [])
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+
+        # Jobs can only be stored for employers that still exist
+        employer_ids = set(Employer.objects.values_list('id', flat=True))
+        importable = [job for job in jobs if job.get('employer_id') in employer_ids]
+
+        for job in jobs:
+            if job.get('employer_id') not in employer_ids:
+                self.stderr.write(f'Skipping job {job.get("id")}: employer {job.get("employer_id")} not found')
+
+        written = DatabaseJobBackend().import_jobs(importable, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {written} of {len(jobs)} jobs. Set JOB_STORAGE_BACKEND = "database" to serve them.'
+        ))
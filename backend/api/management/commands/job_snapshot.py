@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.job_engines import atomic_write
+from api.utils.job_snapshot import read_binary_snapshot, write_binary_snapshot
+from api.utils.job_storage import JOB_FILE_PATH
+
+class Command(BaseCommand):
+    help = (
+        'Convert the job catalog between data/jobs.json and the binary snapshot '
+        'read by JOB_STORAGE_ENGINE = "snapshot"'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'direction',
+            choices=['export', 'import'],
+            help='export: write the snapshot from the JSON file. import: write the JSON file from the snapshot.'
+        )
+        parser.add_argument('--json', default=str(JOB_FILE_PATH), help='Jobs JSON file')
+        parser.add_argument('--snapshot', default=str(JOB_FILE_PATH.with_suffix('.snap')), help='Binary snapshot file')
+
+    def handle(self, *args, **options):
+        if options['direction'] == 'export':
+            source, target = options['json'], options['snapshot']
+            try:
+                with open(source, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f'Could not read {source}: {e}')
+
+            write_binary_snapshot(target, data)
+        else:
+            source, target = options['snapshot'], options['json']
+            try:
+                data = read_binary_snapshot(source)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read {source}: {e}')
+
+            atomic_write(target, lambda f: json.dump(data, f, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(data.get("jobs", []))} jobs from {source} to {target}.'
+        ))
@@ -0,0 +1,50 @@
+import gc
+import json
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from api.utils.job_index import JobIndex
+from api.utils.job_records import JobRecord
+from api.utils.job_samples import generate_jobs
+
+class Command(BaseCommand):
+    help = 'Measure with tracemalloc the memory held by the cached job catalog as dicts and as JobRecords'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100000, help='Number of synthetic jobs')
+
+    def handle(self, *args, **options):
+        count = options['jobs']
+        # Parse from text like a real load, so no strings are shared by accident
+        text = json.dumps(generate_jobs(count))
+
+        dicts = self.measure(lambda: {job["id"]: job for job in json.loads(text)})
+        records = self.measure(lambda: self.load_records(text))
+        index = self.measure(lambda: JobIndex(json.loads(text)), keep=lambda index: index)
+
+        self.stdout.write(f'{count} jobs')
+        for label, size in (('dicts', dicts), ('records', records), ('index', index)):
+            self.stdout.write(f'  {label:<8} {size / 2**20:>8.1f} MB  {size / count:>7.0f} B/job')
+        self.stdout.write(self.style.SUCCESS(f'Records use {dicts / records:.1f}x less memory than dicts'))
+
+    def load_records(self, text):
+        jobs = {job["id"]: job for job in json.loads(text)}
+        for job_id, job in jobs.items():
+            jobs[job_id] = JobRecord(job)
+        return jobs
+
+    def measure(self, build, keep=None):
+        """Return the bytes still allocated by what `build` returns (or `keep` of it)"""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = build()
+            if keep is not None:
+                result = keep(result)
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del result
+        return size
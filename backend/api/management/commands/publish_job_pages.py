@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.job_pages import get_page_publisher
+
+class Command(BaseCommand):
+    help = 'Render the static /api/jobs/ listing pages now, e.g. after deploying or changing JOB_STATIC_PAGES settings'
+
+    def handle(self, *args, **options):
+        publisher = get_page_publisher()
+        if not publisher.enabled():
+            self.stdout.write(self.style.WARNING('Static job pages are disabled (JOB_STATIC_PAGES = 0).'))
+            return
+
+        # Settings may have changed even if the catalog didn't
+        written = publisher.publish(force=True)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} static job page files to {publisher.directory}.'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 05:46
+
+import api.models.job
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_alter_resumeprofileview_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='id',
+            field=models.CharField(default=api.models.job.generate_job_id, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['created_at', 'id'], name='job_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['employer', 'created_at'], name='job_employer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['job_type', 'created_at'], name='job_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['experience_level', 'created_at'], name='job_level_created_idx'),
+        ),
+    ]
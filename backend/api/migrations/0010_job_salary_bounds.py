@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+from api.utils.job_index import parse_salary_range
+
+
+def fill_salary_bounds(apps, schema_editor):
+    """Parse the salary bounds of the jobs that already exist"""
+    Job = apps.get_model('api', 'Job')
+    jobs = list(Job.objects.only('id', 'salary_range'))
+    for job in jobs:
+        job.salary_min, job.salary_max = parse_salary_range(job.salary_range)
+    Job.objects.bulk_update(jobs, ['salary_min', 'salary_max'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_job_uuid_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_max',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['salary_max', 'created_at'], name='job_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['salary_min'], name='job_salary_min_idx'),
+        ),
+        migrations.RunPython(fill_salary_bounds, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,24 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from .employer import Employer
 
+def generate_job_id():
+    """Job IDs are UUID strings so they match the ones stored in jobs.json"""
+    return str(uuid.uuid4())
+
 class Job(models.Model):
+    id = models.CharField(primary_key=True, max_length=36, default=generate_job_id, editable=False)
     title = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
     job_type = models.CharField(max_length=50)  # full-time, part-time, contract, internship, temporary
     experience_level = models.CharField(max_length=50)  # entry, intermediate, senior, executive
     salary_range = models.CharField(max_length=100)
+    # Yearly bounds parsed from salary_range, for salary sorting and filtering
+    salary_min = models.PositiveIntegerField(blank=True, null=True)
+    salary_max = models.PositiveIntegerField(blank=True, null=True)
     description = models.TextField()
     requirements = models.TextField()
     responsibilities = models.TextField()
@@ -17,8 +28,19 @@ class Job(models.Model):
     urgent = models.BooleanField(default=False)
     featured = models.BooleanField(default=False)
     employer = models.ForeignKey(Employer, on_delete=models.CASCADE, related_name='jobs')
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
+    # Set explicitly by the job storage backend so imported jobs keep their timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='job_created_idx'),
+            models.Index(fields=['employer', 'created_at'], name='job_employer_created_idx'),
+            models.Index(fields=['job_type', 'created_at'], name='job_type_created_idx'),
+            models.Index(fields=['experience_level', 'created_at'], name='job_level_created_idx'),
+            models.Index(fields=['salary_max', 'created_at'], name='job_salary_max_idx'),
+            models.Index(fields=['salary_min'], name='job_salary_min_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.title} at {self.employer.company_name}"
\ No newline at end of file
+        return f"{self.title} at {self.employer.company_name}"
@@ -1,3 +1,1166 @@
-from django.test import TestCase
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models import Employer, Job, JobApplication, Jobseeker
+from api.utils import job_archive, job_engines, job_pages, job_query_cache, job_storage
+from api.utils.db_job_backend import DatabaseJobBackend
+from api.utils.job_changes import JobChangeLog
+from api.utils.job_engines import JsonFileEngine, JournalEngine, fcntl
+from api.utils.job_group_commit import PendingMutation
+from api.utils.job_index import JobIndex, parse_salary_range
+from api.utils.job_pages import JobPagePublisher
+from api.utils.job_query_cache import JobQueryCache, get_query_cache
+from api.utils.job_snapshot import BinarySnapshotEngine, read_binary_snapshot
+from api.utils.json_job_backend import JsonJobBackend
+from api.utils.jwt_utils import generate_access_token
+from api.utils.shared_job_backend import SharedJobBackend
+from api.views.job_views import build_job_data
+
+
+def _post_jobs(worker, count):
+    """Create `count` jobs from a separate worker process"""
+    # Each process starts with its own empty cache, like a fresh WSGI worker
+    job_storage.get_backend().invalidate_cache()
+    for i in range(count):
+        job_storage.create_job({'title': f'Job {worker}-{i}', 'employer_id': worker})
+
+
+def _read_jobs(rounds, errors):
+    """Read the catalog repeatedly from a separate process while writers run"""
+    backend = job_storage.get_backend()
+    backend.invalidate_cache()
+    seen = 0
+    for _ in range(rounds):
+        total = backend.get_jobs(1, 1)["pagination"]["total"]
+        if total < seen:
+            errors.put(f'Job count went backwards from {seen} to {total}')
+        seen = total
+
+
+@skipIf(fcntl is None, 'Cross-process job storage locking needs fcntl')
+@override_settings(JOB_STATIC_PAGES=0)
+class JobStorageConcurrencyTests(SimpleTestCase):
+    WORKERS = 4
+    JOBS_PER_WORKER = 25
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = Path(self.directory) / 'jobs.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_workers(self, engine, backend_class=JsonJobBackend):
+        context = multiprocessing.get_context('fork')
+        errors = context.Queue()
+
+        backend = backend_class(self.path, engine=engine)
+
+        with mock.patch.object(job_storage, '_backend', backend):
+            processes = [
+                context.Process(target=_post_jobs, args=(worker, self.JOBS_PER_WORKER))
+                for worker in range(self.WORKERS)
+            ]
+            processes.append(context.Process(target=_read_jobs, args=(200, errors)))
+
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(60)
+                self.assertEqual(process.exitcode, 0)
+
+            backend.invalidate_cache()
+            jobs = backend.load_jobs()["jobs"]
+
+        self.assertTrue(errors.empty(), errors.get() if not errors.empty() else '')
+        return jobs
+
+    def assert_no_lost_writes(self, jobs):
+        titles = {job["title"] for job in jobs.values()}
+        expected = {
+            f'Job {worker}-{i}'
+            for worker in range(self.WORKERS)
+            for i in range(self.JOBS_PER_WORKER)
+        }
+        self.assertEqual(titles, expected)
+
+    def test_json_engine_keeps_every_concurrent_write(self):
+        jobs = self.run_workers(JsonFileEngine(self.path))
+
+        self.assert_no_lost_writes(jobs)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)["jobs"]), self.WORKERS * self.JOBS_PER_WORKER)
+
+    def test_journal_engine_keeps_every_concurrent_write(self):
+        # A small threshold makes the workers compact while others append
+        jobs = self.run_workers(JournalEngine(self.path, compact_bytes=4096))
+
+        self.assert_no_lost_writes(jobs)
+
+    def test_snapshot_engine_keeps_every_concurrent_write(self):
+        jobs = self.run_workers(BinarySnapshotEngine(self.path))
+
+        self.assert_no_lost_writes(jobs)
+        snapshot = read_binary_snapshot(self.path.with_suffix('.snap'))
+        self.assertEqual(len(snapshot["jobs"]), self.WORKERS * self.JOBS_PER_WORKER)
+
+    def test_shared_backend_publishes_every_concurrent_write(self):
+        jobs = self.run_workers(JsonFileEngine(self.path), SharedJobBackend)
+
+        self.assert_no_lost_writes(jobs)
+        # A fresh worker reads the last published index without rebuilding it
+        reader = SharedJobBackend(self.path)
+        with mock.patch('api.utils.shared_job_backend.write_shared_index') as rebuild:
+            page = reader.get_jobs(1, 1)
+        rebuild.assert_not_called()
+        self.assertEqual(page["pagination"]["total"], self.WORKERS * self.JOBS_PER_WORKER)
+
+    def test_change_log_numbers_every_concurrent_write(self):
+        jobs = self.run_workers(JsonFileEngine(self.path))
+
+        # One entry per create, numbered without gaps across the processes
+        entries = JsonJobBackend(self.path).change_log.load()
+        self.assertEqual([entry["seq"] for entry in entries], list(range(1, len(jobs) + 1)))
+        self.assertEqual({entry["id"] for entry in entries}, set(jobs))
+
+    def test_journal_load_sees_changes_compacted_during_the_read(self):
+        engine = JournalEngine(self.path)
+        meta = {"last_updated": "2025-01-01T00:00:00"}
+        engine.persist({"meta": meta}, [("put", {"id": "a", "title": "A"}), ("put", {"id": "b", "title": "B"})])
+        # Rotate the journal as compaction does, then keep appending
+        os.replace(engine.journal_path, engine.compacting_path)
+        engine.persist({"meta": meta}, [("put", {"id": "c", "title": "C"})])
+
+        real_read_snapshot = job_engines.read_snapshot
+        compacted = {"meta": meta, "jobs": {"a": {"id": "a", "title": "A"}, "b": {"id": "b", "title": "B"}}}
+
+        def read_then_compact(path):
+            # Another thread finishes compacting right after the old snapshot was read
+            snapshot = real_read_snapshot(path)
+            if engine.compacting_path.exists():
+                engine._write_compacted(compacted)
+            return snapshot
+
+        with mock.patch.object(job_engines, 'read_snapshot', side_effect=read_then_compact):
+            state = engine.load()
+
+        self.assertEqual(sorted(job["id"] for job in state["jobs"]), ['a', 'b', 'c'])
+
+    def test_reads_run_safely_alongside_writes_in_other_threads(self):
+        backend = JsonJobBackend(self.path, engine=JsonFileEngine(self.path))
+        backend.create_jobs([
+            {'title': f'Developer {i}', 'description': 'python django', 'employer_id': i % 3,
+             'job_type': 'full-time', 'salary_range': f'{50 + i}k-{60 + i}k', 'skills': 'Python'}
+            for i in range(200)
+        ])
+        errors = []
+        done = threading.Event()
+
+        def read():
+            queries = [
+                {'filters': {'search': 'developer'}, 'sort': 'relevance'},
+                {'filters': {'search': 'dev'}, 'sort': 'newest', 'facets': ['job_type']},
+                {'filters': {'skills': ['python']}, 'sort': 'salary_desc'},
+                {'filters': {'job_type': 'full-time'}},
+                {'filters': {'search': 'python'}, 'after': ''},
+            ]
+            try:
+                while not done.is_set():
+                    for query in queries:
+                        backend.get_jobs(2, 10, dict(query['filters']), query.get('sort'),
+                                         query.get('facets'), query.get('after'))
+                    backend.get_jobs_by_employer(1, 2, 5)
+            except Exception as e:
+                errors.append(e)
+
+        def write():
+            try:
+                for i in range(15):
+                    job_id = backend.get_job_ids_by_employer(i % 3)[0]
+                    backend.delete_job(job_id)
+                    backend.create_job({'title': f'Developer new {i}', 'description': 'python',
+                                        'employer_id': i % 3, 'job_type': 'full-time', 'skills': 'Python'})
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=read) for _ in range(8)] + [threading.Thread(target=write)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(120)
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(backend.get_jobs(1, 1)["pagination"]["total"], 200)
+
+
+class BackendTestCase(SimpleTestCase):
+    """Base for tests that build backends storing their catalog in a temporary directory"""
+
+    BACKENDS = (JsonJobBackend, SharedJobBackend)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_backend(self, backend_class, jobs):
+        path = Path(self.directory) / f'{backend_class.__name__}.json'
+        backend = backend_class(path, engine=JsonFileEngine(path))
+        backend.create_jobs([dict(job) for job in jobs])
+        return backend
+
+
+class JobStoreTests(BackendTestCase):
+    """Caching, lookups and persistence of the catalog"""
+
+    def test_catalog_is_parsed_once_and_reloaded_when_the_file_changes(self):
+        backend = self.make_backend(JsonJobBackend, [{'title': 'First'}])
+        job_id = backend.get_jobs(1, 10)['jobs'][0]['id']
+
+        with mock.patch.object(backend.engine, 'load', wraps=backend.engine.load) as load:
+            # Reads and this process's own writes reuse the cached catalog
+            backend.get_jobs(1, 10)
+            backend.get_job_by_id(job_id)
+            backend.create_job({'title': 'Second'})
+            self.assertEqual(load.call_count, 0)
+
+            # A write from another worker replaces the file
+            other = JsonJobBackend(backend.path, engine=JsonFileEngine(backend.path))
+            other.create_job({'title': 'Third'})
+            self.assertEqual([job['title'] for job in backend.get_jobs(1, 10)['jobs']], ['First', 'Second', 'Third'])
+            self.assertEqual(load.call_count, 1)
+
+            backend.get_jobs(1, 10)
+            self.assertEqual(load.call_count, 1)
+
+    def test_jobs_are_found_updated_and_deleted_by_id(self):
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__):
+                backend = self.make_backend(backend_class, [{'title': f'Job {i}'} for i in range(3)])
+                first, second, third = [job['id'] for job in backend.get_jobs(1, 10)['jobs']]
+
+                self.assertEqual(backend.get_job_by_id(second)['title'], 'Job 1')
+                self.assertIsNone(backend.get_job_by_id('missing'))
+                self.assertEqual(set(backend.get_jobs_by_ids([third, 'missing', first])), {first, third})
+
+                # Callers get copies they can change freely
+                backend.get_job_by_id(second)['title'] = 'Changed'
+                self.assertEqual(backend.get_job_by_id(second)['title'], 'Job 1')
+
+                # An update keeps the job's place and creation time
+                created_at = backend.get_job_by_id(second)['created_at']
+                updated = backend.update_job(second, {'title': 'Renamed'})
+                self.assertEqual(updated['created_at'], created_at)
+                self.assertEqual([job['title'] for job in backend.get_jobs(1, 10)['jobs']], ['Job 0', 'Renamed', 'Job 2'])
+
+                self.assertEqual(backend.delete_job(first)['title'], 'Job 0')
+                self.assertIsNone(backend.get_job_by_id(first))
+                self.assertIsNone(backend.delete_job(first))
+                self.assertIsNone(backend.update_job('missing', {'title': 'Ghost'}))
+                self.assertEqual([job['id'] for job in backend.get_jobs(1, 10)['jobs']], [second, third])
+
+    def test_journal_compaction_and_reload_keep_every_change(self):
+        path = Path(self.directory) / 'jobs.json'
+        backend = JsonJobBackend(path, engine=JournalEngine(path))
+        jobs = backend.create_jobs([{'title': f'Job {i}'} for i in range(3)])
+        backend.update_job(jobs[0]['id'], {'title': 'Renamed'})
+        backend.delete_job(jobs[1]['id'])
+
+        def stored_titles():
+            return [job['title'] for job in JsonJobBackend(path, engine=JournalEngine(path)).iter_jobs()]
+
+        self.assertEqual(stored_titles(), ['Renamed', 'Job 2'])
+
+        backend.compact()
+        self.assertFalse(os.path.exists(path.with_suffix('.journal')))
+        with open(path) as f:
+            self.assertEqual([job['title'] for job in json.load(f)['jobs']], ['Renamed', 'Job 2'])
+        self.assertEqual(stored_titles(), ['Renamed', 'Job 2'])
+
+        # Later changes go to a new journal; a torn last line is skipped
+        backend.create_job({'title': 'Job 3'})
+        with open(path.with_suffix('.journal'), 'a') as f:
+            f.write('{"op": "put", "job": {"id": "torn"')
+        self.assertEqual(stored_titles(), ['Renamed', 'Job 2', 'Job 3'])
+
+    def test_employer_listings_follow_creates_and_deletes(self):
+        jobs = [{'title': f'Job {i}', 'employer_id': i % 2 + 1} for i in range(7)]
+        for backend_class in self.BACKENDS:
+            backend = self.make_backend(backend_class, jobs)
+            with self.subTest(backend=backend_class.__name__), mock.patch.object(job_storage, '_backend', backend):
+                def walk(employer_id):
+                    titles, cursor = [], ''
+                    while cursor is not None:
+                        page = job_storage.get_jobs_by_employer(employer_id, per_page=2, after=cursor)
+                        titles.extend(job['title'] for job in page['jobs'])
+                        cursor = page['pagination']['next_cursor']
+                    return titles
+
+                first_page = job_storage.get_jobs_by_employer(2, 1, 2)
+                self.assertEqual([job['title'] for job in first_page['jobs']], ['Job 1', 'Job 3'])
+                self.assertEqual(first_page['pagination']['total'], 3)
+                self.assertEqual(walk(2), ['Job 1', 'Job 3', 'Job 5'])
+                self.assertEqual(walk(3), [])
+
+                added = backend.create_job({'title': 'Job 7', 'employer_id': 2})
+                removed = job_storage.get_jobs_by_employer(2, 1, 1)['jobs'][0]
+                backend.delete_job(removed['id'])
+                self.assertEqual(walk(2), ['Job 3', 'Job 5', 'Job 7'])
+                self.assertIn(added['id'], job_storage.get_job_ids_by_employer(2))
+                self.assertNotIn(removed['id'], job_storage.get_job_ids_by_employer(2))
+                self.assertEqual(len(job_storage.get_job_ids_by_employer(1)), 4)
+
+    def test_binary_snapshot_round_trips_with_the_json_file(self):
+        jobs = [
+            {'id': str(i), 'title': f'Job {i} \u00e9', 'job_type': 'contract', 'remote': i % 2 == 0, 'urgent': 1, 'skills': ['Python']}
+            for i in range(5)
+        ]
+        jobs[1].pop('remote')
+        jobs[2]['benefits'] = None
+        jobs[3]['skills'] = []
+        catalog = {'meta': {'version': 1, 'last_updated': '2025-01-01T00:00:00'}, 'jobs': jobs}
+        json_path = Path(self.directory) / 'jobs.json'
+        snapshot_path = Path(self.directory) / 'jobs.snap'
+        with open(json_path, 'w') as f:
+            json.dump(catalog, f)
+
+        call_command('job_snapshot', 'export', json=str(json_path), snapshot=str(snapshot_path), stdout=StringIO())
+        snapshot = read_binary_snapshot(snapshot_path)
+        self.assertEqual(snapshot, catalog)
+        self.assertEqual([list(job) for job in snapshot['jobs']], [list(job) for job in jobs])
+        self.assertIs(snapshot['jobs'][0]['remote'], True)
+        self.assertIs(snapshot['jobs'][0]['urgent'], 1)
+
+        json_path.unlink()
+        call_command('job_snapshot', 'import', json=str(json_path), snapshot=str(snapshot_path), stdout=StringIO())
+        with open(json_path) as f:
+            self.assertEqual(json.load(f), catalog)
+
+        # The snapshot engine serves the same catalog
+        backend = JsonJobBackend(json_path, engine=BinarySnapshotEngine(json_path))
+        self.assertEqual(backend.get_job_by_id('2')['benefits'], None)
+        self.assertEqual(backend.get_jobs(1, 10)['pagination']['total'], 5)
+
+        snapshot_path.write_bytes(snapshot_path.read_bytes()[:-10])
+        with self.assertRaises(ValueError):
+            read_binary_snapshot(snapshot_path)
+
+    def test_archiving_writes_the_archive_outside_the_catalog_lock(self):
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__):
+                backend = self.make_backend(backend_class, [{'title': f'Job {i}'} for i in range(3)])
+                archive = job_archive.JobArchive(Path(self.directory) / backend_class.__name__ / 'archive')
+                ids = [job['id'] for job in backend.get_jobs(1, 10)['jobs']]
+                add = archive.add
+
+                def alongside(target, *args):
+                    thread = threading.Thread(target=target, args=args, daemon=True)
+                    thread.start()
+                    thread.join(5)
+                    self.assertFalse(thread.is_alive())
+
+                def add_while_others_use_the_catalog(jobs):
+                    jobs = list(jobs)
+                    add(jobs)
+                    # Neither reads nor writes wait for the archive to be written
+                    alongside(backend.get_job_by_id, ids[0])
+                    if len(jobs) == 3:
+                        # A job updated before it leaves the catalog is archived again
+                        renamed = {**backend.get_job_by_id(ids[1]), 'title': 'Renamed'}
+                        alongside(backend.update_job, ids[1], renamed)
+
+                with mock.patch.object(job_archive, '_archive', archive), \
+                        mock.patch.object(archive, 'add', side_effect=add_while_others_use_the_catalog) as archive_add:
+                    archived = backend.archive_jobs(ids)
+
+                self.assertEqual(archive_add.call_count, 2)
+                self.assertEqual(sorted(archived), sorted(ids))
+                self.assertEqual(backend.get_jobs(1, 10)['pagination']['total'], 0)
+                self.assertEqual(archive.get(ids[1])['title'], 'Renamed')
+                self.assertEqual(archived[ids[1]]['title'], 'Renamed')
+
+    def test_query_cache_evicts_the_least_recently_used_listing(self):
+        cache = JobQueryCache(max_entries=2)
+        computed = []
+
+        def lookup(generation, key):
+            return cache.get_or_compute(generation, key, lambda: computed.append(key) or {'key': key})
+
+        lookup(1, 'a')
+        lookup(1, 'b')
+        lookup(1, 'a')
+        lookup(1, 'c')
+        lookup(1, 'a')
+        lookup(1, 'b')
+        self.assertEqual(computed, ['a', 'b', 'c', 'b'])
+        self.assertEqual(cache.stats(), {
+            'entries': 2, 'max_entries': 2, 'hits': 2, 'misses': 4,
+            'hit_rate': 2 / 6, 'evictions': 2, 'invalidations': 0
+        })
+
+        # Another generation drops every entry; None bypasses the cache
+        lookup(2, 'a')
+        lookup(None, 'a')
+        self.assertEqual(computed[-2:], ['a', 'a'])
+        self.assertEqual(cache.stats()['invalidations'], 1)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_cached_listings_follow_writes_from_any_process(self):
+        backend = self.make_backend(JsonJobBackend, [{'title': 'First'}])
+        other_process = JsonJobBackend(backend.path, engine=JsonFileEngine(backend.path))
+
+        with mock.patch.object(job_storage, '_backend', backend), \
+                mock.patch.object(job_query_cache, '_cache', JobQueryCache()):
+            def titles():
+                return [job['title'] for job in job_storage.get_jobs(1, 10)['jobs']]
+
+            self.assertEqual(titles(), ['First'])
+            with mock.patch.object(backend, 'get_jobs', wraps=backend.get_jobs) as get_jobs:
+                self.assertEqual(titles(), ['First'])
+            get_jobs.assert_not_called()
+
+            backend.create_job({'title': 'Second'})
+            self.assertEqual(titles(), ['First', 'Second'])
+            # The file signature moves on with writes made by other workers
+            other_process.create_job({'title': 'Third'})
+            self.assertEqual(titles(), ['First', 'Second', 'Third'])
+            self.assertEqual(job_query_cache.get_query_cache().stats()['invalidations'], 2)
+
+
+class JobQueryTests(BackendTestCase):
+    """Listing, search and pagination behavior of the in-memory backends"""
+    def test_relevance_ranks_matches_without_ordering_them_all(self):
+        jobs = [
+            {'title': 'Office Manager', 'description': 'Some python scripting', 'location': 'Remote'},
+            {'title': 'Python Developer', 'description': 'Build APIs in Python', 'location': 'Remote'},
+            {'title': 'Accountant', 'description': 'Spreadsheets', 'location': 'Remote'},
+            {'title': 'Python Engineer', 'description': 'Data pipelines', 'location': 'Berlin'},
+        ]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__):
+                backend = self.make_backend(backend_class, jobs)
+
+                # Ranking must not put every match in catalog order first
+                with mock.patch.object(JobIndex, 'in_order', side_effect=AssertionError('sorted all matches')):
+                    page = backend.get_jobs(1, 10, {'search': 'python'}, 'relevance')
+                    remote = backend.get_jobs(1, 1, {'search': 'python', 'location': 'Remote'}, 'relevance')
+
+                titles = [job['title'] for job in page['jobs']]
+                self.assertEqual(page['pagination']['total'], 3)
+                self.assertEqual(titles[-1], 'Office Manager')
+                self.assertEqual(set(titles[:2]), {'Python Developer', 'Python Engineer'})
+                self.assertEqual(remote['pagination']['total'], 2)
+                self.assertEqual([job['title'] for job in remote['jobs']], ['Python Developer'])
+
+    def test_backends_plan_queries_alike(self):
+        jobs = [
+            {
+                'title': f'Job {i}',
+                'description': 'python' if i % 2 else 'sales',
+                'job_type': 'full-time' if i % 3 else 'contract',
+                'salary_range': f'{40 + i}k',
+                'skills': ['python', 'django'] if i % 2 else ['excel'],
+                'employer_id': i % 2,
+            }
+            for i in range(12)
+        ]
+        queries = [
+            (1, 5, {}, None, ['job_type']),
+            (2, 5, {}, None, None),
+            (1, 4, {'skills': ['python']}, None, ['job_type']),
+            (1, 10, {'job_type': 'contract', 'title': 'Job 3'}, None, None),
+            (2, 3, {'search': 'python'}, 'salary_desc', ['job_type']),
+            (1, 3, {'salary_min': 45000}, 'salary_desc', None),
+        ]
+
+        def titles(result):
+            return [job['title'] for job in result['jobs']]
+
+        def walk(filters):
+            seen, cursor = [], ''
+            while cursor is not None:
+                result = job_storage.get_jobs(1, 4, dict(filters), after=cursor)
+                seen.extend(titles(result))
+                cursor = result['pagination']['next_cursor']
+            return seen
+
+        answers = []
+        for backend_class in self.BACKENDS:
+            with mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                answers.append((
+                    [
+                        (titles(result), result['pagination'], result.get('facets'))
+                        for result in (job_storage.get_jobs(*query) for query in queries)
+                    ],
+                    [sorted(walk(filters)) for filters in ({}, {'job_type': 'contract'})],
+                    titles(job_storage.get_jobs_by_employer(1, 1, 10)),
+                ))
+
+        self.assertEqual(answers[0], answers[1])
+        results, walks, employer_titles = answers[0]
+        self.assertEqual(results[2][0], ['Job 1', 'Job 3', 'Job 5', 'Job 7'])
+        self.assertEqual(results[3][0], ['Job 3'])
+        self.assertEqual(results[4][0], ['Job 5', 'Job 3', 'Job 1'])
+        self.assertEqual(walks[0], sorted(f'Job {i}' for i in range(12)))
+        self.assertEqual(walks[1], ['Job 0', 'Job 3', 'Job 6', 'Job 9'])
+        self.assertEqual(employer_titles, [f'Job {i}' for i in range(1, 12, 2)])
+
+    def test_search_matches_every_term_as_a_word_prefix(self):
+        jobs = [
+            {'title': 'Support Agent', 'description': 'Help customers with our developer tools'},
+            {'title': 'Senior Developer', 'description': 'Build APIs'},
+            {'title': 'Accountant', 'description': 'Spreadsheets', 'company_name': 'DevWorks'},
+            {'title': 'Developer Advocate', 'description': 'Talks to developers about developer tools', 'location': 'Remote'},
+        ]
+        for backend_class in self.BACKENDS:
+            backend = self.make_backend(backend_class, jobs)
+            with self.subTest(backend=backend_class.__name__), mock.patch.object(job_storage, '_backend', backend):
+                def titles(search):
+                    return sorted(job['title'] for job in job_storage.get_jobs(1, 10, {'search': search})['jobs'])
+
+                self.assertEqual(titles('dev'), ['Accountant', 'Developer Advocate', 'Senior Developer', 'Support Agent'])
+                self.assertEqual(titles('DEVELOPER tools'), ['Developer Advocate', 'Support Agent'])
+                self.assertEqual(titles('remote dev'), ['Developer Advocate'])
+                self.assertEqual(titles('veloper'), [])
+                self.assertEqual(titles('kubernetes'), [])
+
+                # The index follows writes
+                backend.delete_job(job_storage.get_jobs(1, 1, {'search': 'accountant'})['jobs'][0]['id'])
+                self.assertEqual(titles('dev'), ['Developer Advocate', 'Senior Developer', 'Support Agent'])
+
+    def test_relevance_ranks_title_matches_by_bm25(self):
+        jobs = [
+            {'title': 'Support Agent', 'description': 'Help customers with our developer tools'},
+            {'title': 'Senior Developer', 'description': 'Build APIs'},
+            {'title': 'Accountant', 'description': 'Spreadsheets'},
+            {'title': 'Developer Advocate', 'description': 'Talks to developers about developer tools'},
+        ]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                # Terms in the title weigh more than the same terms in the description
+                ranked = job_storage.get_jobs(1, 10, {'search': 'developer'}, 'relevance')
+                titles = [job['title'] for job in ranked['jobs']]
+                self.assertEqual(titles[-1], 'Support Agent')
+                self.assertEqual(set(titles[:2]), {'Senior Developer', 'Developer Advocate'})
+                self.assertEqual(ranked['pagination']['total'], 3)
+
+                second_page = job_storage.get_jobs(2, 2, {'search': 'developer'}, 'relevance')
+                self.assertEqual([job['title'] for job in second_page['jobs']], titles[2:])
+
+                # Without a search there is nothing to rank by, so catalog order stays
+                unranked = job_storage.get_jobs(1, 10, sort='relevance')
+                self.assertEqual([job['title'] for job in unranked['jobs']], [job['title'] for job in jobs])
+
+    def test_skills_match_case_insensitively(self):
+        jobs = [
+            {'title': 'Backend', 'skills': 'Python, Django'},
+            {'title': 'Frontend', 'skills': ['React', 'TypeScript']},
+            {'title': 'Data', 'skills': ['python', 'SQL']},
+            {'title': 'Volunteer', 'skills': []},
+        ]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                def titles(filters):
+                    return sorted(job['title'] for job in job_storage.get_jobs(1, 10, filters)['jobs'])
+
+                # Every listed skill is needed unless skills_match=any
+                self.assertEqual(titles({'skills': 'PYTHON'}), ['Backend', 'Data'])
+                self.assertEqual(titles({'skills': 'python,django'}), ['Backend'])
+                self.assertEqual(titles({'skills': 'django, sql', 'skills_match': 'any'}), ['Backend', 'Data'])
+                self.assertEqual(titles({'skills': 'django, sql'}), [])
+                self.assertEqual(titles({'skills': 'rust'}), [])
+
+                # A comma-separated skills string is stored as a list
+                job = job_storage.get_jobs(1, 1, {'skills': 'django'})['jobs'][0]
+                self.assertEqual(job['skills'], ['Python', 'Django'])
+
+    def test_parse_salary_range(self):
+        for text, expected in (
+            ('100000-120000', (100000, 120000)),
+            ('$60,000 - $80,000', (60000, 80000)),
+            ('60k-80K', (60000, 80000)),
+            ('90k', (90000, 90000)),
+            ('50/hour', (104000, 104000)),
+            ('4000 - 5000 per month', (48000, 60000)),
+            ('Competitive', (None, None)),
+            ('', (None, None)),
+            (None, (None, None)),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(parse_salary_range(text), expected)
+
+    def test_salary_bounds_keep_overlapping_ranges_and_sort_by_pay(self):
+        jobs = [
+            {'title': 'Backend', 'salary_range': '60k-80k'},
+            {'title': 'Frontend', 'salary_range': '90k-110k'},
+            {'title': 'Data', 'salary_range': '40/hour'},
+            {'title': 'Volunteer', 'salary_range': 'Unpaid'},
+        ]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                def titles(filters):
+                    return sorted(job['title'] for job in job_storage.get_jobs(1, 10, filters)['jobs'])
+
+                # Hourly pay counts per year, so Data earns 83,200
+                self.assertEqual(titles({'salary_min': '85000'}), ['Frontend'])
+                self.assertEqual(titles({'salary_max': '70000'}), ['Backend'])
+                self.assertEqual(titles({'salary_min': '75000', 'salary_max': '85000'}), ['Backend', 'Data'])
+                self.assertEqual(titles({'salary_min': 'plenty'}), ['Backend', 'Data', 'Frontend', 'Volunteer'])
+
+                # Jobs without a salary come last
+                ranked = job_storage.get_jobs(1, 10, sort='salary_desc')['jobs']
+                self.assertEqual([job['title'] for job in ranked], ['Frontend', 'Data', 'Backend', 'Volunteer'])
+
+    def test_facet_counts_follow_the_filters(self):
+        jobs = [
+            {'title': 'Backend', 'job_type': 'full-time', 'remote': True, 'experience_level': 'senior'},
+            {'title': 'Frontend', 'job_type': 'full-time', 'remote': False},
+            {'title': 'Data', 'job_type': 'contract', 'remote': True},
+            {'title': 'Broken', 'job_type': ['listed'], 'remote': {'nested': True}},
+        ]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                def listing(filters, facets):
+                    return job_storage.get_jobs(1, 10, filters, facets=facets)
+
+                # Values that can't be faceted are left out instead of failing the write
+                everything = listing({}, ['job_type', 'remote', 'experience_level'])
+                self.assertEqual(everything['pagination']['total'], 4)
+                self.assertEqual(everything['facets'], {
+                    'job_type': {'full-time': 2, 'contract': 1},
+                    'remote': {True: 2, False: 1},
+                    'experience_level': {'senior': 1},
+                })
+
+                # Counts cover the filtered jobs, and query string values are converted
+                remote = listing({'remote': 'true'}, ['job_type', 'remote', 'bogus'])
+                self.assertEqual(sorted(job['title'] for job in remote['jobs']), ['Backend', 'Data'])
+                self.assertEqual(remote['facets'], {'job_type': {'full-time': 1, 'contract': 1}, 'remote': {True: 2}})
+                self.assertEqual(listing({'remote': 'true', 'job_type': 'contract'}, [])['pagination']['total'], 1)
+
+    def test_cursor_pages_walk_every_job_once_in_creation_order(self):
+        jobs = [{'title': f'Job {i}', 'job_type': 'contract' if i % 2 else 'full-time'} for i in range(7)]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                expected = sorted(job_storage.get_jobs(1, 10)['jobs'], key=lambda job: (job['created_at'], job['id']))
+
+                seen, cursor = [], ''
+                while cursor is not None:
+                    page = job_storage.get_jobs(1, 3, after=cursor, facets=['job_type'])
+                    self.assertLessEqual(len(page['jobs']), 3)
+                    self.assertEqual(page['facets']['job_type'], {'full-time': 4, 'contract': 3})
+                    seen.extend(page['jobs'])
+                    cursor = page['pagination']['next_cursor']
+                    self.assertEqual(page['pagination']['has_more'], cursor is not None)
+                self.assertEqual([job['id'] for job in seen], [job['id'] for job in expected])
+
+                with self.assertRaises(job_storage.InvalidCursor):
+                    job_storage.get_jobs(1, 3, after='not-a-cursor')
+
+    def test_failed_mutation_leaves_nothing_behind(self):
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__):
+                backend = self.make_backend(backend_class, [{'title': 'Existing'}])
+
+                # The broken job fails after it was added to the catalog and indexed
+                add = JobIndex.add
+
+                def add_then_fail(index, job, bulk=False):
+                    add(index, job, bulk)
+                    if job['title'] == 'Broken':
+                        raise TypeError('broken job')
+
+                with mock.patch.object(JobIndex, 'add', add_then_fail):
+                    with self.assertRaises(TypeError):
+                        backend.create_job({'title': 'Broken', 'job_type': 'temporary'})
+
+                    # Queue the mutations create_job would submit into one batch
+                    with mock.patch.object(backend, 'mutate', side_effect=lambda mutate: mutate):
+                        batch = [
+                            PendingMutation(backend.create_job({'title': title, 'job_type': job_type}))
+                            for title, job_type in (('Before', 'contract'), ('Broken', 'temporary'), ('After', 'full-time'))
+                        ]
+                    backend.commit_batch(batch)
+                self.assertIsNone(batch[0].error)
+                self.assertIsInstance(batch[1].error, TypeError)
+                self.assertIsNone(batch[2].error)
+
+                expected = ['After', 'Before', 'Existing']
+                self.assertEqual(sorted(job['title'] for job in backend.get_jobs(1, 10)['jobs']), expected)
+                self.assertEqual(backend.get_jobs(1, 10, facets=['job_type'])['facets']['job_type'],
+                                 {'contract': 1, 'full-time': 1})
+
+                backend.create_job({'title': 'Next'})
+                stored = backend_class(backend.path, engine=JsonFileEngine(backend.path))
+                self.assertEqual(sorted(job['title'] for job in stored.iter_jobs()), expected + ['Next'])
+
+    def test_pages_below_one_are_treated_as_the_first_page(self):
+        jobs = [{'title': f'Job {i}', 'salary_range': f'{40 + i}k', 'employer_id': 1} for i in range(5)]
+        for backend_class in self.BACKENDS:
+            with self.subTest(backend=backend_class.__name__), \
+                    mock.patch.object(job_storage, '_backend', self.make_backend(backend_class, jobs)):
+                first = job_storage.get_jobs(1, 2, sort='newest')
+                self.assertEqual(job_storage.get_jobs(-1, 2, sort='newest'), first)
+                self.assertEqual(job_storage.get_jobs(0, 2, sort='salary_desc')['jobs'][0]['title'], 'Job 4')
+                self.assertEqual(len(job_storage.get_jobs(1, -3)['jobs']), 1)
+                self.assertEqual(job_storage.get_jobs_by_employer(1, 0, 2)['pagination']['current_page'], 1)
+
+
+@override_settings(JOB_STATIC_PAGES=0)
+class JobEndpointTests(TestCase):
+    """The job endpoints, served from a JSON backend in a temporary directory"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = Path(self.directory) / 'jobs.json'
+        self.backend = JsonJobBackend(path, engine=JsonFileEngine(path))
+        backend_patch = mock.patch.object(job_storage, '_backend', self.backend)
+        backend_patch.start()
+        self.addCleanup(backend_patch.stop)
+        archive_patch = mock.patch.object(job_archive, '_archive', job_archive.JobArchive(Path(self.directory) / 'archive'))
+        archive_patch.start()
+        self.addCleanup(archive_patch.stop)
+        get_query_cache().clear()
+
+        user = User.objects.create_user('acme', 'jobs@acme.test', 'password')
+        self.employer = Employer.objects.create(
+            user=user, company_name='Acme', company_email='jobs@acme.test', company_size='10-50'
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_access_token(user)}'}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def posting(self, **fields):
+        """A complete job posting payload"""
+        return {
+            'title': 'Python Developer',
+            'location': 'Berlin',
+            'jobType': 'full-time',
+            'experienceLevel': 'mid',
+            'salaryRange': '$50k-$70k',
+            'description': 'Build APIs',
+            'requirements': 'Python',
+            'responsibilities': 'Ship features',
+            **fields
+        }
+
+    def import_rows(self, rows):
+        body = ''.join(json.dumps(row) + '\n' for row in rows)
+        return self.client.post('/api/employer/jobs/bulk/', body, content_type='application/x-ndjson', **self.auth)
+
+    def post_jobs(self, count):
+        """Post `count` jobs as the employer and return their IDs"""
+        jobs = job_storage.create_jobs([
+            build_job_data(self.posting(title=f'Job {i}'), self.employer) for i in range(count)
+        ])
+        return [job['id'] for job in jobs]
+
+    def bulk(self, method, path, body):
+        return getattr(self.client, method)(path, json.dumps(body), content_type='application/json', **self.auth)
+
+    def test_employer_applications_look_up_every_job_at_once(self):
+        live, archived = job_storage.create_jobs([
+            build_job_data(self.posting(title=title), self.employer) for title in ('Live', 'Archived')
+        ])
+        job_storage.archive_jobs([archived['id']])
+        local = Job.objects.create(
+            title='Local', location='Berlin', job_type='full-time', experience_level='mid',
+            salary_range='', description='', requirements='', responsibilities='', employer=self.employer
+        )
+        for number, job_id in enumerate([live['id'], archived['id'], local.id, 'gone'] * 3):
+            user = User.objects.create_user(f'seeker{number}', f'seeker{number}@example.test', 'password')
+            jobseeker = Jobseeker.objects.create(user=user, email=user.email, first_name='Jo', last_name='Doe')
+            JobApplication.objects.create(job_id=job_id, jobseeker=jobseeker, job_title='Applied for', company_name='Acme')
+
+        # The same queries however many applications there are, one of them for the local jobs
+        with self.assertNumQueries(8):
+            response = self.client.get('/api/jobs/applications/', **self.auth)
+
+        titles = sorted(application['job_detail']['title'] for application in response.json()['data'])
+        self.assertEqual(titles, sorted(['Live', 'Archived', 'Local', 'Applied for'] * 3))
+
+    def test_bulk_import_reports_rows_with_wrong_types(self):
+        response = self.import_rows([
+            self.posting(title='Good'),
+            self.posting(title='Listed type', jobType=['x']),
+            self.posting(title='Typo flag', remote='ture'),
+            self.posting(title='Bad skills', skills=['python', 3]),
+            self.posting(title='Skills text', skills='python, django', remote=True),
+            self.posting(title=7),
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['data']['results']
+        self.assertEqual([result['success'] for result in results], [True, False, False, False, True, False])
+        self.assertEqual(results[1]['message'], 'Invalid values for fields: job_type')
+        self.assertEqual(results[2]['message'], 'Invalid values for fields: remote')
+        self.assertEqual(results[3]['message'], 'Invalid values for fields: skills')
+        self.assertEqual(results[5]['message'], 'Invalid values for fields: title')
+
+        jobs = self.backend.get_jobs(1, 10)['jobs']
+        self.assertEqual(sorted(job['title'] for job in jobs), ['Good', 'Skills text'])
+        self.assertEqual(next(job for job in jobs if job['title'] == 'Skills text')['skills'], ['python', 'django'])
+
+    def test_csv_and_ndjson_imports_read_booleans_alike(self):
+        flags = ['yes', 'No', '1', '', 'ture']
+        header = 'title,location,jobType,experienceLevel,salaryRange,description,requirements,responsibilities,remote\n'
+        body = header + ''.join(
+            f'CSV {i},Berlin,full-time,mid,$50k,Build APIs,Python,Ship features,{flag}\n' for i, flag in enumerate(flags)
+        )
+        csv_response = self.client.post('/api/employer/jobs/bulk/', body, content_type='text/csv', **self.auth)
+        ndjson_response = self.import_rows([
+            self.posting(title=f'NDJSON {i}', **({'remote': flag} if flag else {})) for i, flag in enumerate(flags)
+        ])
+
+        for response in (csv_response, ndjson_response):
+            results = response.json()['data']['results']
+            self.assertEqual([result['success'] for result in results], [True, True, True, True, False])
+            self.assertEqual(results[4]['message'], 'Invalid values for fields: remote')
+
+        remote = {job['title']: job['remote'] for job in self.backend.get_jobs(1, 10)['jobs']}
+        for kind in ('CSV', 'NDJSON'):
+            self.assertEqual([remote[f'{kind} {i}'] for i in range(4)], [True, False, True, False])
+
+    def test_bulk_patch_coerces_booleans_and_rejects_wrong_types(self):
+        ids = [job['id'] for job in self.backend.create_jobs([
+            build_job_data(self.posting(title=f'Job {i}', remote=True), self.employer) for i in range(2)
+        ])]
+
+        def patch(changes):
+            return self.client.patch(
+                '/api/employer/jobs/bulk/', json.dumps({'ids': ids, 'changes': changes}),
+                content_type='application/json', **self.auth
+            )
+
+        response = patch({'remote': 'false', 'urgent': 'Yes', 'skills': 'python, sql'})
+        self.assertEqual(response.status_code, 200)
+        for job_id in ids:
+            job = self.backend.get_job_by_id(job_id)
+            self.assertIs(job['remote'], False)
+            self.assertIs(job['urgent'], True)
+            self.assertEqual(job['skills'], ['python', 'sql'])
+
+        for changes, field in (
+            ({'remote': 'maybe'}, 'remote'),
+            ({'featured': 1}, 'featured'),
+            ({'title': 42}, 'title'),
+            ({'benefits': None}, 'benefits'),
+            ({'skills': ['python', None]}, 'skills'),
+        ):
+            with self.subTest(changes=changes):
+                response = patch(changes)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['message'], f'Invalid values for fields: {field}')
+
+        self.assertEqual({job['title'] for job in self.backend.get_jobs(1, 10)['jobs']}, {'Job 0', 'Job 1'})
+
+    def test_bulk_delete_only_touches_the_employers_jobs(self):
+        ids = self.post_jobs(3)
+        other = job_storage.create_job({**build_job_data(self.posting(title='Other'), self.employer), 'employer_id': -1})
+
+        with mock.patch.object(self.backend.engine, 'persist', wraps=self.backend.engine.persist) as persist:
+            response = self.bulk('delete', '/api/employer/jobs/bulk/', {'ids': ids[:2] + [other['id']]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['deleted'], 2)
+        self.assertEqual([result['success'] for result in response.json()['data']['results']], [True, True, False])
+        persist.assert_called_once()
+
+        self.assertEqual(self.client.get(f'/api/jobs/{ids[0]}/').status_code, 404)
+        self.assertIsNotNone(job_storage.get_job_by_id(ids[2]))
+        self.assertIsNotNone(job_storage.get_job_by_id(other['id']))
+
+        self.assertEqual(self.bulk('delete', '/api/employer/jobs/bulk/', {'ids': []}).status_code, 400)
+        self.assertEqual(self.bulk('delete', '/api/employer/jobs/bulk/', {'ids': [ids[0]]}).status_code, 404)
+
+    def test_bulk_close_archives_only_the_employers_jobs(self):
+        ids = self.post_jobs(4)
+        other = job_storage.create_job({**build_job_data(self.posting(title='Other'), self.employer), 'employer_id': -1})
+
+        response = self.bulk('post', '/api/employer/jobs/bulk/close/', {'ids': ids[:2] + [other['id']]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['closed'], 2)
+        self.assertEqual([result['success'] for result in response.json()['data']['results']], [True, True, False])
+
+        # Closed jobs leave the listing but stay viewable from the archive
+        listed = {job['id'] for job in self.client.get('/api/jobs/').json()['data']['jobs']}
+        self.assertEqual(listed, {ids[2], ids[3], other['id']})
+        closed = self.client.get(f'/api/jobs/{ids[0]}/').json()['data']
+        self.assertTrue(closed['archived'])
+        self.assertEqual(closed['title'], 'Job 0')
+
+    def test_unchanged_listings_and_jobs_answer_304(self):
+        job_id = self.post_jobs(2)[0]
+
+        for url in ('/api/jobs/?page=1&per_page=10', f'/api/jobs/{job_id}/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response['ETag']
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        # Other parameters and other catalog versions get a fresh body
+        listing = self.client.get('/api/jobs/?page=1&per_page=10')
+        self.assertEqual(self.client.get('/api/jobs/?page=2&per_page=10', HTTP_IF_NONE_MATCH=listing['ETag']).status_code, 200)
+        self.bulk('patch', '/api/employer/jobs/bulk/', {'ids': [job_id], 'changes': {'urgent': True}})
+        self.assertEqual(self.client.get('/api/jobs/?page=1&per_page=10', HTTP_IF_NONE_MATCH=listing['ETag']).status_code, 200)
+        response = self.client.get(f'/api/jobs/{job_id}/', HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['data']['urgent'])
+
+    def test_changes_feed_follows_every_write(self):
+        first, second, third = self.post_jobs(3)
+
+        response = self.client.get('/api/jobs/changes/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual([change['id'] for change in data['changes']], [first, second, third])
+        self.assertFalse(data['reset'])
+        generation = data['generation']
+
+        self.bulk('patch', '/api/employer/jobs/bulk/', {'ids': [second], 'changes': {'featured': True}})
+        self.bulk('delete', '/api/employer/jobs/bulk/', {'ids': [third]})
+
+        changes = self.client.get(f'/api/jobs/changes/?since={generation}').json()['data']['changes']
+        self.assertEqual([(change['id'], change['deleted']) for change in changes], [(second, False), (third, True)])
+        self.assertTrue(changes[0]['job']['featured'])
+        self.assertNotIn('job', changes[1])
+
+        # Paging through with a small limit
+        page = self.client.get('/api/jobs/changes/?since=0&limit=2').json()['data']
+        self.assertTrue(page['has_more'])
+        self.assertEqual(len(page['changes']), 2)
+
+        self.assertEqual(self.client.get('/api/jobs/changes/?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/changes/?limit=0').status_code, 400)
+        self.assertTrue(self.client.get('/api/jobs/changes/?since=999').json()['data']['reset'])
+
+    def test_feeds_render_every_job_and_are_cached_per_catalog_version(self):
+        ids = self.post_jobs(3)
+        feed_dir = Path(self.directory) / 'feeds'
+
+        with override_settings(JOB_FEED_DIR=feed_dir):
+            response = self.client.get('/api/jobs/feed/')
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            lines = b''.join(response.streaming_content).decode().splitlines()
+            self.assertEqual([json.loads(line)['id'] for line in lines], ids)
+
+            feed = json.loads(b''.join(self.client.get('/api/jobs/feed/?format=json').streaming_content))
+            self.assertEqual(feed['version'], 'https://jsonfeed.org/version/1.1')
+            self.assertEqual([item['id'] for item in feed['items']], ids)
+
+            xml = b''.join(self.client.get('/api/jobs/feed/?format=xml').streaming_content).decode()
+            self.assertEqual(xml.count('<job>'), 3)
+            self.assertIn(f'<referencenumber>{ids[0]}</referencenumber>', xml)
+
+            # The rendered feed is saved and answered from disk until the next write
+            self.assertEqual(len(list(feed_dir.glob('feed-*.ndjson'))), 1)
+            cached = self.client.get('/api/jobs/feed/')
+            self.assertEqual(b''.join(cached.streaming_content).decode().splitlines(), lines)
+            self.assertEqual(self.client.get('/api/jobs/feed/', HTTP_IF_NONE_MATCH=cached['ETag']).status_code, 304)
+
+            job_storage.delete_job(ids[0])
+            response = self.client.get('/api/jobs/feed/')
+            self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 2)
+            self.assertEqual(len(list(feed_dir.glob('feed-*.ndjson'))), 1)
+
+            self.assertEqual(self.client.get('/api/jobs/feed/?format=rss').status_code, 400)
+    def test_cache_stats_need_a_staff_token_but_no_role(self):
+        staff = User.objects.create_user('admin', 'admin@acme.test', 'password', is_staff=True)
+        staff_auth = {'HTTP_AUTHORIZATION': f'Bearer {generate_access_token(staff)}'}
+
+        self.assertEqual(self.client.get('/api/jobs/cache/').status_code, 401)
+        self.assertEqual(self.client.get('/api/jobs/cache/', HTTP_AUTHORIZATION='Bearer invalid').status_code, 401)
+        self.assertEqual(self.client.get('/api/jobs/cache/', **self.auth).status_code, 403)
+
+        response = self.client.get('/api/jobs/cache/', **staff_auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.json()['data'])
+
+    def test_static_pages_are_named_after_the_job_board_requests(self):
+        self.backend.create_jobs([
+            build_job_data(self.posting(title=f'Job {i}', jobType='contract' if i % 3 else 'full-time'), self.employer)
+            for i in range(25)
+        ])
+        directory = Path(self.directory) / 'job-pages'
+        with override_settings(JOB_STATIC_PAGES=2, JOB_STATIC_PAGES_DIR=directory, JOB_STATIC_PAGES_GZIP=False):
+            JobPagePublisher().publish()
+
+        # Query strings as frontend/app/jobs/page.tsx builds them
+        for query in (
+            '',
+            'page=1&per_page=10',
+            'page=2&per_page=10',
+            'page=1&per_page=10&job_type=contract',
+            'page=2&per_page=10&job_type=contract',
+            'page=1&per_page=10&experience_level=mid',
+        ):
+            with self.subTest(query=query):
+                # The proxy's map: no arguments means the first page
+                path = directory / ((query or 'page=1&per_page=10') + '.json')
+                self.assertTrue(path.exists(), path.name)
+                response = self.client.get(f'/api/jobs/?{query}')
+                self.assertEqual(json.loads(path.read_text()), response.json())
+
+    def test_static_page_publish_failures_are_logged(self):
+        publisher = JobPagePublisher()
+        publisher._dirty = True
+        # Run the publishing loop in this thread
+        with override_settings(JOB_STATIC_PAGES_DELAY=0), \
+                mock.patch.object(publisher, 'publish', side_effect=OSError('disk full')), \
+                self.assertLogs('api.utils.job_pages', 'ERROR') as logs:
+            publisher._run()
+
+        self.assertIn('disk full', logs.output[0])
+
+    def test_static_pages_are_refreshed_only_after_writes_that_changed_jobs(self):
+        publisher = mock.Mock(spec=JobPagePublisher)
+        with mock.patch.object(job_pages, '_publisher', publisher):
+            job = job_storage.create_job(build_job_data(self.posting(), self.employer))
+            self.assertEqual(publisher.schedule.call_count, 1)
+
+            job_storage.create_jobs([])
+            job_storage.update_job('missing', build_job_data(self.posting(), self.employer))
+            job_storage.update_jobs(self.employer.id, ['missing'], {'urgent': True})
+            job_storage.delete_job('missing')
+            job_storage.delete_jobs(self.employer.id, ['missing'])
+            job_storage.archive_jobs(['missing'])
+            self.assertEqual(publisher.schedule.call_count, 1)
+
+            job_storage.delete_job(job['id'])
+            self.assertEqual(publisher.schedule.call_count, 2)
+
+    def test_listings_reject_pages_that_are_not_numbers(self):
+        for url in ('/api/jobs/?page=abc', '/api/jobs/?per_page=1.5', '/api/employer/jobs/?page=two'):
+            with self.subTest(url=url):
+                response = self.client.get(url, **self.auth)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['message'], 'page and per_page must be whole numbers')
+        self.assertEqual(self.client.get('/api/employer/jobs/?page=1&per_page=5', **self.auth).status_code, 200)
+
+    def test_single_job_writes_check_field_types(self):
+        def post(payload):
+            return self.client.post('/api/jobs/', json.dumps(payload), content_type='application/json', **self.auth)
+
+        response = post(self.posting(jobType=['x']))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Invalid values for fields: job_type')
+        self.assertEqual(post(self.posting(remote='maybe', urgent=None)).json()['message'],
+                         'Invalid values for fields: remote, urgent')
+
+        # Text booleans are stored as booleans, so filters and facet counts agree
+        job = post(self.posting(remote='true', featured='no')).json()['data']
+        self.assertIs(job['remote'], True)
+        self.assertIs(job['featured'], False)
+        listing = self.client.get('/api/jobs/?remote=true&facets=remote').json()['data']
+        self.assertEqual(listing['pagination']['total'], 1)
+        self.assertEqual(listing['facets']['remote'], {'true': 1})
+
+        response = self.client.put(
+            f'/api/jobs/{job["id"]}/', json.dumps(self.posting(title={'en': 'Developer'})),
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.backend.get_job_by_id(job['id'])['title'], 'Python Developer')
+
+
+class DatabaseBackendTests(TestCase):
+    """The database backend, compared with the JSON backend where they must agree"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.backend = DatabaseJobBackend()
+        self.backend.change_log = JobChangeLog(Path(self.directory) / 'jobs.changes')
+
+        user = User.objects.create_user('acme', 'jobs@acme.test', 'password')
+        self.employer = Employer.objects.create(
+            user=user, company_name='Acme Software', company_email='jobs@acme.test', company_size='10-50'
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_change_timestamps_follow_the_sequence_numbers(self):
+        change_log = self.backend.change_log
+        last_seq = change_log.last_seq
+
+        def slow_last_seq():
+            # Widen the gap between waiting for the lock and numbering the changes
+            time.sleep(0.002)
+            return last_seq()
+
+        def log(worker):
+            for i in range(5):
+                self.backend.log_changes([('delete', f'job-{worker}-{i}')])
+
+        with mock.patch.object(change_log, 'last_seq', side_effect=slow_last_seq):
+            threads = [threading.Thread(target=log, args=(worker,)) for worker in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        entries = change_log.load()
+        self.assertEqual([entry['seq'] for entry in entries], list(range(1, 31)))
+        timestamps = [entry['ts'] for entry in entries]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_search_matches_word_prefixes_like_the_json_backends(self):
+        jobs = [
+            {'title': 'JavaScript Developer', 'location': 'Berlin', 'description': 'Frontend work'},
+            {'title': 'Full-stack Engineer', 'location': 'Remote', 'description': 'Some scripting'},
+            {'title': 'Accountant', 'location': 'Paris', 'description': 'Spreadsheets'},
+        ]
+        jobs = [
+            {**job, 'job_type': 'full-time', 'experience_level': 'mid', 'salary_range': '50k',
+             'requirements': '-', 'responsibilities': '-', 'employer_id': self.employer.id, 'company_name': 'Acme Software'}
+            for job in jobs
+        ]
+        path = Path(self.directory) / 'jobs.json'
+        json_backend = JsonJobBackend(path, engine=JsonFileEngine(path))
+        for backend in (self.backend, json_backend):
+            backend.create_jobs([dict(job) for job in jobs])
+
+        for search, expected in (
+            ('java', ['JavaScript Developer']),
+            ('script', ['Full-stack Engineer']),
+            ('STACK', ['Full-stack Engineer']),
+            ('soft', ['Accountant', 'Full-stack Engineer', 'JavaScript Developer']),
+            ('veloper', []),
+            ('dev berlin', ['JavaScript Developer']),
+        ):
+            for backend in (self.backend, json_backend):
+                with self.subTest(search=search, backend=type(backend).__name__):
+                    result = backend.get_jobs(1, 10, {'search': search})
+                    self.assertEqual(sorted(job['title'] for job in result['jobs']), expected)
+
+        # Relevance sorting matches the same way
+        ranked = self.backend.get_jobs(1, 10, {'search': 'script'}, 'relevance')
+        self.assertEqual([job['title'] for job in ranked['jobs']], ['Full-stack Engineer'])
@@ -1,6 +1,6 @@
 from django.urls import path
 from .views.auth_views import AuthLoginView, EmployerRegisterView, JobseekerRegisterView
-from .views.job_views import JobView, EmployerJobsView
+from .views.job_views import JobView, JobChangesView, JobFeedView, JobQueryCacheView, EmployerJobsView, EmployerBulkJobsView, EmployerCloseJobsView
 from .views.employer_views import (
     EmployerProfileView, 
     EmployerLogoUploadView,
@@ -30,8 +30,13 @@ urlpatterns = [
     
     # Job routes
     path('jobs/', JobView.as_view(), name='jobs'),
+    path('jobs/changes/', JobChangesView.as_view(), name='job_changes'),
+    path('jobs/feed/', JobFeedView.as_view(), name='job_feed'),
+    path('jobs/cache/', JobQueryCacheView.as_view(), name='job_query_cache'),
     path('jobs/<str:job_id>/', JobView.as_view(), name='job_detail'),
     path('employer/jobs/', EmployerJobsView.as_view(), name='employer_jobs'),
+    path('employer/jobs/bulk/', EmployerBulkJobsView.as_view(), name='employer_jobs_bulk'),
+    path('employer/jobs/bulk/close/', EmployerCloseJobsView.as_view(), name='employer_jobs_close'),
     
     # Employer profile routes
     path('employer/profile/', EmployerProfileView.as_view(), name='employer_profile'),
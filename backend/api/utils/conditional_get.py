@@ -0,0 +1,44 @@
+import hashlib
+import json
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# Validators for conditional GETs: views compute an ETag (and Last-Modified
+# when the response isn't personalized) from data they already hold, answer
+# If-None-Match / If-Modified-Since with a 304 before building the body,
+# and attach the same validators to the full response otherwise.
+
+def make_etag(*parts):
+    """Build a strong ETag from JSON-serializable values"""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode()
+    return quote_etag(hashlib.sha256(encoded).hexdigest()[:32])
+
+def to_timestamp(value):
+    """Convert a datetime or an ISO timestamp (naive ones are local time) to whole seconds, or None"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return int(value.timestamp())
+
+def add_validators(response, etag, last_modified=None):
+    """Set the ETag and Last-Modified headers of a response"""
+    response['ETag'] = etag
+    timestamp = to_timestamp(last_modified)
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    # Job responses differ per user (saved/applied status, employer listings)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's copy is still current, or None"""
+    response = get_conditional_response(request, etag=etag, last_modified=to_timestamp(last_modified))
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,388 @@
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+from django.utils import timezone
+
+from api.models import Job
+from .job_archive import get_archive
+from .job_changes import JobChangeLog
+from .job_index import FIELD_WEIGHTS, parse_salary_range, tokenize
+from .job_storage import JOB_CHANGES_PATH, JobStorageBackend, InvalidCursor, split_skills, build_cursor_page
+
+# Fields copied verbatim between the job dicts and the Job model
+JOB_FIELDS = (
+    'title', 'location', 'job_type', 'experience_level', 'salary_range',
+    'description', 'requirements', 'responsibilities', 'benefits', 'skills',
+    'remote', 'urgent', 'featured'
+)
+
+# Orderings of the SORTED_ORDERS, matching JobIndex.iter_sorted
+SORT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'salary_desc': (F('salary_max').desc(nulls_last=True), '-created_at', '-id'),
+}
+
+def job_to_dict(job):
+    """Convert a Job model instance to the dict layout used by jobs.json"""
+    data = {field: getattr(job, field) for field in JOB_FIELDS}
+    data.update({
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max,
+        'employer_id': job.employer_id,
+        'company_name': job.employer.company_name,
+        'id': job.id,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat(),
+    })
+    return data
+
+def word_prefix(column, term):
+    """Match `term` at the start of a word of `column`, like the search index of the JSON backends"""
+    # Terms come from tokenize(), so they are word characters that need no escaping
+    return Q(**{f'{column}__iregex': r'(^|\W)' + term})
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp from jobs.json into an aware datetime"""
+    if not value:
+        return timezone.now()
+
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def dict_to_job(job_data, job=None):
+    """Copy the fields of a job dict onto a (new) Job model instance"""
+    job = job or Job()
+
+    for field in JOB_FIELDS:
+        value = job_data.get(field)
+        if field == 'skills':
+            value = split_skills(value) if isinstance(value, str) else (value or [])
+        elif field in ('remote', 'urgent', 'featured'):
+            value = bool(value)
+        setattr(job, field, value)
+
+    job.salary_min, job.salary_max = parse_salary_range(job.salary_range)
+    job.employer_id = job_data.get('employer_id')
+    return job
+
+
+class DatabaseJobBackend(JobStorageBackend):
+    """
+    Job storage backed by the api.Job table
+
+    Filtering, pagination and lookups run as indexed SQL queries instead of
+    Python loops over the whole catalog. Changes are logged once their
+    transaction has committed, so a logged job is always readable.
+    """
+
+    def __init__(self):
+        self.change_log = JobChangeLog(JOB_CHANGES_PATH, getattr(settings, 'JOB_CHANGE_LOG_MAX_BYTES', 8 * 1024 * 1024))
+
+    def queryset(self):
+        return Job.objects.select_related('employer')
+
+    def catalog_version(self):
+        # Creates and updates move the newest updated_at, deletes the count
+        summary = Job.objects.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        last_modified = summary['last_modified']
+        tag = f'{summary["count"]}:{last_modified.isoformat() if last_modified else ""}'
+        return tag, last_modified
+
+    def log_changes(self, changes):
+        """Append ("put", job) / ("delete", job_id) changes to the change log"""
+        self.change_log.append(changes)
+
+    def filter_queryset(self, queryset, filters):
+        filters = dict(filters or {})
+        match_all = filters.pop('skills_match', 'all') != 'any'
+
+        for key, value in filters.items():
+            if key == 'skills':
+                # Skills are stored as a JSON array, so matching the quoted value
+                # selects jobs with exactly that skill (case-insensitively)
+                skill_filters = [Q(skills__icontains=json.dumps(skill)) for skill in value]
+                if match_all:
+                    for skill_filter in skill_filters:
+                        queryset = queryset.filter(skill_filter)
+                elif skill_filters:
+                    any_skill = skill_filters[0]
+                    for skill_filter in skill_filters[1:]:
+                        any_skill |= skill_filter
+                    queryset = queryset.filter(any_skill)
+            elif key == 'search' and value:
+                # Every search term has to start a word in one of the fields
+                for term in tokenize(value):
+                    queryset = queryset.filter(
+                        word_prefix('title', term) |
+                        word_prefix('description', term) |
+                        word_prefix('employer__company_name', term) |
+                        word_prefix('location', term)
+                    )
+            elif key == 'salary_min':
+                queryset = queryset.filter(salary_max__gte=value)
+            elif key == 'salary_max':
+                queryset = queryset.filter(salary_min__lte=value)
+            elif key == 'employer_id':
+                queryset = queryset.filter(employer_id=value)
+            elif key == 'company_name':
+                queryset = queryset.filter(employer__company_name=value)
+            elif key in JOB_FIELDS or key == 'id':
+                queryset = queryset.filter(**{key: value})
+            else:
+                # Unknown keys never match, like the JSON backend
+                queryset = queryset.none()
+        return queryset
+
+    def relevance(self, search):
+        """
+        Build a relevance score expression for a search query
+
+        SQL has no BM25, so each query term found in a field adds that
+        field's weight, which still puts title matches above description ones.
+        """
+        columns = {
+            'title': 'title',
+            'company_name': 'employer__company_name',
+            'location': 'location',
+            'description': 'description',
+        }
+        score = Value(0)
+        for term in tokenize(search):
+            for field, column in columns.items():
+                score = score + Case(
+                    When(word_prefix(column, term), then=Value(int(FIELD_WEIGHTS[field] * 2))),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+        return score
+
+    def paginate_queryset(self, queryset, page, per_page, ordering=('created_at', 'id')):
+        total_count = queryset.count()
+        total_pages = (total_count + per_page - 1) // per_page
+        start_idx = (page - 1) * per_page
+        end_idx = start_idx + per_page
+
+        jobs = queryset.order_by(*ordering)[start_idx:end_idx]
+
+        return {
+            "jobs": [job_to_dict(job) for job in jobs],
+            "pagination": {
+                "total": total_count,
+                "per_page": per_page,
+                "current_page": page,
+                "total_pages": total_pages
+            }
+        }
+
+    def cursor_queryset(self, queryset, per_page, after):
+        """Return the page of jobs following the `after` cursor in (created_at, id) order"""
+        if after:
+            try:
+                created_at = datetime.fromisoformat(after[0])
+            except ValueError:
+                raise InvalidCursor(f'Invalid cursor timestamp: {after[0]}')
+            if timezone.is_naive(created_at):
+                created_at = timezone.make_aware(created_at)
+
+            # Served by the (created_at, id) indexes without an OFFSET scan
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) |
+                Q(created_at=created_at, id__gt=after[1])
+            )
+
+        jobs = queryset.order_by('created_at', 'id')[:per_page + 1]
+        return build_cursor_page([job_to_dict(job) for job in jobs], per_page)
+
+    def create_job(self, job_data):
+        job = dict_to_job(job_data)
+        job.created_at = job.updated_at = timezone.now()
+        job.save(force_insert=True)
+
+        created = job_to_dict(self.queryset().get(pk=job.pk))
+        self.log_changes([("put", created)])
+        return created
+
+    def create_jobs(self, jobs_data, batch_size=500):
+        records = []
+        for job_data in jobs_data:
+            job = dict_to_job(job_data)
+            job.created_at = job.updated_at = timezone.now()
+            records.append(job)
+
+        with transaction.atomic():
+            Job.objects.bulk_create(records, batch_size=batch_size)
+
+        created = self.queryset().in_bulk([job.pk for job in records])
+        created = [job_to_dict(created[job.pk]) for job in records]
+        self.log_changes([("put", job) for job in created])
+        return created
+
+    def facet_counts(self, queryset, fields):
+        """Count the jobs per value of each facet field with one GROUP BY per field"""
+        counts = {}
+        for field in fields:
+            rows = queryset.order_by().values(field).annotate(count=Count('id'))
+            counts[field] = {row[field]: row['count'] for row in rows if row[field] is not None}
+        return counts
+
+    def get_jobs(self, page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+        queryset = self.filter_queryset(self.queryset(), filters)
+
+        search = (filters or {}).get('search')
+        if after is not None:
+            result = self.cursor_queryset(queryset, per_page, after)
+        elif sort == 'relevance' and search:
+            ranked = queryset.annotate(relevance=self.relevance(search))
+            result = self.paginate_queryset(ranked, page, per_page, ('-relevance', 'created_at', 'id'))
+        elif sort in SORT_ORDERINGS:
+            result = self.paginate_queryset(queryset, page, per_page, SORT_ORDERINGS[sort])
+        else:
+            result = self.paginate_queryset(queryset, page, per_page)
+
+        if facets:
+            result['facets'] = self.facet_counts(queryset, facets)
+
+        return result
+
+    def get_job_by_id(self, job_id):
+        job = self.queryset().filter(pk=job_id).first()
+        return job_to_dict(job) if job else None
+
+    def get_jobs_by_ids(self, job_ids):
+        jobs = self.queryset().in_bulk(set(job_ids))
+        return {job_id: job_to_dict(job) for job_id, job in jobs.items()}
+
+    def iter_jobs(self, chunk_size=500):
+        # Stream rows with a server-side cursor instead of caching the queryset
+        for job in self.queryset().order_by('created_at', 'id').iterator(chunk_size=chunk_size):
+            yield job_to_dict(job)
+
+    def update_job(self, job_id, job_data):
+        with transaction.atomic():
+            job = self.queryset().select_for_update().filter(pk=job_id).first()
+            if job is None:
+                return None
+
+            dict_to_job(job_data, job)
+            job.updated_at = timezone.now()
+            job.save()
+
+        updated = job_to_dict(self.queryset().get(pk=job.pk))
+        self.log_changes([("put", updated)])
+        return updated
+
+    def update_jobs(self, employer_id, job_ids, changes):
+        with transaction.atomic():
+            jobs = self.queryset().select_for_update().filter(employer_id=employer_id, pk__in=set(job_ids)).in_bulk()
+            updated_at = timezone.now()
+
+            updated = {}
+            for job_id in job_ids:
+                job = jobs.get(job_id)
+                if job is None or job_id in updated:
+                    continue
+
+                job_data = job_to_dict(job)
+                job_data.update(changes)
+                dict_to_job(job_data, job)
+                job.updated_at = updated_at
+                updated[job_id] = job
+
+            Job.objects.bulk_update(
+                updated.values(),
+                list(JOB_FIELDS) + ['salary_min', 'salary_max', 'updated_at'],
+                batch_size=500
+            )
+
+        updated = {job_id: job_to_dict(job) for job_id, job in updated.items()}
+        self.log_changes([("put", job) for job in updated.values()])
+        return updated
+
+    def delete_job(self, job_id):
+        with transaction.atomic():
+            job = self.queryset().select_for_update().filter(pk=job_id).first()
+            if job is None:
+                return None
+
+            deleted_job = job_to_dict(job)
+            job.delete()
+
+        self.log_changes([("delete", job_id)])
+        return deleted_job
+
+    def delete_jobs(self, employer_id, job_ids):
+        with transaction.atomic():
+            queryset = self.queryset().select_for_update().filter(employer_id=employer_id, pk__in=set(job_ids))
+            jobs = queryset.in_bulk()
+
+            deleted = {job_id: job_to_dict(jobs[job_id]) for job_id in job_ids if job_id in jobs}
+            queryset.delete()
+
+        self.log_changes([("delete", job_id) for job_id in deleted])
+        return deleted
+
+    def archive_jobs(self, job_ids=None, employer_id=None, created_before=None):
+        with transaction.atomic():
+            queryset = self.queryset().select_for_update()
+            if job_ids is not None:
+                queryset = queryset.filter(pk__in=set(job_ids))
+            if employer_id is not None:
+                queryset = queryset.filter(employer_id=employer_id)
+            if created_before is not None:
+                queryset = queryset.filter(created_at__lt=parse_timestamp(created_before.isoformat()))
+
+            jobs = queryset.in_bulk()
+            order = job_ids if job_ids is not None else sorted(jobs, key=lambda job_id: jobs[job_id].created_at)
+            archived = {job_id: job_to_dict(jobs[job_id]) for job_id in dict.fromkeys(order) if job_id in jobs}
+
+            # Archive first, so a failure leaves the jobs in both stores rather than in neither
+            get_archive().add(archived.values())
+            Job.objects.filter(pk__in=list(archived)).delete()
+
+        self.log_changes([("delete", job_id) for job_id in archived])
+        return archived
+
+    def get_jobs_by_employer(self, employer_id, page=1, per_page=10, after=None):
+        queryset = self.queryset().filter(employer_id=employer_id)
+        if after is not None:
+            return self.cursor_queryset(queryset, per_page, after)
+        return self.paginate_queryset(queryset, page, per_page)
+
+    def get_job_ids_by_employer(self, employer_id):
+        return list(
+            Job.objects.filter(employer_id=employer_id)
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)
+        )
+
+    def import_jobs(self, jobs, batch_size=500):
+        """
+        Insert or update jobs from the jobs.json layout, keeping their IDs and timestamps
+
+        Returns:
+            int: The number of jobs written
+        """
+        records = []
+        for job_data in jobs:
+            job = dict_to_job(job_data)
+            job.id = job_data['id']
+            job.created_at = parse_timestamp(job_data.get('created_at'))
+            job.updated_at = parse_timestamp(job_data.get('updated_at'))
+            records.append(job)
+
+        with transaction.atomic():
+            Job.objects.bulk_create(
+                records,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=list(JOB_FIELDS) + ['salary_min', 'salary_max', 'employer', 'created_at', 'updated_at']
+            )
+
+        self.log_changes([("put", {"id": job.id}) for job in records])
+        return len(records)
@@ -0,0 +1,120 @@
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .job_engines import atomic_write, file_lock, file_signature
+
+# Jobs moved out of the live catalog, kept so saved jobs and applications
+# can still show them.
+#
+# Archived jobs are grouped by the month they were posted in, one
+# jobs-YYYY-MM.json file ({"jobs": [...]}) per month, and index.json maps
+# every archived job ID to its month. Writers hold archive.lock; readers
+# rely on the files being replaced atomically, month files before the index.
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+class JobArchive:
+    """Monthly job archive files in one directory"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index_path = self.directory / 'index.json'
+        self.lock_path = self.directory / 'archive.lock'
+        self._cache_lock = threading.Lock()
+        self._index_cache = {
+            "signature": None,
+            "data": None
+        }
+
+    def month_path(self, month):
+        return self.directory / f'jobs-{month}.json'
+
+    @staticmethod
+    def month_of(job):
+        """Return the YYYY-MM a job was posted in"""
+        created_at = job.get("created_at") or ""
+        return created_at[:7] if len(created_at) >= 7 else 'undated'
+
+    def read_month(self, month):
+        try:
+            with open(self.month_path(month), 'r') as f:
+                return json.load(f)["jobs"]
+        except FileNotFoundError:
+            return []
+
+    def read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load_index(self):
+        """Return the {job_id: month} index, re-reading it only when the file changed"""
+        with self._cache_lock:
+            signature = file_signature(self.index_path)
+            if self._index_cache["data"] is not None and signature == self._index_cache["signature"]:
+                return self._index_cache["data"]
+
+            data = self.read_index()
+            self._index_cache["data"] = data
+            self._index_cache["signature"] = signature
+            return data
+
+    def add(self, jobs):
+        """Archive job dicts, replacing any archived copy with the same ID"""
+        by_month = {}
+        for job in jobs:
+            by_month.setdefault(self.month_of(job), []).append(job)
+        if not by_month:
+            return
+
+        with file_lock(self.lock_path):
+            index = self.read_index()
+
+            for month, month_jobs in by_month.items():
+                archived = {job["id"]: job for job in self.read_month(month)}
+                for job in month_jobs:
+                    archived[job["id"]] = job
+                    index[job["id"]] = month
+
+                atomic_write(self.month_path(month), lambda f: json.dump({"jobs": list(archived.values())}, f))
+
+            atomic_write(self.index_path, lambda f: json.dump(index, f))
+
+    def get_many(self, job_ids):
+        """Get archived jobs as a {job_id: job} dict, marked with "archived": True"""
+        index = self.load_index()
+
+        by_month = {}
+        for job_id in job_ids:
+            month = index.get(job_id)
+            if month is not None:
+                by_month.setdefault(month, set()).add(job_id)
+
+        found = {}
+        for month, month_ids in by_month.items():
+            for job in self.read_month(month):
+                if job["id"] in month_ids:
+                    job["archived"] = True
+                    found[job["id"]] = job
+        return found
+
+    def get(self, job_id):
+        """Get an archived job, or None"""
+        return self.get_many([job_id]).get(job_id)
+
+def get_archive():
+    """Return the job archive in settings.JOB_ARCHIVE_DIR"""
+    global _archive
+
+    with _archive_lock:
+        if _archive is None:
+            directory = getattr(settings, 'JOB_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'data' / 'archive')
+            _archive = JobArchive(directory)
+        return _archive
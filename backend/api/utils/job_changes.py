@@ -0,0 +1,175 @@
+import bisect
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .job_engines import atomic_write, file_lock, file_signature
+
+# Change log of the job store, for clients that keep a mirror of the board.
+#
+# Every write appends one NDJSON line per changed job to <store>.changes:
+#
+#   {"seq": 42, "ts": "2025-05-29T07:12:18.779779", "op": "put", "id": "..."}
+#   {"seq": 43, "ts": "...", "op": "delete", "id": "..."}
+#
+# `seq` numbers are consecutive across every worker process (appends hold
+# the log's lock file), so the latest one is the store generation a client
+# has synced up to. Only job IDs are logged; the current version of a job is
+# read from the store when changes are served. Once the file grows past
+# max_bytes its older half is dropped, and clients asking for changes from
+# before the oldest kept entry are told to resync from scratch.
+
+class JobChangeLog:
+    """Append-only, size-bounded log of changed job IDs"""
+
+    # How far from the end of the file to look for the last entry
+    TAIL_BYTES = 64 * 1024
+
+    def __init__(self, path, max_bytes=8 * 1024 * 1024):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix('.changes.lock')
+        self.max_bytes = max_bytes
+        self._cache_lock = threading.Lock()
+        self._cache = {
+            "inode": None,
+            "offset": 0,
+            "entries": []
+        }
+
+    @staticmethod
+    def parse_lines(data):
+        """Parse complete NDJSON lines, skipping torn ones"""
+        entries = []
+        for line in data.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+        return entries
+
+    def last_seq(self):
+        """Read the newest sequence number from the end of the file, or 0"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - self.TAIL_BYTES))
+                tail = f.read()
+        except FileNotFoundError:
+            return 0
+
+        entries = self.parse_lines(tail)
+        return entries[-1]["seq"] if entries else 0
+
+    def append(self, changes):
+        """
+        Log ("put", job) / ("delete", job_id) changes
+
+        They are stamped with the current time under the lock that numbers
+        them, so timestamps never go backwards as sequence numbers grow.
+        Returns the sequence number of the last logged change.
+        """
+        if not changes:
+            return None
+
+        os.makedirs(self.path.parent, exist_ok=True)
+        with file_lock(self.lock_path):
+            seq = self.last_seq()
+            timestamp = datetime.now().isoformat()
+            lines = []
+            for op, value in changes:
+                seq += 1
+                job_id = value["id"] if op == "put" else value
+                lines.append(json.dumps({"seq": seq, "ts": timestamp, "op": op, "id": job_id}))
+            payload = ("\n".join(lines) + "\n").encode()
+
+            with open(self.path, 'ab+') as f:
+                # Start on a fresh line if a previous append was torn
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+
+            if size > self.max_bytes:
+                self.trim()
+
+        return seq
+
+    def trim(self):
+        """Keep the newest half of the log; the caller holds the lock"""
+        with open(self.path, 'rb') as f:
+            f.seek(-(self.max_bytes // 2), os.SEEK_END)
+            tail = f.read()
+        # Drop the partial line the cut landed in
+        tail = tail[tail.find(b"\n") + 1:]
+        atomic_write(self.path, lambda f: f.write(tail), binary=True)
+
+    def load(self):
+        """Return every kept entry, reading only what was appended since the last call"""
+        with self._cache_lock:
+            signature = file_signature(self.path)
+            if signature is None:
+                self._cache.update(inode=None, offset=0, entries=[])
+                return self._cache["entries"]
+
+            size, inode = signature[1], signature[2]
+            if inode != self._cache["inode"] or size < self._cache["offset"]:
+                # Trimmed or replaced: read it again from the start
+                self._cache.update(inode=inode, offset=0, entries=[])
+
+            if size > self._cache["offset"]:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._cache["offset"])
+                    data = f.read(size - self._cache["offset"])
+                # Leave a line that is still being written for the next call
+                complete = data[:data.rfind(b"\n") + 1]
+                self._cache["entries"] = self._cache["entries"] + self.parse_lines(complete)
+                self._cache["offset"] += len(complete)
+
+            return self._cache["entries"]
+
+    def read(self, since_seq=None, since_time=None, limit=500):
+        """
+        Return the changes after a sequence number or an ISO timestamp
+
+        Returns a dict with "changes" (the latest entry per job, oldest
+        first, at most `limit` log entries looked at), "generation" (the
+        sequence number to ask from next time), "has_more" and "reset",
+        which is set when entries the client needs were already trimmed.
+        """
+        entries = self.load()
+        latest = entries[-1]["seq"] if entries else 0
+        oldest = entries[0]["seq"] if entries else latest + 1
+
+        if since_seq is not None:
+            start = 0
+            # Entries are consecutive, so the position follows from the number
+            if entries:
+                start = min(max(since_seq - oldest + 1, 0), len(entries))
+            reset = since_seq < oldest - 1 or since_seq > latest
+        else:
+            # Timestamps grow with the sequence numbers
+            start = bisect.bisect_right(entries, since_time, key=lambda entry: entry["ts"])
+            reset = bool(entries) and oldest > 1 and since_time < entries[0]["ts"]
+
+        if reset:
+            return {"changes": [], "generation": latest, "has_more": False, "reset": True}
+
+        page = entries[start:start + limit]
+        changes = {}
+        for entry in page:
+            changes.pop(entry["id"], None)
+            changes[entry["id"]] = entry
+
+        return {
+            "changes": list(changes.values()),
+            "generation": page[-1]["seq"] if page else (since_seq if since_seq is not None else latest),
+            "has_more": start + limit < len(entries),
+            "reset": False
+        }
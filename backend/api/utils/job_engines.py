@@ -0,0 +1,315 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines run a single process
+    fcntl = None
+
+# Storage engines persist the job catalog held in memory by job_storage.
+# Every engine exposes the same methods:
+#
+#   signature()            -> hashable value that changes whenever the stored data changes
+#   load()                 -> data in the JSON file layout: {"meta": {...}, "jobs": [...]}
+#   persist(data, changes) -> write the changes, where data is the in-memory
+#                             catalog {"meta": {...}, "jobs": {job_id: record}} and
+#                             changes is a list of ("put", job dict) / ("delete", job_id)
+#   write_lock()           -> context manager held around load-modify-persist
+#
+# Several worker processes may share the same files. Writers serialize on an
+# advisory lock file, while readers never take the lock: files are replaced
+# atomically and torn journal lines are skipped, so a reader always sees a
+# complete version of the data.
+
+def get_default_structure():
+    """Return the default data structure for the jobs JSON file"""
+    return {
+        "meta": {
+            "total_count": 0,
+            "last_updated": datetime.now().isoformat()
+        },
+        "jobs": []
+    }
+
+def file_signature(path):
+    """Return a tuple identifying the current version of a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on `path` for the duration of the block"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'a') as f:
+        if fcntl is None:
+            yield
+            return
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def atomic_write(path, write, binary=False, replace=True):
+    """
+    Write a file by filling a temporary file next to it and renaming it into place
+
+    Readers either see the old file or the new one, never a partial write.
+    `write` is called with the open temporary file, opened in binary mode
+    when `binary` is set. With replace=False an existing file is left alone.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if replace:
+            os.replace(temp_path, path)
+        else:
+            try:
+                os.link(temp_path, path)
+            except FileExistsError:
+                pass
+            os.remove(temp_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def read_snapshot(path):
+    """Read and parse a jobs JSON file, creating it if it doesn't exist"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Readers get here without the write lock, so never replace a file
+        # a writer created in the meantime
+        atomic_write(path, lambda f: json.dump(get_default_structure(), f, indent=2), replace=False)
+        with open(path, 'r') as f:
+            return json.load(f)
+
+def write_snapshot(path, data):
+    """Atomically write the in-memory catalog to a jobs JSON file"""
+    atomic_write(path, lambda f: json.dump({
+        "meta": data["meta"],
+        "jobs": [dict(job) for job in data["jobs"].values()]
+    }, f, indent=2))
+
+
+class JsonFileEngine:
+    """Keeps the whole catalog in jobs.json and rewrites it on every change"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix('.lock')
+
+    def write_lock(self):
+        return file_lock(self.lock_path)
+
+    def signature(self):
+        return file_signature(self.path)
+
+    def load(self):
+        return read_snapshot(self.path)
+
+    def persist(self, data, changes):
+        write_snapshot(self.path, data)
+
+
+class JournalEngine:
+    """
+    Appends each change to a journal file next to the jobs.json snapshot
+
+    The current state is the snapshot with the journal replayed on top of it.
+    Once the journal grows past `compact_bytes` it is folded into a new
+    snapshot by a background thread. Journal records hold whole job records,
+    so replaying a record that is already part of the snapshot is harmless.
+    """
+
+    # A rotated journal older than this is assumed to belong to a crashed compaction
+    STALE_COMPACTION_SECONDS = 300
+
+    def __init__(self, path, compact_bytes=4 * 1024 * 1024):
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix('.lock')
+        self.journal_path = self.path.with_suffix('.journal')
+        # The journal being folded into the snapshot while compaction runs
+        self.compacting_path = self.path.with_suffix('.journal.compacting')
+        self.compact_bytes = compact_bytes
+        self._compaction = None
+        self._lock = threading.Lock()
+
+    def write_lock(self):
+        return file_lock(self.lock_path)
+
+    def signature(self):
+        return (
+            file_signature(self.path),
+            file_signature(self.compacting_path),
+            file_signature(self.journal_path)
+        )
+
+    def load(self):
+        # Compaction replaces the snapshot and removes the rotated journal
+        # without the write lock, so a load that read the files while they
+        # changed could miss the rotated changes; read them again until the
+        # signature is the same before and after
+        while True:
+            signature = self.signature()
+            state = self._read_state()
+            if self.signature() == signature:
+                return state
+
+    def _read_state(self):
+        """Replay the rotated and the current journal over the snapshot"""
+        snapshot = read_snapshot(self.path)
+        jobs = {job["id"]: job for job in snapshot.get("jobs", [])}
+        meta = snapshot.get("meta", get_default_structure()["meta"])
+
+        for journal_path in (self.compacting_path, self.journal_path):
+            for record in self._read_journal(journal_path):
+                if record["op"] == "put":
+                    jobs[record["job"]["id"]] = record["job"]
+                elif record["op"] == "delete":
+                    jobs.pop(record["id"], None)
+                meta["last_updated"] = record.get("ts", meta.get("last_updated"))
+
+        meta["total_count"] = len(jobs)
+
+        return {
+            "meta": meta,
+            "jobs": list(jobs.values())
+        }
+
+    def persist(self, data, changes):
+        timestamp = data["meta"]["last_updated"]
+        lines = []
+        for op, value in changes:
+            if op == "put":
+                lines.append(json.dumps({"op": "put", "ts": timestamp, "job": value}))
+            else:
+                lines.append(json.dumps({"op": "delete", "ts": timestamp, "id": value}))
+
+        payload = ("\n".join(lines) + "\n").encode()
+
+        with self._lock:
+            with open(self.journal_path, 'ab+') as f:
+                # Start on a fresh line if a previous append was torn
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        payload = b"\n" + payload
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+            journal_size = os.path.getsize(self.journal_path)
+
+        if journal_size >= self.compact_bytes:
+            self.compact(data, background=True)
+
+    def compact(self, data, background=False):
+        """
+        Fold the journal into a new jobs.json snapshot
+
+        The journal is rotated aside first, so new changes keep being appended
+        while the snapshot is written. `data` must reflect every change in the
+        journal at the time of the call, and the caller must hold write_lock().
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+
+            compacting_signature = file_signature(self.compacting_path)
+            if compacting_signature is not None:
+                started_at = compacting_signature[0] / 1e9
+                if time.time() - started_at < self.STALE_COMPACTION_SECONDS:
+                    # Another process is compacting right now
+                    return
+
+                # A previous compaction did not finish; retry it before rotating again
+                return self._start_compaction(data, background)
+
+            if not os.path.exists(self.journal_path):
+                return
+
+            os.replace(self.journal_path, self.compacting_path)
+            # Record when the rotation happened for the staleness check
+            os.utime(self.compacting_path)
+            return self._start_compaction(data, background)
+
+    def _start_compaction(self, data, background):
+        # Take a shallow copy so the snapshot reflects the state at rotation time
+        snapshot = {
+            "meta": dict(data["meta"]),
+            "jobs": dict(data["jobs"])
+        }
+
+        if not background:
+            self._write_compacted(snapshot)
+            return
+
+        self._compaction = threading.Thread(
+            target=self._write_compacted,
+            args=(snapshot,),
+            name='job-journal-compaction',
+            daemon=True
+        )
+        self._compaction.start()
+
+    def _write_compacted(self, snapshot):
+        write_snapshot(self.path, snapshot)
+        try:
+            os.remove(self.compacting_path)
+        except FileNotFoundError:
+            pass
+
+    def _read_journal(self, journal_path):
+        try:
+            with open(journal_path, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from an interrupted append
+                continue
+
+
+def create_engine(path):
+    """Create the storage engine selected by settings.JOB_STORAGE_ENGINE"""
+    engine_name = getattr(settings, 'JOB_STORAGE_ENGINE', 'json')
+
+    if engine_name == 'json':
+        return JsonFileEngine(path)
+    if engine_name == 'journal':
+        return JournalEngine(
+            path,
+            compact_bytes=getattr(settings, 'JOB_JOURNAL_COMPACT_BYTES', 4 * 1024 * 1024)
+        )
+    if engine_name == 'snapshot':
+        from .job_snapshot import BinarySnapshotEngine
+        return BinarySnapshotEngine(path)
+
+    raise ValueError(f'Unknown job storage engine: {engine_name}')
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+# Syndication feeds of every active job for aggregators.
+#
+# Feeds are rendered one job at a time from JobStorageBackend.iter_jobs(),
+# so memory use doesn't grow with the catalog. While a feed is streamed to
+# the first client it is also written to JOB_FEED_DIR under the catalog
+# version it was rendered from (feed-<version hash>.<ext>); later requests
+# for the same version are answered from that file until the next write.
+
+# Jobs rendered per chunk sent to the client
+CHUNK_JOBS = 100
+
+
+def site_url():
+    return getattr(settings, 'JOB_FEED_SITE_URL', 'http://localhost:3000').rstrip('/')
+
+def job_url(job):
+    """Link to a job's page on the job board"""
+    return f'{site_url()}/jobs/{job["id"]}'
+
+def render_ndjson(jobs, last_updated):
+    """One job per line"""
+    for job in jobs:
+        yield json.dumps(job) + '\n'
+
+def render_json_feed(jobs, last_updated):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1), with the full job under "_job\""""
+    yield json.dumps({
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": "JobConnect jobs",
+        "home_page_url": f'{site_url()}/jobs',
+    })[:-1] + ', "items": ['
+
+    separator = ''
+    for job in jobs:
+        item = {
+            "id": job["id"],
+            "url": job_url(job),
+            "title": job.get("title") or '',
+            "content_text": job.get("description") or '',
+            "date_published": job.get("created_at"),
+            "date_modified": job.get("updated_at"),
+            "authors": [{"name": job.get("company_name") or ''}],
+            "tags": job.get("skills") or [],
+            "_job": job
+        }
+        yield separator + json.dumps(item)
+        separator = ', '
+
+    yield ']}\n'
+
+def xml_element(name, value):
+    return f'<{name}>{escape(str(value if value is not None else ""))}</{name}>'
+
+def render_xml(jobs, last_updated):
+    """Indeed-style XML: one <job> element per job inside <source>"""
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n<source>'
+        + xml_element('publisher', 'JobConnect')
+        + xml_element('publisherurl', site_url())
+        + xml_element('lastBuildDate', last_updated or datetime.now().isoformat())
+        + '\n'
+    )
+
+    for job in jobs:
+        yield '<job>' + ''.join([
+            xml_element('title', job.get("title")),
+            xml_element('date', job.get("created_at")),
+            xml_element('referencenumber', job["id"]),
+            xml_element('url', job_url(job)),
+            xml_element('company', job.get("company_name")),
+            xml_element('city', job.get("location")),
+            xml_element('description', job.get("description")),
+            xml_element('salary', job.get("salary_range")),
+            xml_element('jobtype', job.get("job_type")),
+            xml_element('experience', job.get("experience_level")),
+            xml_element('remotetype', 'Fully remote' if job.get("remote") else ''),
+        ]) + '</job>\n'
+
+    yield '</source>\n'
+
+# format name: (content type, file extension, renderer)
+FEED_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson', render_ndjson),
+    'json': ('application/feed+json', 'json', render_json_feed),
+    'xml': ('application/xml; charset=utf-8', 'xml', render_xml),
+}
+
+def feed_directory():
+    return Path(getattr(settings, 'JOB_FEED_DIR', Path(settings.BASE_DIR) / 'data' / 'feeds'))
+
+def feed_path(fmt, version):
+    """Return the cache file of a feed rendered from catalog version `version`"""
+    digest = hashlib.sha256(str(version).encode()).hexdigest()[:32]
+    return feed_directory() / f'feed-{digest}.{FEED_FORMATS[fmt][1]}'
+
+def chunked(parts):
+    """Join rendered parts into chunks of about CHUNK_JOBS jobs, encoded as UTF-8"""
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= CHUNK_JOBS:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+def stream_feed(fmt, jobs, last_updated=None, path=None):
+    """
+    Render a feed chunk by chunk, also writing it to `path` if given
+
+    The file is moved into place only once the whole feed was rendered, so
+    a client that disconnects halfway leaves no partial feed behind.
+    Previously cached versions of the same format are removed then.
+    """
+    chunks = chunked(FEED_FORMATS[fmt][2](jobs, last_updated))
+    if path is None:
+        yield from chunks
+        return
+
+    os.makedirs(path.parent, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name, suffix='.tmp')
+    complete = False
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        complete = True
+    finally:
+        if not complete and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    for old in path.parent.glob(f'feed-*{path.suffix}'):
+        if old != path:
+            try:
+                old.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,97 @@
+import threading
+import time
+
+class PendingMutation:
+    """A mutation waiting in a group commit, and the outcome handed back to its caller"""
+
+    __slots__ = ('mutate', 'result', 'error', 'leads', 'wake')
+
+    def __init__(self, mutate):
+        self.mutate = mutate
+        self.result = None
+        self.error = None
+        self.leads = False
+        self.wake = threading.Event()
+
+
+class GroupCommitter:
+    """
+    Coalesces concurrent job mutations into one transaction and one write
+
+    Callers submit mutations from their request threads. The first caller of
+    a batch becomes its leader: it waits up to `window` seconds (or until
+    `max_batch` mutations are pending) for others to join, then runs
+    `commit(batch)`, which must apply every mutation and persist them with a
+    single write. Mutations arriving while a batch is being written wait for
+    the next one, whose leader is promoted as soon as the write finishes, so
+    even with no window a burst of writes is persisted in a few large
+    batches instead of one write each.
+
+    Every caller returns only once the batch holding its mutation is durable,
+    with its own result or exception.
+    """
+
+    def __init__(self, commit, window=0.0, max_batch=100):
+        self.commit = commit
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._condition = threading.Condition()
+        self._pending = []
+        self._leading = False
+
+    def submit(self, mutate):
+        """Run `mutate` in the next batch and return its result once the batch is persisted"""
+        request = PendingMutation(mutate)
+
+        with self._condition:
+            self._pending.append(request)
+            if not self._leading:
+                self._leading = request.leads = True
+                window = self.window
+            elif len(self._pending) >= self.max_batch:
+                self._condition.notify()
+
+        if not request.leads:
+            request.wake.wait()
+            # Promoted to lead the batch that queued up during the last write
+            window = 0
+
+        if request.leads:
+            self.lead(window)
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def lead(self, window):
+        """Collect a batch, commit it, then hand leadership to the next pending mutation"""
+        with self._condition:
+            if window > 0:
+                deadline = time.monotonic() + window
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+
+        try:
+            self.commit(batch)
+        except BaseException as e:
+            for request in batch:
+                if request.error is None:
+                    request.result = None
+                    request.error = e
+        finally:
+            with self._condition:
+                if self._pending:
+                    successor = self._pending[0]
+                    successor.leads = True
+                    successor.wake.set()
+                else:
+                    self._leading = False
+
+            for request in batch:
+                request.wake.set()
@@ -0,0 +1,119 @@
+import codecs
+import csv
+import json
+
+# Streams of job postings uploaded in bulk by employers. Each row holds the
+# same fields as the JSON body of POST /api/jobs/ (title, location, jobType,
+# experienceLevel, salaryRange, ...), as CSV columns or one JSON object per
+# line (NDJSON).
+
+BULK_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/x-jsonlines': 'ndjson',
+}
+BULK_EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+# CSV cells are text, so these columns are read as booleans; an empty cell
+# leaves the column out like a missing NDJSON key
+BOOLEAN_COLUMNS = ('remote', 'urgent', 'featured')
+TRUE_VALUES = frozenset(('true', 'yes', 'y', '1'))
+FALSE_VALUES = frozenset(('false', 'no', 'n', '0'))
+
+
+class BulkImportError(ValueError):
+    """Raised when an uploaded file can't be read at all, as opposed to one bad row"""
+
+
+def detect_format(content_type, filename=None):
+    """Return 'csv' or 'ndjson' from a content type or file name, or None"""
+    fmt = BULK_CONTENT_TYPES.get((content_type or '').split(';')[0].strip().lower())
+    if fmt is None and filename:
+        for extension, extension_format in BULK_EXTENSIONS.items():
+            if filename.lower().endswith(extension):
+                return extension_format
+    return fmt
+
+def parse_boolean(value):
+    """Read a boolean sent as JSON or as text like a CSV cell, or return None if it is neither"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+    return None
+
+def decode_lines(stream):
+    """Decode an iterable of UTF-8 byte lines lazily, dropping a byte order mark"""
+    return codecs.iterdecode(stream, 'utf-8-sig')
+
+def iter_csv_rows(lines):
+    """Yield (row_number, payload or None, error or None) for each CSV data row"""
+    reader = csv.DictReader(lines)
+    for row_number, row in enumerate(reader, 1):
+        if None in row:
+            yield row_number, None, 'Row has more columns than the header'
+            continue
+
+        payload = {}
+        invalid_columns = []
+        for column, value in row.items():
+            value = (value or '').strip()
+            if not value:
+                continue
+            if column in BOOLEAN_COLUMNS:
+                value = parse_boolean(value)
+                if value is None:
+                    invalid_columns.append(column)
+            payload[column] = value
+
+        if invalid_columns:
+            yield row_number, None, f'Invalid values for fields: {", ".join(invalid_columns)}'
+        else:
+            yield row_number, payload, None
+
+def iter_ndjson_rows(lines):
+    """Yield (row_number, payload or None, error or None) for each non-blank NDJSON line"""
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+
+        row_number += 1
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f'Invalid JSON: {e.msg}'
+            continue
+
+        if not isinstance(payload, dict):
+            yield row_number, None, 'Row must be a JSON object'
+            continue
+        yield row_number, payload, None
+
+def iter_rows(stream, fmt):
+    """
+    Stream-parse uploaded job rows
+
+    `stream` is an iterable of byte lines, such as the request or an
+    uploaded file. Raises BulkImportError when the file isn't UTF-8 or isn't
+    valid CSV; errors confined to one row are yielded with that row.
+    """
+    lines = decode_lines(stream)
+    rows = iter_csv_rows(lines) if fmt == 'csv' else iter_ndjson_rows(lines)
+    try:
+        yield from rows
+    except UnicodeDecodeError:
+        raise BulkImportError('File is not valid UTF-8')
+    except csv.Error as e:
+        raise BulkImportError(f'Invalid CSV: {e}')
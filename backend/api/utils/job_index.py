@@ -0,0 +1,560 @@
+import bisect
+import heapq
+import math
+import re
+import sys
+
+# Fields matched by the `search` filter, with their weight for relevance ranking
+SEARCH_FIELDS = ('title', 'description', 'company_name', 'location')
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'company_name': 2.0,
+    'location': 1.5,
+    'description': 1.0,
+}
+
+# Fields with a small set of values that can be filtered on and counted
+FACET_FIELDS = ('job_type', 'experience_level', 'remote', 'urgent', 'featured')
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weighted term frequencies and lengths are stored as integers in units of
+# 1 / TERM_WEIGHT_SCALE, so postings hold small cached ints instead of floats
+TERM_WEIGHT_SCALE = 2
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Amounts in a salary range, with an optional "k" for thousands
+SALARY_AMOUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(k\b)?')
+SALARY_PERIOD_PATTERN = re.compile(r'(?:/|\bper)\s*(hour|hr|month|mo)\b')
+# Hourly and monthly pay are converted to yearly amounts so ranges compare
+SALARY_PERIOD_MULTIPLIERS = {'hour': 2080, 'hr': 2080, 'month': 12, 'mo': 12}
+
+# Sort orders the index can walk, besides search relevance
+SORTED_ORDERS = ('newest', 'salary_desc')
+
+def tokenize(text):
+    """Split text into case-folded word tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).casefold())
+
+def normalize_skill(skill):
+    """Normalize a skill name for case-insensitive matching"""
+    return str(skill).strip().casefold()
+
+def bm25_idf(doc_count, doc_frequency):
+    """Inverse document frequency of a term found in `doc_frequency` of `doc_count` jobs"""
+    return math.log(1 + (doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+
+def bm25_score(idf, frequency, doc_length, average_length):
+    """BM25 contribution of one term, given its frequency and length in TERM_WEIGHT_SCALE units"""
+    frequency /= TERM_WEIGHT_SCALE
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / average_length)
+    return idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+def parse_salary_range(salary_range):
+    """
+    Parse a free-form salary range into yearly (min, max) integer amounts
+
+    Handles "100000-120000", "60000 - 80000", "60k-80k" and "600/hour".
+    A single amount gives min == max. Returns (None, None) when the text
+    holds no amount.
+    """
+    if not salary_range:
+        return (None, None)
+
+    text = str(salary_range).casefold().replace(',', '')
+    amounts = [
+        float(number) * (1000 if thousands else 1)
+        for number, thousands in SALARY_AMOUNT_PATTERN.findall(text)
+    ][:2]
+    if not amounts:
+        return (None, None)
+
+    period = SALARY_PERIOD_PATTERN.search(text)
+    multiplier = SALARY_PERIOD_MULTIPLIERS[period.group(1)] if period else 1
+    return (int(min(amounts) * multiplier), int(max(amounts) * multiplier))
+
+def salary_bounds(job):
+    """Return a job's numeric (min, max) salary, parsing it for jobs saved without one"""
+    if "salary_min" in job or "salary_max" in job:
+        return (job.get("salary_min"), job.get("salary_max"))
+    return parse_salary_range(job.get("salary_range"))
+
+
+class SearchIndex:
+    """
+    Inverted index from search terms to the IDs of the jobs containing them
+
+    A query matches the jobs where every query term is a prefix of some word
+    in one of the SEARCH_FIELDS, so "dev" still finds "Developer". Prefixes
+    are resolved with a bisect over the sorted vocabulary, and multi-term
+    queries intersect the posting lists starting with the smallest one.
+
+    Each posting stores the job's field-weighted term frequency, and the
+    weighted length of every job is kept, so matches can be ranked with BM25
+    without looking at the job text again. Terms are interned, so the
+    vocabulary and the per-job term lists share one string per term.
+    """
+
+    def __init__(self):
+        # term -> {job_id: weighted term frequency}, both in TERM_WEIGHT_SCALE units
+        self.postings = {}
+        self.vocabulary = []
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def add(self, job, bulk=False):
+        frequencies = {}
+        length = 0
+        for field in SEARCH_FIELDS:
+            weight = int(FIELD_WEIGHTS[field] * TERM_WEIGHT_SCALE)
+            tokens = tokenize(job.get(field))
+            length += weight * len(tokens)
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + weight
+
+        job_id = job["id"]
+        terms = tuple(map(sys.intern, frequencies))
+        self.doc_terms[job_id] = terms
+        self.doc_lengths[job_id] = length
+        self.total_length += length
+
+        for term, frequency in zip(terms, frequencies.values()):
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                if not bulk:
+                    bisect.insort(self.vocabulary, term)
+            posting[job_id] = frequency
+
+    def finish_bulk(self):
+        """Sort the vocabulary once after a series of add(job, bulk=True)"""
+        self.vocabulary = sorted(self.postings)
+
+    def remove(self, job_id):
+        self.total_length -= self.doc_lengths.pop(job_id, 0)
+
+        for term in self.doc_terms.pop(job_id, ()):
+            posting = self.postings[term]
+            posting.pop(job_id, None)
+            if not posting:
+                del self.postings[term]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+
+    def expand_terms(self, prefix):
+        """Return the vocabulary terms starting with `prefix`"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + '\U0010ffff', start)
+        return self.vocabulary[start:end]
+
+    def expand(self, prefix):
+        """Return the set of job IDs containing a word that starts with `prefix`"""
+        matches = set()
+        for term in self.expand_terms(prefix):
+            matches.update(self.postings[term])
+        return matches
+
+    def search(self, query):
+        """Return the set of job IDs matching every term of `query`"""
+        terms = set(tokenize(query))
+        if not terms:
+            return set()
+
+        matches = sorted((self.expand(term) for term in terms), key=len)
+        result = matches[0]
+        for posting in matches[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+    def rank(self, query, job_ids, limit, positions):
+        """
+        Return the `limit` best matches among `job_ids` by BM25 score
+
+        Only the postings of the query terms are visited, and a bounded heap
+        keeps the top results, so the cost follows the number of matches
+        rather than the catalog size. Ties keep catalog order.
+        """
+        if limit <= 0 or not job_ids:
+            return []
+
+        doc_count = len(self.doc_lengths)
+        average_length = (self.total_length / doc_count) or 1.0
+        scores = dict.fromkeys(job_ids, 0.0)
+
+        for query_term in set(tokenize(query)):
+            for term in self.expand_terms(query_term):
+                posting = self.postings[term]
+                idf = bm25_idf(doc_count, len(posting))
+
+                # Walk whichever side is smaller
+                if len(posting) < len(scores):
+                    hits = ((job_id, posting[job_id]) for job_id in posting if job_id in scores)
+                else:
+                    hits = ((job_id, posting[job_id]) for job_id in scores if job_id in posting)
+
+                for job_id, frequency in hits:
+                    scores[job_id] += bm25_score(idf, frequency, self.doc_lengths[job_id], average_length)
+
+        best = heapq.nsmallest(
+            limit,
+            scores.items(),
+            key=lambda item: (-item[1], positions[item[0]])
+        )
+        return [job_id for job_id, _ in best]
+
+
+class SkillIndex:
+    """Index from normalized skill names to the IDs of the jobs requiring them"""
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_skills = {}
+
+    def add(self, job):
+        skills = {normalize_skill(skill) for skill in job.get("skills") or []}
+        skills.discard('')
+        skills = tuple(map(sys.intern, skills))
+
+        job_id = job["id"]
+        self.doc_skills[job_id] = skills
+        for skill in skills:
+            self.postings.setdefault(skill, set()).add(job_id)
+
+    def remove(self, job_id):
+        for skill in self.doc_skills.pop(job_id, ()):
+            posting = self.postings[skill]
+            posting.discard(job_id)
+            if not posting:
+                del self.postings[skill]
+
+    def match(self, skills, match_all=True):
+        """
+        Return the set of job IDs with all (or any) of the normalized `skills`
+        """
+        postings = [self.postings.get(skill, set()) for skill in skills]
+        if not postings:
+            return set()
+
+        if not match_all:
+            return set().union(*postings)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+
+class FacetIndex:
+    """
+    Index from each value of the FACET_FIELDS to the IDs of the jobs holding it
+
+    Answers equality filters on those fields and counts how many jobs of a
+    result set fall under each value without looking at the jobs themselves.
+    """
+
+    def __init__(self):
+        # field -> value -> set of job IDs
+        self.postings = {field: {} for field in FACET_FIELDS}
+        self.doc_values = {}
+
+    @staticmethod
+    def facet_value(value):
+        """Return a value that can be indexed, or None for a list or dict, which no filter can match"""
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        return value
+
+    def add(self, job):
+        values = tuple(self.facet_value(job.get(field)) for field in FACET_FIELDS)
+
+        job_id = job["id"]
+        self.doc_values[job_id] = values
+        for field, value in zip(FACET_FIELDS, values):
+            self.postings[field].setdefault(value, set()).add(job_id)
+
+    def remove(self, job_id):
+        values = self.doc_values.pop(job_id, None)
+        if values is None:
+            return
+
+        for field, value in zip(FACET_FIELDS, values):
+            posting = self.postings[field][value]
+            posting.discard(job_id)
+            if not posting:
+                del self.postings[field][value]
+
+    def match(self, field, value):
+        """Return the set of job IDs whose `field` equals `value`"""
+        return self.postings[field].get(value, set())
+
+    def counts(self, fields, job_ids=None):
+        """
+        Count the jobs per value of each facet field
+
+        Counts cover `job_ids`, or every job when it is None. Jobs without a
+        value for a field are left out of that field's counts.
+        """
+        counts = {}
+        for field in fields:
+            field_counts = {}
+            for value, posting in self.postings[field].items():
+                if value is None:
+                    continue
+                count = len(posting) if job_ids is None else len(posting & job_ids)
+                if count:
+                    field_counts[value] = count
+            counts[field] = field_counts
+        return counts
+
+
+class EmployerIndex:
+    """
+    Index from employer IDs to the IDs of their jobs, in catalog order
+
+    Lets an employer's listing touch only that employer's jobs. `positions`
+    is the catalog position map shared with JobIndex.
+    """
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.postings = {}
+        self.doc_employers = {}
+
+    def add(self, job, bulk=False):
+        job_id = job["id"]
+        employer_id = job.get("employer_id")
+        self.doc_employers[job_id] = employer_id
+
+        job_ids = self.postings.setdefault(employer_id, [])
+        if bulk:
+            # Bulk builds add jobs in catalog order already
+            job_ids.append(job_id)
+        else:
+            bisect.insort(job_ids, job_id, key=self.positions.__getitem__)
+
+    def remove(self, job_id):
+        if job_id not in self.doc_employers:
+            return
+
+        employer_id = self.doc_employers.pop(job_id)
+        job_ids = self.postings[employer_id]
+        job_ids.remove(job_id)
+        if not job_ids:
+            del self.postings[employer_id]
+
+    def job_ids(self, employer_id):
+        """Return the IDs of an employer's jobs in catalog order"""
+        return self.postings.get(employer_id, [])
+
+
+class SortedIndex:
+    """
+    Jobs kept sorted by a (key, job ID) pair, for ordered walks and range scans
+
+    `key` maps a job to its sort key. Jobs whose key is None are left out.
+    `range_key` picks the part of a key compared by ids_between, for keys
+    that carry a tie-breaker.
+    """
+
+    def __init__(self, key, range_key=None):
+        self.key = key
+        self.range_key = range_key or (lambda key: key)
+        self.entries = []
+        self.doc_entries = {}
+
+    def add(self, job, bulk=False):
+        key = self.key(job)
+        if key is None:
+            return
+
+        entry = (key, job["id"])
+        self.doc_entries[job["id"]] = entry
+        if bulk:
+            self.entries.append(entry)
+        else:
+            bisect.insort(self.entries, entry)
+
+    def finish_bulk(self):
+        """Sort the entries once after a series of add(job, bulk=True)"""
+        self.entries.sort()
+
+    def remove(self, job_id):
+        entry = self.doc_entries.pop(job_id, None)
+        if entry is None:
+            return
+
+        i = bisect.bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+
+    def iter_after(self, entry=None):
+        """Yield the (key, job ID) entries that sort after `entry`, in order"""
+        i = 0 if entry is None else bisect.bisect_right(self.entries, entry)
+        while i < len(self.entries):
+            yield self.entries[i]
+            i += 1
+
+    def iter_desc(self):
+        """Yield every (key, job ID) entry from the largest key down"""
+        return reversed(self.entries)
+
+    def ids_between(self, low=None, high=None):
+        """Return the set of job IDs whose range key lies within [low, high]"""
+        key = lambda entry: self.range_key(entry[0])
+        start = 0 if low is None else bisect.bisect_left(self.entries, low, key=key)
+        end = len(self.entries) if high is None else bisect.bisect_right(self.entries, high, key=key)
+        return {job_id for _, job_id in self.entries[start:end]}
+
+
+class JobIndex:
+    """
+    Secondary indexes over the jobs held in memory by the JSON backend
+
+    Built once when the catalog is loaded and kept up to date by add/remove
+    on every create, update and delete.
+    """
+
+    def __init__(self, jobs=()):
+        # Catalog position of each job, to return index hits in file order
+        self.positions = {}
+        self.next_position = 0
+        self.search = SearchIndex()
+        self.skills = SkillIndex()
+        self.facets = FacetIndex()
+        self.employers = EmployerIndex(self.positions)
+        # Jobs in (created_at, id) order for keyset pagination and sort=newest
+        self.created = SortedIndex(lambda job: job.get("created_at") or "")
+        # Jobs by top salary, newest first on ties, for sort=salary_desc and
+        # the salary_min filter; and by bottom salary for the salary_max filter
+        self.salary = SortedIndex(self.salary_key, range_key=lambda key: key[0])
+        self.salary_floor = SortedIndex(lambda job: salary_bounds(job)[0])
+
+        # Sorted structures are sorted once at the end instead of per job
+        for job in jobs:
+            self.add(job, bulk=True)
+        self.finish_bulk()
+
+    @staticmethod
+    def salary_key(job):
+        salary_max = salary_bounds(job)[1]
+        if salary_max is None:
+            return None
+        return (salary_max, job.get("created_at") or "")
+
+    def add(self, job, bulk=False):
+        job_id = job["id"]
+        if job_id not in self.positions:
+            self.positions[job_id] = self.next_position
+            self.next_position += 1
+
+        self.search.add(job, bulk)
+        self.skills.add(job)
+        self.facets.add(job)
+        self.employers.add(job, bulk)
+        self.created.add(job, bulk)
+        self.salary.add(job, bulk)
+        self.salary_floor.add(job, bulk)
+
+    def finish_bulk(self):
+        """
+        Sort the sorted structures once after a series of add(job, bulk=True)
+
+        Bulk adds must be new jobs, appended to the end of the catalog.
+        """
+        self.search.finish_bulk()
+        self.created.finish_bulk()
+        self.salary.finish_bulk()
+        self.salary_floor.finish_bulk()
+
+    def remove(self, job_id, keep_position=False):
+        self.search.remove(job_id)
+        self.skills.remove(job_id)
+        self.facets.remove(job_id)
+        self.employers.remove(job_id)
+        self.created.remove(job_id)
+        self.salary.remove(job_id)
+        self.salary_floor.remove(job_id)
+
+        if not keep_position:
+            self.positions.pop(job_id, None)
+
+    def replace(self, job):
+        """Re-index a job that was updated in place"""
+        self.remove(job["id"], keep_position=True)
+        self.add(job)
+
+    def select(self, filters):
+        """
+        Answer the indexed filters from the indexes
+
+        Removes the filters it handled from `filters` and returns the set of
+        matching job IDs, or None if no indexed filter was given.
+        """
+        candidates = None
+
+        search = filters.pop("search", None)
+        if search:
+            candidates = self.search.search(search)
+
+        skills = filters.pop("skills", None)
+        match_all = filters.pop("skills_match", "all") != "any"
+        if skills:
+            matches = self.skills.match(skills, match_all)
+            candidates = matches if candidates is None else candidates & matches
+
+        for field in FACET_FIELDS:
+            if field in filters:
+                matches = self.facets.match(field, filters.pop(field))
+                candidates = set(matches) if candidates is None else candidates & matches
+
+        if "employer_id" in filters:
+            matches = set(self.employers.job_ids(filters.pop("employer_id")))
+            candidates = matches if candidates is None else candidates & matches
+
+        # A job matches salary_min when its top salary reaches it, and
+        # salary_max when its bottom salary doesn't exceed it
+        salary_min = filters.pop("salary_min", None)
+        if salary_min is not None:
+            matches = self.salary.ids_between(low=salary_min)
+            candidates = matches if candidates is None else candidates & matches
+
+        salary_max = filters.pop("salary_max", None)
+        if salary_max is not None:
+            matches = self.salary_floor.ids_between(high=salary_max)
+            candidates = matches if candidates is None else candidates & matches
+
+        return candidates
+
+    def iter_sorted(self, sort):
+        """
+        Yield every job ID in one of the SORTED_ORDERS
+
+        "newest" is (created_at, id) descending. "salary_desc" is top salary
+        descending, newest first on ties, followed by the jobs without a
+        parseable salary, newest first.
+        """
+        if sort == "salary_desc":
+            for _, job_id in self.salary.iter_desc():
+                yield job_id
+            for _, job_id in self.created.iter_desc():
+                if job_id not in self.salary.doc_entries:
+                    yield job_id
+        else:
+            for _, job_id in self.created.iter_desc():
+                yield job_id
+
+    def in_order(self, job_ids):
+        """Sort a collection of job IDs into catalog order"""
+        return sorted(job_ids, key=self.positions.__getitem__)
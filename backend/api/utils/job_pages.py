@@ -0,0 +1,187 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .job_engines import atomic_write, file_lock
+
+# Pre-rendered /api/jobs/ listing pages for anonymous visitors.
+#
+# After job writes, the first JOB_STATIC_PAGES pages of the default listing
+# and of the most common filters are rendered to JOB_STATIC_PAGES_DIR (and
+# gzipped next to them when JOB_STATIC_PAGES_GZIP is set), with the exact
+# body /api/jobs/ would return. Each file is named after the query string
+# the job board (frontend/app/jobs/page.tsx) sends for that page, which puts
+# page and per_page first and then the filters in QUERY_ORDER
+# ("page=2&per_page=10&job_type=full-time.json"), so a reverse proxy can
+# answer anonymous reads without reaching Django, e.g. with nginx:
+#
+#   map $args $job_page { "" "page=1&per_page=10"; default $args; }
+#
+#   location = /api/jobs/ {
+#       if ($http_authorization) { proxy_pass http://django; }
+#       root /path/to/backend/media;  # parent of JOB_STATIC_PAGES_DIR
+#       gzip_static on;
+#       default_type application/json;
+#       try_files /job-pages/$job_page.json @django;
+#   }
+#
+# Anything else (other parameters, other orders, later pages) falls through
+# to Django. manifest.json lists the published files and the catalog version
+# they were rendered from.
+
+# Query parameters in the order the job board appends them; any others follow by name
+QUERY_ORDER = ('page', 'per_page', 'search', 'job_type', 'experience_level', 'location')
+
+logger = logging.getLogger(__name__)
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def page_name(filters, page, per_page):
+    """Return the file name of a listing page: its query string as the job board sends it"""
+    params = {**filters, 'page': page, 'per_page': per_page}
+    rank = {key: i for i, key in enumerate(QUERY_ORDER)}
+    ordered = sorted(params.items(), key=lambda item: (rank.get(item[0], len(rank)), item[0]))
+    return urlencode(ordered) + '.json'
+
+def query_value(value):
+    """Format a facet value the way it appears in a query string"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class JobPagePublisher:
+    """
+    Renders the static listing pages in a background thread
+
+    schedule() is called after every write; writes arriving while pages are
+    being rendered are coalesced into one more run. Runs in different
+    worker processes take turns on a lock file, and each renders the
+    catalog as it is when it gets the lock, so the newest pages win.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._thread = None
+
+    @property
+    def directory(self):
+        return Path(getattr(settings, 'JOB_STATIC_PAGES_DIR', Path(settings.MEDIA_ROOT) / 'job-pages'))
+
+    def enabled(self):
+        return getattr(settings, 'JOB_STATIC_PAGES', 5) > 0
+
+    def schedule(self):
+        """Re-render the pages soon, without blocking the caller"""
+        if not self.enabled():
+            return
+
+        with self._lock:
+            self._dirty = True
+            if self._thread is not None and self._thread.is_alive():
+                return
+            # Not a daemon thread, so management commands finish publishing before exiting
+            self._thread = threading.Thread(target=self._run, name='job-page-publisher')
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            # Let a burst of writes settle before rendering
+            time.sleep(getattr(settings, 'JOB_STATIC_PAGES_DELAY', 0.5))
+            with self._lock:
+                if not self._dirty:
+                    self._thread = None
+                    return
+                self._dirty = False
+
+            try:
+                self.publish()
+            except Exception:
+                # Stale pages are still served; the next write tries again
+                logger.exception('Publishing the static job pages failed')
+
+    def common_filters(self, get_jobs):
+        """Return the default listing and a filter for each of the most common facet values"""
+        fields = getattr(settings, 'JOB_STATIC_PAGE_FACETS', ['job_type', 'experience_level', 'remote'])
+        top = getattr(settings, 'JOB_STATIC_PAGE_TOP_VALUES', 3)
+
+        filters = [{}]
+        counts = get_jobs(1, 1, None, None, fields).get("facets", {})
+        for field in fields:
+            values = sorted(counts.get(field, {}).items(), key=lambda item: -item[1])
+            filters.extend({field: query_value(value)} for value, count in values[:top] if count)
+        return filters
+
+    def publish(self, force=False):
+        """
+        Render and write every static page for the current catalog
+
+        Returns the number of files written, or 0 if the pages were already
+        rendered from this catalog version (unless `force` is set).
+        """
+        # Imported here because job_storage schedules the publisher
+        from .job_storage import get_catalog_version, get_jobs
+
+        pages = getattr(settings, 'JOB_STATIC_PAGES', 5)
+        per_page = getattr(settings, 'JOB_STATIC_PAGE_SIZE', 10)
+        compress = getattr(settings, 'JOB_STATIC_PAGES_GZIP', True)
+        directory = self.directory
+        manifest_path = directory / 'manifest.json'
+
+        with file_lock(directory / 'publish.lock'):
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                manifest = {"version": None, "files": []}
+
+            version = get_catalog_version()
+            tag = version[0] if version is not None else None
+            if not force and tag is not None and tag == manifest["version"]:
+                return 0
+
+            files = []
+            for filters in self.common_filters(get_jobs):
+                for page in range(1, pages + 1):
+                    result = get_jobs(page, per_page, dict(filters))
+                    if page > 1 and page > result["pagination"]["total_pages"]:
+                        break
+
+                    body = json.dumps({'success': True, 'data': result}, cls=DjangoJSONEncoder).encode()
+                    name = page_name(filters, page, per_page)
+                    atomic_write(directory / name, lambda f: f.write(body), binary=True)
+                    files.append(name)
+                    if compress:
+                        atomic_write(directory / (name + '.gz'), lambda f: f.write(gzip.compress(body)), binary=True)
+                        files.append(name + '.gz')
+
+            atomic_write(manifest_path, lambda f: json.dump({"version": tag, "files": files}, f))
+
+            # Drop pages that no longer exist, e.g. after the catalog shrank
+            for name in set(manifest["files"]) - set(files):
+                try:
+                    os.remove(directory / name)
+                except FileNotFoundError:
+                    pass
+
+        return len(files)
+
+def get_page_publisher():
+    """Return the process-wide static page publisher"""
+    global _publisher
+
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = JobPagePublisher()
+        return _publisher
@@ -0,0 +1,129 @@
+import heapq
+import itertools
+
+from .job_index import SORTED_ORDERS
+from .job_storage import paginate, build_page, build_cursor_page
+
+# Query planning shared by the backends that answer get_jobs from their own
+# indexes ('json' and 'shared').
+#
+# The planner works over a catalog view; each backend adapts its indexes to
+# the same methods, identifying jobs by whatever key suits it (job IDs for
+# the in-process catalog, job numbers for the shared index file):
+#
+#   len(view)                      -> number of jobs in the catalog
+#   keys()                         -> every job key in catalog order, as a sequence
+#   in_order(keys)                 -> a collection of keys sorted into catalog order
+#   select(filters)                -> set of keys matching the indexed filters, or None
+#                                     for every job; removes the filters it handled
+#   matches(key, filters)          -> whether the job passes the remaining filters
+#   job(key)                       -> the job as a fresh dict the caller may modify
+#   created_key(key)               -> the job's (created_at, id)
+#   iter_created_after(after)      -> keys following the (created_at, id) `after`, in that order
+#   rank(query, keys, limit)       -> the `limit` best of `keys` for a search query
+#   iter_sorted(sort)              -> every key in one of the SORTED_ORDERS
+#   facet_counts(fields, keys)     -> {field: {value: count}} over `keys`, or every job for None
+
+def matches_filters(job, filters):
+    """Check the filters the indexes don't cover by plain equality"""
+    for key, value in filters.items():
+        if job.get(key) != value:
+            return False
+    return True
+
+def filter_keys(view, candidates, filters):
+    """Return the keys matching the index candidates and remaining filters, in catalog order"""
+    keys = view.in_order(candidates) if candidates is not None else view.keys()
+    if filters:
+        keys = [key for key in keys if view.matches(key, filters)]
+    return keys
+
+def match_keys(view, candidates, filters):
+    """
+    Return the set of keys matching the index candidates and remaining filters
+
+    Unlike filter_keys the matches are not put in catalog order. Returns
+    None (every job) when there are neither candidates nor filters.
+    """
+    if not filters:
+        return candidates
+
+    keys = view.keys() if candidates is None else candidates
+    return {key for key in keys if view.matches(key, filters)}
+
+def cursor_page(view, candidates, filters, per_page, after, walk=True):
+    """
+    Collect the page of matching jobs following `after` in (created_at, id) order
+
+    Without index candidates the sorted created_at index is walked from the
+    cursor and the walk stops as soon as the page is full. A small candidate
+    set is cheaper to order directly with a bounded heap: walking costs about
+    per_page * total / matches steps, the heap about one per match. With
+    walk=False the candidates are always ordered with the heap, so the cost
+    never depends on the catalog size.
+    """
+    after = after or None
+
+    if candidates is not None and (not walk or len(candidates) ** 2 < len(view) * (per_page + 1)):
+        entries = ((view.created_key(key), key) for key in candidates)
+        if after is not None:
+            entries = (entry for entry in entries if entry[0] > after)
+        entries = heapq.nsmallest(
+            per_page + 1,
+            (entry for entry in entries if view.matches(entry[1], filters))
+        )
+        keys = [key for _, key in entries]
+    else:
+        keys = itertools.islice(
+            (
+                key for key in view.iter_created_after(after)
+                if (candidates is None or key in candidates)
+                and view.matches(key, filters)
+            ),
+            per_page + 1
+        )
+
+    return build_cursor_page([view.job(key) for key in keys], per_page)
+
+def query_jobs(view, page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+    """Answer JobStorageBackend.get_jobs from a catalog view"""
+    filters = dict(filters or {})
+
+    search = filters.get("search")
+
+    # Narrow the candidates with the indexes before checking the
+    # remaining filters job by job
+    candidates = view.select(filters)
+
+    if after is not None:
+        result = cursor_page(view, candidates, filters, per_page, after)
+        if facets:
+            result["facets"] = view.facet_counts(facets, match_keys(view, candidates, filters))
+        return result
+
+    if sort == "relevance" and search:
+        # Rank the matches as they come; only the jobs up to the
+        # requested page are ever put in order
+        candidates = match_keys(view, candidates, filters)
+        ranked = view.rank(search, candidates, page * per_page)
+        page_jobs = [view.job(key) for key in ranked[(page - 1) * per_page:]]
+        result = build_page(page_jobs, len(candidates), page, per_page)
+    elif sort in SORTED_ORDERS:
+        # Walk the sorted index and stop at the end of the requested page
+        candidates = match_keys(view, candidates, filters)
+        ordered = view.iter_sorted(sort)
+        if candidates is not None:
+            ordered = (key for key in ordered if key in candidates)
+        page_keys = itertools.islice(ordered, (page - 1) * per_page, page * per_page)
+        total = len(view) if candidates is None else len(candidates)
+        result = build_page([view.job(key) for key in page_keys], total, page, per_page)
+    else:
+        keys = filter_keys(view, candidates, filters)
+        if filters:
+            candidates = set(keys)
+        result = paginate(keys, page, per_page, view.job)
+
+    if facets:
+        result["facets"] = view.facet_counts(facets, candidates)
+
+    return result
@@ -0,0 +1,100 @@
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class JobQueryCache:
+    """
+    Least-recently-used cache of job listing results
+
+    Entries are keyed by the normalized query and belong to one generation
+    of the job store: as soon as the backend reports another generation
+    (after any create, update or delete, in this process or another) the
+    whole cache is dropped. Cached results are shared between requests and
+    must not be modified.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a cache key from JSON-serializable query parts, ignoring dict key order"""
+        return json.dumps(parts, sort_keys=True, default=list)
+
+    def get_or_compute(self, generation, key, compute):
+        """
+        Return the cached result for `key`, or compute and cache it
+
+        `generation` must be read before `compute` runs, so a result is
+        never cached under a newer generation than the data it was built
+        from. A generation of None disables caching.
+        """
+        if generation is None or self.max_entries <= 0:
+            return compute()
+
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._generation = generation
+
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        # Computed outside the lock; concurrent misses on one key both compute
+        result = compute()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+def get_query_cache():
+    """Return the process-wide job listing cache sized by settings.JOB_QUERY_CACHE_SIZE"""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = JobQueryCache(getattr(settings, 'JOB_QUERY_CACHE_SIZE', 256))
+        return _cache
@@ -0,0 +1,98 @@
+import sys
+from collections.abc import Mapping
+
+# Fields of a job in the order they appear in jobs.json. Each gets a slot on
+# JobRecord; any other key a job carries is kept in its `extra` dict.
+RECORD_FIELDS = (
+    'title', 'location', 'job_type', 'experience_level', 'salary_range',
+    'description', 'requirements', 'responsibilities', 'benefits', 'skills',
+    'remote', 'urgent', 'featured', 'employer_id', 'company_name',
+    'id', 'created_at', 'updated_at', 'salary_min', 'salary_max'
+)
+RECORD_FIELD_SET = frozenset(RECORD_FIELDS)
+
+# Fields with few distinct values across the catalog. Their strings are
+# interned so every job holding the same value shares one object.
+INTERNED_FIELDS = frozenset((
+    'title', 'location', 'job_type', 'experience_level', 'salary_range',
+    'benefits', 'company_name'
+))
+
+def intern_value(value):
+    """Intern a string value, leaving anything else untouched"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class JobRecord(Mapping):
+    """
+    Compact, read-only in-memory form of a job for the JSON backend's cache
+
+    Values live in slots instead of a per-job dict, repeated strings are
+    interned and skills are kept as a tuple of interned names. Records read
+    like the job dicts they replace (get, [], in, iteration), so the indexes
+    and filters work on either, and dict(record) gives back the response
+    shape with skills as a list. Missing fields stay missing.
+    """
+
+    __slots__ = RECORD_FIELDS + ('extra',)
+
+    def __init__(self, job):
+        extra = None
+        for key, value in job.items():
+            if key not in RECORD_FIELD_SET:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            elif key in INTERNED_FIELDS:
+                object.__setattr__(self, key, intern_value(value))
+            elif key == 'skills' and isinstance(value, list):
+                object.__setattr__(self, key, tuple(intern_value(skill) for skill in value))
+            else:
+                object.__setattr__(self, key, value)
+        object.__setattr__(self, 'extra', extra)
+
+        # Jobs that were never edited share one timestamp string
+        if job.get('updated_at') is not None and job.get('updated_at') == job.get('created_at'):
+            object.__setattr__(self, 'updated_at', self.created_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Job records are read-only; store a new record instead')
+
+    def __getitem__(self, key):
+        if key in RECORD_FIELD_SET:
+            try:
+                value = object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return list(value) if key == 'skills' and type(value) is tuple else value
+
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        if key in RECORD_FIELD_SET:
+            value = getattr(self, key, default)
+            return list(value) if key == 'skills' and type(value) is tuple else value
+
+        if self.extra is None:
+            return default
+        return self.extra.get(key, default)
+
+    def __contains__(self, key):
+        if key in RECORD_FIELD_SET:
+            return hasattr(self, key)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for key in RECORD_FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'JobRecord({dict(self)!r})'
@@ -0,0 +1,63 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# Synthetic job catalogs for the storage benchmarks
+
+TITLES = ['Software Engineer', 'Frontend Developer', 'Backend Developer', 'Data Scientist',
+          'Product Manager', 'DevOps Engineer', 'UX Designer', 'QA Engineer', 'Mobile Developer',
+          'Machine Learning Engineer', 'Technical Writer', 'Support Engineer']
+LEVELS = ['Junior', 'Senior', 'Lead', 'Staff', 'Principal', '']
+LOCATIONS = ['San Francisco, CA', 'New York, NY', 'Austin, TX', 'Remote', 'Bengaluru, India',
+             'London, UK', 'Berlin, Germany', 'Toronto, Canada', 'Chennai, India', 'Seattle, WA']
+JOB_TYPES = ['full-time', 'part-time', 'contract', 'internship', 'temporary']
+EXPERIENCE_LEVELS = ['entry', 'intermediate', 'senior', 'executive']
+SKILLS = ['JavaScript', 'React', 'Node.js', 'Python', 'Django', 'SQL', 'AWS', 'Docker',
+          'Kubernetes', 'Java', 'Go', 'TypeScript', 'Figma', 'Machine Learning', 'CSS']
+SENTENCES = [
+    'We are looking for a motivated engineer to join our growing team.',
+    'You will build and maintain customer facing web applications.',
+    'Our stack is modern and we deploy many times a day.',
+    'You will work closely with design and product to ship features.',
+    'Experience with distributed systems is a plus.',
+    'We value clear communication and ownership.',
+    'The role includes mentoring junior team members.',
+    'You will help scale our platform to millions of users.',
+    'We offer flexible hours and a remote friendly culture.',
+    'You will participate in code reviews and architecture discussions.',
+    'Strong problem solving skills are essential.',
+    'Prior startup experience is appreciated.',
+]
+
+def generate_jobs(count, seed=0):
+    """Generate `count` synthetic jobs in the jobs.json layout"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    companies = [f'Company {i}' for i in range(max(1, count // 50))]
+
+    jobs = []
+    for i in range(count):
+        employer_id = rng.randrange(len(companies))
+        low = rng.randrange(20, 200) * 1000
+        timestamp = (start + timedelta(seconds=i * 37)).isoformat()
+        jobs.append({
+            "title": f'{rng.choice(LEVELS)} {rng.choice(TITLES)}'.strip(),
+            "location": rng.choice(LOCATIONS),
+            "job_type": rng.choice(JOB_TYPES),
+            "experience_level": rng.choice(EXPERIENCE_LEVELS),
+            "salary_range": f'{low}-{low + rng.randrange(5, 50) * 1000}',
+            "description": ' '.join(rng.sample(SENTENCES, rng.randrange(3, 7))),
+            "requirements": ' '.join(rng.sample(SENTENCES, 2)),
+            "responsibilities": ' '.join(rng.sample(SENTENCES, 2)),
+            "benefits": 'Health insurance, 401(k) matching',
+            "skills": rng.sample(SKILLS, rng.randrange(1, 6)),
+            "remote": rng.random() < 0.3,
+            "urgent": rng.random() < 0.1,
+            "featured": rng.random() < 0.05,
+            "employer_id": employer_id,
+            "company_name": companies[employer_id],
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        })
+    return jobs
@@ -0,0 +1,439 @@
+import array
+import bisect
+import heapq
+import json
+import mmap
+import struct
+import sys
+
+from .job_engines import atomic_write
+from .job_index import FACET_FIELDS, bm25_idf, bm25_score, salary_bounds, tokenize
+from .job_query import matches_filters
+
+# Read-optimized copy of the job catalog and its indexes in one file that
+# every worker process maps read-only, so the catalog occupies the page
+# cache once instead of being parsed into each worker's heap.
+#
+# The process that changed the catalog serializes its jobs and JobIndex
+# into flat arrays and atomically replaces the file. Jobs are referred to by
+# number, their position in catalog order.
+#
+# Layout: MAGIC, u32 header length, header JSON, then 8-byte aligned
+# sections listed in header["sections"] as name -> [offset, length, typecode]:
+#
+#   records             compact JSON of each job, by number
+#   ids, id_order       ID of each job, and the numbers sorted by ID
+#   created, created_order
+#                       created_at of each job, and the numbers sorted by
+#                       (created_at, id)
+#   salary_min, salary_max
+#                       yearly salary bounds of each job, -1 when unknown
+#   salary_order        numbers with a salary by (salary_max, created_at, id)
+#   salary_floor_order  numbers with a salary by (salary_min, id)
+#   doc_lengths         weighted length of each job for BM25
+#
+# String sections come with an "<name>_offsets" section of u64 offsets.
+# Postings ("search", "skills", "employers" and "facet_<field>") are stored
+# as sorted "<name>_keys" strings, with the ascending job numbers of key i in
+# "<name>_docs" between "<name>_doc_offsets" i and i + 1. Search postings
+# also hold "search_weights". Employer and facet keys are JSON encoded values.
+
+MAGIC = b'JOBIDX\x00\x01'
+LENGTH = struct.Struct('<I')
+ALIGN = 8
+
+def signature_key(signature):
+    """Encode a storage engine signature so it can be stored and compared"""
+    return json.dumps(signature)
+
+
+class SectionWriter:
+    """Collects the sections of a shared index file"""
+
+    def __init__(self):
+        self.sections = {}
+        self.chunks = []
+        self.size = 0
+
+    def add(self, name, data):
+        if isinstance(data, array.array):
+            typecode = data.typecode
+            payload = data.tobytes()
+        else:
+            typecode = 'B'
+            payload = bytes(data)
+
+        padding = -self.size % ALIGN
+        if padding:
+            self.chunks.append(b'\0' * padding)
+            self.size += padding
+
+        self.sections[name] = [self.size, len(payload), typecode]
+        self.chunks.append(payload)
+        self.size += len(payload)
+
+    def add_strings(self, name, strings):
+        offsets = array.array('Q', [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode('utf-8')
+            offsets.append(len(blob))
+
+        self.add(name + '_offsets', offsets)
+        self.add(name, blob)
+
+    def add_postings(self, name, postings, numbers, weighted=False):
+        """Add (key, job IDs) postings, where weighted postings map job IDs to term frequencies"""
+        keys = []
+        doc_offsets = array.array('Q', [0])
+        docs = array.array('I')
+        weights = array.array('I')
+
+        for key, job_ids in postings:
+            keys.append(key)
+            if weighted:
+                pairs = sorted((numbers[job_id], weight) for job_id, weight in job_ids.items())
+                docs.extend(number for number, _ in pairs)
+                weights.extend(weight for _, weight in pairs)
+            else:
+                docs.extend(sorted(numbers[job_id] for job_id in job_ids))
+            doc_offsets.append(len(docs))
+
+        self.add_strings(name + '_keys', keys)
+        self.add(name + '_doc_offsets', doc_offsets)
+        self.add(name + '_docs', docs)
+        if weighted:
+            self.add(name + '_weights', weights)
+
+    def write(self, f, header):
+        encoded = json.dumps(header, separators=(',', ':')).encode()
+        f.write(MAGIC)
+        f.write(LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        f.write(b'\0' * (-(len(MAGIC) + LENGTH.size + len(encoded)) % ALIGN))
+        for chunk in self.chunks:
+            f.write(chunk)
+
+def write_shared_index(path, data, source_signature):
+    """
+    Atomically write the shared index file for an in-memory catalog
+
+    `data` is the {"meta", "jobs", "index"} catalog of the JSON backend and
+    `source_signature` the storage engine signature it was loaded from.
+    """
+    jobs = data["jobs"]
+    index = data["index"]
+    numbers = {job_id: number for number, job_id in enumerate(jobs)}
+    ids = list(jobs)
+
+    writer = SectionWriter()
+    writer.add_strings('records', (json.dumps(dict(job), separators=(',', ':')) for job in jobs.values()))
+    writer.add_strings('ids', ids)
+    writer.add('id_order', array.array('I', sorted(range(len(ids)), key=ids.__getitem__)))
+
+    writer.add_strings('created', (job.get("created_at") or "" for job in jobs.values()))
+    writer.add('created_order', array.array('I', (numbers[job_id] for _, job_id in index.created.entries)))
+
+    bounds = [salary_bounds(job) for job in jobs.values()]
+    writer.add('salary_min', array.array('q', (-1 if low is None else low for low, _ in bounds)))
+    writer.add('salary_max', array.array('q', (-1 if high is None else high for _, high in bounds)))
+    writer.add('salary_order', array.array('I', (numbers[job_id] for _, job_id in index.salary.entries)))
+    writer.add('salary_floor_order', array.array('I', (numbers[job_id] for _, job_id in index.salary_floor.entries)))
+
+    search = index.search
+    writer.add_postings('search', ((term, search.postings[term]) for term in search.vocabulary), numbers, weighted=True)
+    writer.add('doc_lengths', array.array('I', (search.doc_lengths[job_id] for job_id in jobs)))
+
+    writer.add_postings('skills', sorted(index.skills.postings.items()), numbers)
+    writer.add_postings('employers', sorted(
+        (json.dumps(employer_id), job_ids) for employer_id, job_ids in index.employers.postings.items()
+    ), numbers)
+    for field in FACET_FIELDS:
+        writer.add_postings('facet_' + field, sorted(
+            (json.dumps(value), job_ids) for value, job_ids in index.facets.postings[field].items()
+        ), numbers)
+
+    header = {
+        "meta": data["meta"],
+        "count": len(jobs),
+        "total_length": search.total_length,
+        "source": signature_key(source_signature),
+        "byteorder": sys.byteorder,
+        "sections": writer.sections
+    }
+    atomic_write(path, lambda f: writer.write(f, header), binary=True)
+
+
+class StringTable:
+    """Strings of a section, readable by position and searchable when sorted"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.raw(i), 'utf-8')
+
+    def raw(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]]
+
+    def find(self, key):
+        """Return the position of `key` in a sorted table, or None"""
+        i = bisect.bisect_left(self, key)
+        if i < len(self) and self[i] == key:
+            return i
+        return None
+
+    def prefix_range(self, prefix):
+        """Return the positions of the strings starting with `prefix` in a sorted table"""
+        start = bisect.bisect_left(self, prefix)
+        return range(start, bisect.bisect_left(self, prefix + '\U0010ffff', start))
+
+
+class PostingsTable:
+    """Sorted keys with the ascending job numbers (and weights) stored for each"""
+
+    def __init__(self, keys, doc_offsets, docs, weights=None):
+        self.keys = keys
+        self.doc_offsets = doc_offsets
+        self.docs = docs
+        self.weights = weights
+
+    def docs_at(self, slot):
+        return self.docs[self.doc_offsets[slot]:self.doc_offsets[slot + 1]]
+
+    def weights_at(self, slot):
+        return self.weights[self.doc_offsets[slot]:self.doc_offsets[slot + 1]]
+
+    def get(self, key):
+        """Return the job numbers stored for `key`"""
+        slot = self.keys.find(key)
+        return self.docs_at(slot) if slot is not None else self.docs[0:0]
+
+
+class SharedJobIndex:
+    """
+    Read-only view of a shared index file
+
+    Every lookup reads the mapped file, so the only per-process memory is
+    the header and a handful of memoryviews. The mapping stays valid after
+    a newer generation replaced the file, until the view is dropped.
+
+    Serves as a job_query catalog view keyed by job number.
+
+    Raises ValueError when the file isn't a shared index for this machine.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError('Not a shared job index file')
+
+        offset = len(MAGIC)
+        (header_length,) = LENGTH.unpack_from(view, offset)
+        offset += LENGTH.size
+        header = json.loads(bytes(view[offset:offset + header_length]))
+        offset += header_length
+        data_start = offset + (-offset % ALIGN)
+
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError('Shared job index was written on a machine with another byte order')
+
+        sections = {}
+        for name, (section_offset, length, typecode) in header["sections"].items():
+            start = data_start + section_offset
+            if start + length > len(view):
+                raise ValueError('Truncated shared job index file')
+            section = view[start:start + length]
+            sections[name] = section.cast(typecode) if typecode != 'B' else section
+
+        self.meta = header["meta"]
+        self.count = header["count"]
+        self.total_length = header["total_length"]
+        self.source = header["source"]
+
+        def strings(name):
+            return StringTable(sections[name + '_offsets'], sections[name])
+
+        def postings(name, weighted=False):
+            return PostingsTable(
+                strings(name + '_keys'),
+                sections[name + '_doc_offsets'],
+                sections[name + '_docs'],
+                sections[name + '_weights'] if weighted else None
+            )
+
+        self.records = strings('records')
+        self.ids = strings('ids')
+        self.id_order = sections['id_order']
+        self.created = strings('created')
+        self.created_order = sections['created_order']
+        self.salary_min = sections['salary_min']
+        self.salary_max = sections['salary_max']
+        self.salary_order = sections['salary_order']
+        self.salary_floor_order = sections['salary_floor_order']
+        self.doc_lengths = sections['doc_lengths']
+        self.search_postings = postings('search', weighted=True)
+        self.skill_postings = postings('skills')
+        self.employer_postings = postings('employers')
+        self.facet_postings = {field: postings('facet_' + field) for field in FACET_FIELDS}
+
+    def __len__(self):
+        return self.count
+
+    def keys(self):
+        return range(self.count)
+
+    def in_order(self, numbers):
+        # Numbers are catalog positions
+        return sorted(numbers)
+
+    def matches(self, number, filters):
+        return not filters or matches_filters(self.job(number), filters)
+
+    def job(self, number):
+        """Decode a job into a fresh dict"""
+        return json.loads(bytes(self.records.raw(number)))
+
+    def number(self, job_id):
+        """Return the number of the job with `job_id`, or None"""
+        i = bisect.bisect_left(self.id_order, job_id, key=self.ids.__getitem__)
+        if i < len(self.id_order) and self.ids[self.id_order[i]] == job_id:
+            return self.id_order[i]
+        return None
+
+    def employer_jobs(self, employer_id):
+        """Return the numbers of an employer's jobs in catalog order"""
+        return self.employer_postings.get(json.dumps(employer_id))
+
+    def created_key(self, number):
+        return (self.created[number], self.ids[number])
+
+    def search(self, query):
+        """Return the set of job numbers matching every term of `query` as a prefix"""
+        terms = set(tokenize(query))
+        if not terms:
+            return set()
+
+        matches = []
+        for term in terms:
+            docs = set()
+            for slot in self.search_postings.keys.prefix_range(term):
+                docs.update(self.search_postings.docs_at(slot))
+            matches.append(docs)
+
+        matches.sort(key=len)
+        result = matches[0]
+        for docs in matches[1:]:
+            if not result:
+                break
+            result &= docs
+        return result
+
+    def select(self, filters):
+        """
+        Answer the indexed filters like JobIndex.select, with job numbers
+
+        Removes the filters it handled from `filters` and returns the set of
+        matching job numbers, or None if no indexed filter was given.
+        """
+        matches = []
+
+        search = filters.pop("search", None)
+        if search:
+            matches.append(self.search(search))
+
+        skills = filters.pop("skills", None)
+        match_all = filters.pop("skills_match", "all") != "any"
+        if skills:
+            skill_docs = [set(self.skill_postings.get(skill)) for skill in skills]
+            if match_all:
+                matches.extend(skill_docs)
+            else:
+                matches.append(set().union(*skill_docs))
+
+        for field in FACET_FIELDS:
+            if field in filters:
+                matches.append(set(self.facet_postings[field].get(json.dumps(filters.pop(field)))))
+
+        if "employer_id" in filters:
+            matches.append(set(self.employer_jobs(filters.pop("employer_id"))))
+
+        salary_min = filters.pop("salary_min", None)
+        if salary_min is not None:
+            start = bisect.bisect_left(self.salary_order, salary_min, key=self.salary_max.__getitem__)
+            matches.append(set(self.salary_order[start:]))
+
+        salary_max = filters.pop("salary_max", None)
+        if salary_max is not None:
+            end = bisect.bisect_right(self.salary_floor_order, salary_max, key=self.salary_min.__getitem__)
+            matches.append(set(self.salary_floor_order[:end]))
+
+        if not matches:
+            return None
+
+        matches.sort(key=len)
+        result = matches[0]
+        for docs in matches[1:]:
+            result &= docs
+        return result
+
+    def rank(self, query, numbers, limit):
+        """Return the `limit` best of `numbers` by BM25 score, like SearchIndex.rank"""
+        if limit <= 0 or not numbers:
+            return []
+
+        average_length = (self.total_length / self.count) or 1.0
+        scores = dict.fromkeys(numbers, 0.0)
+        postings = self.search_postings
+
+        for query_term in set(tokenize(query)):
+            for slot in postings.keys.prefix_range(query_term):
+                docs = postings.docs_at(slot)
+                idf = bm25_idf(self.count, len(docs))
+                for number, frequency in zip(docs, postings.weights_at(slot)):
+                    if number in scores:
+                        scores[number] += bm25_score(idf, frequency, self.doc_lengths[number], average_length)
+
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [number for number, _ in best]
+
+    def iter_sorted(self, sort):
+        """Yield every job number in one of the SORTED_ORDERS, like JobIndex.iter_sorted"""
+        if sort == "salary_desc":
+            yield from reversed(self.salary_order)
+            for number in reversed(self.created_order):
+                if self.salary_max[number] < 0:
+                    yield number
+        else:
+            yield from reversed(self.created_order)
+
+    def iter_created_after(self, after=None):
+        """Yield the job numbers following the (created_at, id) `after` in that order"""
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right(self.created_order, after, key=self.created_key)
+        return iter(self.created_order[start:])
+
+    def facet_counts(self, fields, numbers=None):
+        """Count the jobs per value of each facet field, like FacetIndex.counts"""
+        counts = {}
+        for field in fields:
+            postings = self.facet_postings[field]
+            field_counts = {}
+            for slot in range(len(postings.keys)):
+                value = json.loads(postings.keys[slot])
+                if value is None:
+                    continue
+                docs = postings.docs_at(slot)
+                count = len(docs) if numbers is None else len(numbers.intersection(docs))
+                if count:
+                    field_counts[value] = count
+            counts[field] = field_counts
+        return counts
@@ -0,0 +1,213 @@
+import array
+import gc
+import itertools
+import json
+import struct
+import sys
+from pathlib import Path
+
+from .job_engines import atomic_write, file_lock, file_signature, get_default_structure, read_snapshot
+
+# Binary snapshot of the job catalog, loaded much faster than the indented
+# jobs.json and holding repeated values only once in memory.
+#
+# Layout:
+#
+#   MAGIC
+#   u32 header length, header JSON:
+#       {"meta": {...}, "count": n, "columns": [{"name", "encoding", "length", "missing"}, ...]}
+#   one block of `length` bytes per column, encoded as:
+#       "dict": u32 length + JSON list of the distinct values, then one
+#               little-endian u32 index into that list per job
+#       "text": the UTF-8 strings joined by NUL characters
+#       "json": compact JSON list with one value per job
+#
+# A column holds one job field for every job, in catalog order, and "missing"
+# lists the jobs that don't have the field at all, so jobs round-trip exactly.
+# Repetitive fields (job_type, company_name, ...) are dictionary encoded: each
+# distinct value is decoded once and shared by every job holding it. Unique
+# strings are split out of one buffer at C speed instead of parsed as JSON.
+
+MAGIC = b'JOBSNAP\x02'
+LENGTH = struct.Struct('<I')
+
+# A column is dictionary encoded when it has at most this share of distinct values
+DICT_ENCODING_RATIO = 0.5
+
+TEXT_SEPARATOR = '\x00'
+
+def pack_json(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+def encode_column(values):
+    """Encode one column as (encoding, bytes), picking the most compact encoding"""
+    try:
+        # Keyed by type too, so True and 1 stay distinct values
+        distinct = {}
+        codes = [distinct.setdefault((type(value), value), len(distinct)) for value in values]
+    except TypeError:
+        # Unhashable values (skills lists) can only be stored as JSON
+        distinct = None
+
+    if distinct is not None and len(distinct) <= max(1, len(values) * DICT_ENCODING_RATIO):
+        encoded_values = pack_json([value for _, value in distinct])
+        indexes = array.array('I', codes)
+        if sys.byteorder == 'big':
+            indexes.byteswap()
+        return "dict", LENGTH.pack(len(encoded_values)) + encoded_values + indexes.tobytes()
+
+    if values and all(type(value) is str and TEXT_SEPARATOR not in value for value in values):
+        return "text", TEXT_SEPARATOR.join(values).encode()
+
+    return "json", pack_json(values)
+
+def decode_column(encoding, block, count):
+    """Decode a column block back into its list of `count` values"""
+    if encoding == "dict":
+        (values_length,) = LENGTH.unpack_from(block)
+        distinct = json.loads(bytes(block[LENGTH.size:LENGTH.size + values_length]))
+        indexes = array.array('I')
+        indexes.frombytes(block[LENGTH.size + values_length:])
+        if sys.byteorder == 'big':
+            indexes.byteswap()
+        return list(map(distinct.__getitem__, indexes))
+    if encoding == "text":
+        return str(block, 'utf-8').split(TEXT_SEPARATOR) if count else []
+    if encoding == "json":
+        return json.loads(bytes(block))
+
+    raise ValueError(f'Unknown snapshot column encoding: {encoding}')
+
+def dump_snapshot(data):
+    """
+    Serialize a catalog in the JSON file layout ({"meta", "jobs": [...]}) to bytes
+    """
+    jobs = data.get("jobs", [])
+
+    # Columns in the order fields first appear, so jobs sharing the usual
+    # layout keep their key order
+    names = {}
+    for job in jobs:
+        for name in job:
+            names.setdefault(name, None)
+
+    columns = []
+    blocks = []
+    for name in names:
+        values = []
+        missing = []
+        for row, job in enumerate(jobs):
+            if name in job:
+                values.append(job[name])
+            else:
+                values.append(None)
+                missing.append(row)
+
+        encoding, block = encode_column(values)
+        columns.append({"name": name, "encoding": encoding, "length": len(block), "missing": missing})
+        blocks.append(block)
+
+    header = pack_json({
+        "meta": data.get("meta", get_default_structure()["meta"]),
+        "count": len(jobs),
+        "columns": columns
+    })
+
+    return b''.join([MAGIC, LENGTH.pack(len(header)), header] + blocks)
+
+def load_snapshot(payload):
+    """
+    Parse bytes from dump_snapshot back into the JSON file layout
+
+    Raises ValueError if the payload isn't a snapshot or is truncated.
+    """
+    view = memoryview(payload)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError('Not a job snapshot file')
+
+    offset = len(MAGIC)
+    (header_length,) = LENGTH.unpack_from(view, offset)
+    offset += LENGTH.size
+    header = json.loads(bytes(view[offset:offset + header_length]))
+    offset += header_length
+    count = header["count"]
+
+    # Only acyclic containers are created here, so collector passes over the
+    # growing catalog would be pure overhead
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        names = []
+        columns = []
+        for column in header["columns"]:
+            end = offset + column["length"]
+            if end > len(view):
+                raise ValueError('Truncated job snapshot file')
+
+            values = decode_column(column["encoding"], view[offset:end], count)
+            if len(values) != count:
+                raise ValueError(f'Column {column["name"]} has {len(values)} values for {count} jobs')
+
+            names.append(column["name"])
+            columns.append(values)
+            offset = end
+
+        # Build every job at C speed, then drop the fields some jobs never had
+        if columns:
+            jobs = list(map(dict, map(zip, itertools.repeat(names), zip(*columns))))
+        else:
+            jobs = [{} for _ in range(count)]
+        for column in header["columns"]:
+            for row in column["missing"]:
+                del jobs[row][column["name"]]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "meta": header["meta"],
+        "jobs": jobs
+    }
+
+def read_binary_snapshot(path):
+    """Read a snapshot file written by write_binary_snapshot"""
+    with open(path, 'rb') as f:
+        return load_snapshot(f.read())
+
+def write_binary_snapshot(path, data):
+    """Atomically write a catalog in the JSON file layout as a snapshot file"""
+    payload = dump_snapshot(data)
+    atomic_write(path, lambda f: f.write(payload), binary=True)
+
+
+class BinarySnapshotEngine:
+    """
+    Keeps the whole catalog in a binary snapshot (jobs.snap) next to jobs.json
+
+    Rewrites the snapshot on every change, like JsonFileEngine does with
+    jobs.json. Until the snapshot exists, the catalog is read from jobs.json,
+    so switching engines needs no migration step.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_suffix('.snap')
+        self.lock_path = self.path.with_suffix('.lock')
+
+    def write_lock(self):
+        return file_lock(self.lock_path)
+
+    def signature(self):
+        return file_signature(self.snapshot_path) or file_signature(self.path)
+
+    def load(self):
+        try:
+            return read_binary_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            return read_snapshot(self.path)
+
+    def persist(self, data, changes):
+        write_binary_snapshot(self.snapshot_path, {
+            "meta": data["meta"],
+            "jobs": list(data["jobs"].values())
+        })
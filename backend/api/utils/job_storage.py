@@ -1,109 +1,233 @@
+import base64
+import binascii
 import json
-import os
-import uuid
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from django.conf import settings
+
+from .job_archive import get_archive
+from .job_index import FACET_FIELDS, SORTED_ORDERS, normalize_skill
+from .job_pages import get_page_publisher
+from .job_query_cache import get_query_cache
+
 JOB_FILE_PATH = Path(__file__).resolve().parent.parent.parent / 'data' / 'jobs.json'
+JOB_CHANGES_PATH = JOB_FILE_PATH.with_suffix('.changes')
 
-def get_default_structure():
-    """Return the default data structure for the jobs JSON file"""
-    return {
-        "meta": {
-            "total_count": 0,
-            "last_updated": datetime.now().isoformat()
-        },
-        "jobs": []
-    }
+# Filters that hold booleans in the stored jobs but arrive as strings from query params
+BOOLEAN_FILTERS = ('remote', 'urgent', 'featured')
+
+# Yearly salary bounds: salary_min keeps jobs paying up to at least that much,
+# salary_max keeps jobs starting at or below it
+SALARY_FILTERS = ('salary_min', 'salary_max')
+
+# Supported values of the `sort` argument of get_jobs. Without one, jobs are
+# returned in the order they were posted.
+SORT_OPTIONS = ('relevance',) + SORTED_ORDERS
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` cursor can't be decoded"""
+
+
+class InvalidSince(ValueError):
+    """Raised when a `since` value is neither a generation nor an ISO timestamp"""
+
+
+class JobStorageBackend:
+    """
+    Interface implemented by the job storage backends
+
+    Jobs are exchanged as plain dicts in the layout of data/jobs.json, with a
+    UUID string "id", ISO "created_at"/"updated_at" timestamps, a list of
+    "skills" and the posting employer's "employer_id" and "company_name".
+    """
+
+    # job_changes.JobChangeLog every create, update, delete and archive is recorded in
+    change_log = None
 
-def load_jobs():
-    """Load jobs from JSON file or create a new one if it doesn't exist"""
-    if not os.path.exists(JOB_FILE_PATH):
-        os.makedirs(os.path.dirname(JOB_FILE_PATH), exist_ok=True)
+    def generation(self):
+        """
+        Return a value that changes whenever the stored jobs change, or None
+
+        Listing results are cached per generation (see job_query_cache);
+        None disables that cache.
+        """
+        return None
+
+    def catalog_version(self):
+        """
+        Return (tag, last_modified) for the stored catalog as a whole, or None
+
+        `tag` is a string that changes with every stored change and is the
+        same in every worker process; `last_modified` is the time of the
+        last change (datetime or ISO string) or None. Used to answer
+        conditional GETs without computing the response.
+        """
+        return None
+
+    def create_job(self, job_data):
+        """Create a new job and return it"""
+        raise NotImplementedError
+
+    def create_jobs(self, jobs_data):
+        """Create several jobs in one storage transaction and return them in order"""
+        raise NotImplementedError
+
+    def get_jobs(self, page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+        """
+        Get jobs with pagination, optional filtering and one of SORT_OPTIONS
         
-        with open(JOB_FILE_PATH, 'w') as f:
-            json.dump(get_default_structure(), f, indent=2)
-        return get_default_structure()
-    
-    try:
-        with open(JOB_FILE_PATH, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return get_default_structure()
-
-def save_jobs(data):
-    """Save jobs data to JSON file"""
-    data["meta"]["last_updated"] = datetime.now().isoformat()
-    
-    with open(JOB_FILE_PATH, 'w') as f:
-        json.dump(data, f, indent=2)
+        When `facets` lists some of FACET_FIELDS, the result also holds a
+        "facets" entry with the number of matching jobs per value of each.
 
-def create_job(job_data):
-    """Create a new job"""
-    data = load_jobs()
-    
-    job_id = str(uuid.uuid4())
-    
-    timestamp = datetime.now().isoformat()
-    job_data["id"] = job_id
-    job_data["created_at"] = timestamp
-    job_data["updated_at"] = timestamp
-    
-    if isinstance(job_data.get('skills'), str):
-        job_data['skills'] = [skill.strip() for skill in job_data['skills'].split(',')]
-    
-    data["jobs"].append(job_data)
-    
-    data["meta"]["total_count"] = len(data["jobs"])
-    
-    save_jobs(data)
-    
-    return job_data
+        When `after` is a (created_at, id) tuple, or an empty tuple for the
+        first page, `page` and `sort` are ignored and the jobs following it
+        in (created_at, id) order are returned with build_cursor_page.
+        """
+        raise NotImplementedError
 
-def get_jobs(page=1, per_page=10, filters=None):
-    """Get jobs with pagination and optional filtering"""
-    data = load_jobs()
-    all_jobs = data["jobs"]
-    
-    if filters:
-        filtered_jobs = []
-        for job in all_jobs:
-            match = True
-            for key, value in filters.items():
-                if key == "skills" and isinstance(value, str):
-                    job_skills = job.get("skills", [])
-                    if not any(skill.lower() == value.lower() for skill in job_skills):
-                        match = False
-                        break
-                elif key == "search" and value:
-                    search_value = value.lower()
-                    title_match = search_value in job.get("title", "").lower()
-                    desc_match = search_value in job.get("description", "").lower()
-                    company_match = search_value in job.get("company_name", "").lower()
-                    location_match = search_value in job.get("location", "").lower()
-                    
-                    if not (title_match or desc_match or company_match or location_match):
-                        match = False
-                        break
-                elif job.get(key) != value:
-                    match = False
-                    break
-            
-            if match:
-                filtered_jobs.append(job)
-        all_jobs = filtered_jobs
+    def get_job_by_id(self, job_id):
+        """Get a job by its ID, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def get_jobs_by_ids(self, job_ids):
+        """Get several jobs at once as a {job_id: job} dict, leaving out missing ones"""
+        raise NotImplementedError
+
+    def update_job(self, job_id, job_data):
+        """Replace an existing job and return it, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def update_jobs(self, employer_id, job_ids, changes):
+        """
+        Apply the same partial `changes` to several of an employer's jobs in one write
+
+        IDs that aren't jobs of `employer_id` are skipped. Returns the
+        updated jobs as a {job_id: job} dict in the order of `job_ids`.
+        """
+        raise NotImplementedError
+
+    def delete_job(self, job_id):
+        """Delete a job and return it, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    def delete_jobs(self, employer_id, job_ids):
+        """
+        Delete several of an employer's jobs in one write
+
+        IDs that aren't jobs of `employer_id` are skipped. Returns the
+        deleted jobs as a {job_id: job} dict in the order of `job_ids`.
+        """
+        raise NotImplementedError
+
+    def archive_jobs(self, job_ids=None, employer_id=None, created_before=None):
+        """
+        Move jobs from the live catalog into the job archive (see job_archive)
+
+        Selects the jobs in `job_ids`, or every job when it is None, keeping
+        only those of `employer_id` and those created before the datetime
+        `created_before` when given. Returns the archived jobs as a
+        {job_id: job} dict.
+        """
+        raise NotImplementedError
+
+    def iter_jobs(self):
+        """Yield every job in the catalog in posting order, without loading them all as dicts at once"""
+        raise NotImplementedError
+
+    def get_changes(self, since_seq=None, since_time=None, limit=500):
+        """
+        Get the jobs changed after a change log generation or an ISO timestamp
+
+        Returns the change_log.read() result with each change turned into
+        {"id", "deleted", "changed_at"} plus the current "job" for jobs that
+        still exist. Jobs deleted (or archived) since are tombstones with
+        "deleted": True.
+        """
+        result = self.change_log.read(since_seq, since_time, limit)
+
+        put_ids = [entry["id"] for entry in result["changes"] if entry["op"] == "put"]
+        jobs = self.get_jobs_by_ids(put_ids) if put_ids else {}
+
+        changes = []
+        for entry in result["changes"]:
+            # A job deleted after this put is a tombstone already
+            job = jobs.get(entry["id"]) if entry["op"] == "put" else None
+            change = {"id": entry["id"], "deleted": job is None, "changed_at": entry["ts"]}
+            if job is not None:
+                change["job"] = job
+            changes.append(change)
+
+        result["changes"] = changes
+        return result
+
+    def get_jobs_by_employer(self, employer_id, page=1, per_page=10, after=None):
+        """Get all jobs for a specific employer with page or cursor pagination"""
+        raise NotImplementedError
+
+    def get_job_ids_by_employer(self, employer_id):
+        """Get the IDs of every job posted by an employer"""
+        raise NotImplementedError
+
+
+def split_skills(skills):
+    """Split a comma-separated skills string into a list, dropping empty entries"""
+    return [skill.strip() for skill in skills.split(',') if skill.strip()]
+
+def normalize_filters(filters):
+    """
+    Bring filter values given as query strings into the form the backends expect
     
-    # Calculate pagination
-    total_count = len(all_jobs)
-    total_pages = (total_count + per_page - 1) // per_page
+    Boolean filters become real booleans, salary bounds become integers
+    (unparseable ones are dropped), and `skills` ("react,node") becomes
+    a list of normalized skill names. `skills_match` is "all" (the default)
+    when a job needs every listed skill, or "any" when one is enough.
+    """
+    if not filters:
+        return filters
+
+    normalized = dict(filters)
+    for key in BOOLEAN_FILTERS:
+        value = normalized.get(key)
+        if isinstance(value, str):
+            normalized[key] = value.strip().lower() in ('true', '1', 'yes')
+
+    for key in SALARY_FILTERS:
+        if key in normalized:
+            try:
+                normalized[key] = int(float(normalized[key]))
+            except (TypeError, ValueError):
+                del normalized[key]
+
+    skills = normalized.get('skills')
+    if isinstance(skills, str):
+        skills = split_skills(skills)
+    if skills is not None:
+        normalized['skills'] = [normalize_skill(skill) for skill in skills]
+        normalized['skills_match'] = 'any' if normalized.get('skills_match') == 'any' else 'all'
+    else:
+        normalized.pop('skills_match', None)
+
+    return normalized
+
+def paginate(items, page, per_page, serialize):
+    """Slice a list of jobs into the paginated response structure"""
     start_idx = (page - 1) * per_page
     end_idx = start_idx + per_page
-    
-    # Get paginated jobs
-    paginated_jobs = all_jobs[start_idx:end_idx]
-    
+
+    return build_page([serialize(item) for item in items[start_idx:end_idx]], len(items), page, per_page)
+
+def build_page(jobs, total_count, page, per_page):
+    """Wrap one page of already selected jobs in the paginated response structure"""
+    total_pages = (total_count + per_page - 1) // per_page
+
     return {
-        "jobs": paginated_jobs,
+        "jobs": jobs,
         "pagination": {
             "total": total_count,
             "per_page": per_page,
@@ -112,57 +236,208 @@ def get_jobs(page=1, per_page=10, filters=None):
         }
     }
 
-def get_job_by_id(job_id):
-    """Get a job by its ID"""
-    data = load_jobs()
-    
-    for job in data["jobs"]:
-        if job["id"] == job_id:
-            return job
+def build_cursor_page(jobs, per_page):
+    """
+    Wrap up to per_page + 1 jobs in (created_at, id) order in the cursor response structure
+
+    The extra job only tells whether another page follows and is dropped.
+    """
+    has_more = len(jobs) > per_page
+    jobs = jobs[:per_page]
+
+    return {
+        "jobs": jobs,
+        "pagination": {
+            "per_page": per_page,
+            "next_cursor": encode_cursor(jobs[-1]) if has_more else None,
+            "has_more": has_more
+        }
+    }
+
+def encode_cursor(job):
+    """Build the opaque cursor that resumes a listing right after `job`"""
+    raw = json.dumps([job.get("created_at") or "", job["id"]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor into a (created_at, id) tuple
     
-    return None
+    An empty cursor decodes to an empty tuple, meaning the first page.
+    Raises InvalidCursor when the value wasn't produced by encode_cursor.
+    """
+    if not cursor:
+        return ()
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor}')
+
+    if not isinstance(created_at, str) or not isinstance(job_id, str):
+        raise InvalidCursor(f'Invalid cursor: {cursor}')
+    return (created_at, job_id)
+
+def parse_since(since):
+    """
+    Parse the `since` of a changes request into (generation, timestamp)
+
+    Digits are a change log generation; anything else must be an ISO
+    timestamp, which is compared in local time like the logged ones.
+    """
+    if not since:
+        return 0, None
+    if since.isdigit():
+        return int(since), None
+
+    try:
+        parsed = datetime.fromisoformat(since)
+    except ValueError:
+        raise InvalidSince(f'Invalid since: {since}')
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return None, parsed.isoformat()
+
+def create_backend(name):
+    """Create the job storage backend registered under `name`"""
+    if name == 'json':
+        from .json_job_backend import JsonJobBackend
+        return JsonJobBackend(JOB_FILE_PATH)
+    if name == 'shared':
+        from .shared_job_backend import SharedJobBackend
+        return SharedJobBackend(JOB_FILE_PATH)
+    if name == 'database':
+        from .db_job_backend import DatabaseJobBackend
+        return DatabaseJobBackend()
+
+    raise ValueError(f'Unknown job storage backend: {name}')
+
+def get_backend():
+    """Return the job storage backend configured in settings.JOB_STORAGE_BACKEND"""
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(getattr(settings, 'JOB_STORAGE_BACKEND', 'json'))
+        return _backend
+
+def published(result):
+    """
+    Refresh the static listing pages after a write, passing its result through
+
+    Writes that changed nothing return None or an empty collection and
+    leave the pages alone.
+    """
+    if result:
+        get_page_publisher().schedule()
+    return result
+
+def create_job(job_data):
+    """Create a new job"""
+    return published(get_backend().create_job(job_data))
+
+def create_jobs(jobs_data):
+    """Create several jobs at once, with a single write"""
+    return published(get_backend().create_jobs(jobs_data))
+
+def get_jobs(page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+    """
+    Get jobs with pagination, optional filtering, sorting and facet counts
+
+    Passing an `after` cursor (empty for the first page) switches to keyset
+    pagination in (created_at, id) order instead of page numbers.
+
+    Results are served from the query cache until the store changes, and
+    must not be modified by the caller. Pages and page sizes below 1 are
+    treated as 1.
+    """
+    page, per_page = max(page, 1), max(per_page, 1)
+    if sort not in SORT_OPTIONS:
+        sort = None
+    facets = [field for field in facets or [] if field in FACET_FIELDS]
+    if after is not None:
+        after = decode_cursor(after)
+    filters = normalize_filters(filters)
+
+    backend = get_backend()
+    cache = get_query_cache()
+    return cache.get_or_compute(
+        backend.generation(),
+        cache.make_key(filters, page, per_page, sort, facets, after),
+        lambda: backend.get_jobs(page, per_page, filters, sort, facets, after)
+    )
+
+def get_catalog_version():
+    """Get the (tag, last_modified) version of the whole job catalog, or None"""
+    return get_backend().catalog_version()
+
+def iter_jobs():
+    """Iterate over every active job, one at a time"""
+    return get_backend().iter_jobs()
+
+def get_changes(since=None, limit=500):
+    """
+    Get the jobs created, updated or deleted since a generation or ISO timestamp
+
+    `since` is the "generation" of an earlier result (empty for everything
+    still logged). When "reset" is set, the log no longer reaches back that
+    far and the client has to reload the whole catalog.
+    """
+    since_seq, since_time = parse_since(since)
+    return get_backend().get_changes(since_seq, since_time, limit)
+
+def get_job_by_id(job_id, include_archived=False):
+    """
+    Get a job by its ID
+
+    With include_archived, a job that was moved to the archive is returned
+    too, marked with "archived": True.
+    """
+    job = get_backend().get_job_by_id(job_id)
+    if job is None and include_archived:
+        job = get_archive().get(job_id)
+    return job
+
+def get_jobs_by_ids(job_ids, include_archived=False):
+    """Get several jobs by their IDs in one lookup, as a {job_id: job} dict, optionally from the archive too"""
+    found = get_backend().get_jobs_by_ids(job_ids)
+    if include_archived:
+        missing = [job_id for job_id in job_ids if job_id not in found]
+        if missing:
+            found.update(get_archive().get_many(missing))
+    return found
 
 def update_job(job_id, job_data):
     """Update an existing job"""
-    data = load_jobs()
-    
-    for i, job in enumerate(data["jobs"]):
-        if job["id"] == job_id:
-            job_data["id"] = job_id
-            job_data["created_at"] = job["created_at"]
-            job_data["updated_at"] = datetime.now().isoformat()
-            
-            if isinstance(job_data.get('skills'), str):
-                job_data['skills'] = [skill.strip() for skill in job_data['skills'].split(',')]
-            
-            data["jobs"][i] = job_data
-            
-            save_jobs(data)
-            
-            return job_data
-    
-    return None
+    return published(get_backend().update_job(job_id, job_data))
+
+def update_jobs(employer_id, job_ids, changes):
+    """Apply the same partial changes to several of an employer's jobs at once"""
+    return published(get_backend().update_jobs(employer_id, job_ids, changes))
 
 def delete_job(job_id):
     """Delete a job by its ID"""
-    data = load_jobs()
-    
-    for i, job in enumerate(data["jobs"]):
-        if job["id"] == job_id:
-            # Remove the job
-            deleted_job = data["jobs"].pop(i)
-            
-            # Update the total count
-            data["meta"]["total_count"] = len(data["jobs"])
-            
-            # Save the updated data
-            save_jobs(data)
-            
-            return deleted_job
-    
-    return None
+    return published(get_backend().delete_job(job_id))
+
+def delete_jobs(employer_id, job_ids):
+    """Delete several of an employer's jobs at once"""
+    return published(get_backend().delete_jobs(employer_id, job_ids))
+
+def archive_jobs(job_ids=None, employer_id=None, created_before=None):
+    """Move closed jobs, or the jobs posted before a datetime, from the live catalog into the archive"""
+    if job_ids is None and created_before is None:
+        raise ValueError('Pass the IDs of the jobs to archive or a cutoff date')
+    return published(get_backend().archive_jobs(job_ids, employer_id, created_before))
+
+def get_jobs_by_employer(employer_id, page=1, per_page=10, after=None):
+    """Get all jobs for a specific employer with page or cursor pagination"""
+    page, per_page = max(page, 1), max(per_page, 1)
+    if after is not None:
+        after = decode_cursor(after)
+    return get_backend().get_jobs_by_employer(employer_id, page, per_page, after)
 
-def get_jobs_by_employer(employer_id, page=1, per_page=10):
-    """Get all jobs for a specific employer with pagination"""
-    filters = {"employer_id": employer_id}
-    return get_jobs(page, per_page, filters)
\ No newline at end of file
+def get_job_ids_by_employer(employer_id):
+    """Get the IDs of every job posted by an employer"""
+    return get_backend().get_job_ids_by_employer(employer_id)
@@ -0,0 +1,480 @@
+import json
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+from .job_archive import get_archive
+from .job_changes import JobChangeLog
+from .job_engines import create_engine, get_default_structure
+from .job_group_commit import GroupCommitter
+from .job_locks import ReadWriteLock
+from .job_index import JobIndex, parse_salary_range
+from .job_query import cursor_page, matches_filters, query_jobs
+from .job_records import JobRecord
+from .job_storage import JobStorageBackend, split_skills, paginate
+
+class CatalogView:
+    """The in-process catalog as a job_query catalog view, keyed by job ID"""
+
+    def __init__(self, data):
+        self.jobs = data["jobs"]
+        self.index = data["index"]
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def keys(self):
+        return list(self.jobs)
+
+    def in_order(self, job_ids):
+        return self.index.in_order(job_ids)
+
+    def select(self, filters):
+        return self.index.select(filters)
+
+    def matches(self, job_id, filters):
+        return not filters or matches_filters(self.jobs[job_id], filters)
+
+    def job(self, job_id):
+        # Copy the record so callers can't modify the cached one
+        return dict(self.jobs[job_id])
+
+    def created_key(self, job_id):
+        return self.index.created.doc_entries[job_id]
+
+    def iter_created_after(self, after):
+        return (job_id for _, job_id in self.index.created.iter_after(after))
+
+    def rank(self, query, job_ids, limit):
+        return self.index.search.rank(query, job_ids, limit, self.index.positions)
+
+    def iter_sorted(self, sort):
+        return self.index.iter_sorted(sort)
+
+    def facet_counts(self, fields, job_ids):
+        return self.index.facets.counts(fields, job_ids)
+
+class JsonJobBackend(JobStorageBackend):
+    """
+    Job storage backed by data/jobs.json (or its journal)
+
+    The parsed file is cached for the whole process and reused until the
+    storage engine's signature changes, so read-only requests skip the disk
+    read and the JSON parse entirely. Writes made by other worker processes
+    change the signature and are picked up on the next access.
+
+    In memory the jobs are kept as an insertion-ordered dict keyed by job ID,
+    which doubles as the lookup index for get/update/delete. Each job is a
+    compact job_records.JobRecord, turned back into a plain dict only when it
+    leaves the backend or is saved. Secondary indexes (see job_index.JobIndex)
+    are built alongside it on load.
+
+    Writers serialize on _write_lock within the process and on the engine's
+    file lock across processes. Mutations change the cached catalog and its
+    indexes in place, so they hold _catalog_lock for writing while they run,
+    and every read that walks the catalog holds it for reading; it is never
+    held while waiting for another process or writing to disk. Concurrent
+    create/update/delete calls in one process are group committed (see
+    job_group_commit): they are applied together and persisted with one write.
+    Every write is then recorded in the change log next to the jobs file
+    (see job_changes) while the file lock is still held.
+    """
+
+    def __init__(self, path, engine=None):
+        self.path = path
+        self.engine = engine or create_engine(path)
+        self.change_log = JobChangeLog(
+            Path(path).with_suffix('.changes'),
+            getattr(settings, 'JOB_CHANGE_LOG_MAX_BYTES', 8 * 1024 * 1024)
+        )
+        self._cache_lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._catalog_lock = ReadWriteLock()
+        self._cache = {
+            "signature": None,
+            "data": None
+        }
+        # Bumped on every write made by this process
+        self._generation = 0
+        self.group_commit = GroupCommitter(
+            self.commit_batch,
+            window=getattr(settings, 'JOB_GROUP_COMMIT_WINDOW', 0.0),
+            max_batch=getattr(settings, 'JOB_GROUP_COMMIT_MAX', 100)
+        )
+
+    def index_jobs(self, file_data):
+        """Convert the JSON file layout into the in-memory layout with jobs keyed by ID"""
+        jobs = {job["id"]: job for job in file_data.pop("jobs", [])}
+        # Index the parsed dicts, which read faster than records
+        index = JobIndex(jobs.values())
+
+        # Then swap each dict for its record, so only one of them is alive at a time
+        for job_id, job in jobs.items():
+            jobs[job_id] = JobRecord(job)
+
+        return {
+            "meta": file_data.get("meta", get_default_structure()["meta"]),
+            "jobs": jobs,
+            "index": index
+        }
+
+    def generation(self):
+        """Identify the stored catalog version: this process's write count and the storage signature"""
+        return (self._generation, self.engine.signature())
+
+    def catalog_version(self):
+        with self._cache_lock:
+            data = self.load_jobs()
+            signature = self._cache["signature"]
+        return json.dumps(signature), data["meta"].get("last_updated")
+
+    def load_jobs(self):
+        """
+        Load jobs from the in-process cache, re-reading storage only when it changed on disk
+
+        Returns:
+            dict: {"meta": {...}, "jobs": {job_id: job}, "index": JobIndex}
+                  with jobs in file order
+        """
+        with self._cache_lock:
+            signature = self.engine.signature()
+            if self._cache["data"] is not None and signature is not None and signature == self._cache["signature"]:
+                return self._cache["data"]
+
+            data = self.index_jobs(self.engine.load())
+
+            # Keep the signature taken before the read: if another process
+            # wrote in between, the next access sees a mismatch and reloads
+            # instead of trusting a stale copy
+            self._cache["data"] = data
+            self._cache["signature"] = signature
+
+            return data
+
+    @contextmanager
+    def write_transaction(self):
+        """
+        Serialize a load-modify-save cycle across threads and worker processes
+
+        Yields the freshly loaded catalog. Changes made by other processes before
+        the lock was acquired are always visible, so no update is lost.
+        """
+        with self._write_lock, self.engine.write_lock():
+            yield self.load_jobs()
+
+    def save_jobs(self, data, changes=None):
+        """
+        Persist jobs data and keep the in-process cache in sync
+
+        Must be called inside write_transaction().
+
+        Args:
+            data: The in-memory catalog returned by load_jobs()
+            changes: List of ("put", job) / ("delete", job_id) tuples describing
+                     what changed. Engines that rewrite the whole file ignore it.
+        """
+        data["meta"]["last_updated"] = datetime.now().isoformat()
+
+        if changes is None:
+            changes = [("put", dict(job)) for job in data["jobs"].values()]
+
+        try:
+            self.engine.persist(data, changes)
+            self.change_log.append(changes)
+        except Exception:
+            # The cached copy may hold changes that never reached the disk
+            self.invalidate_cache()
+            raise
+        finally:
+            self._generation += 1
+
+        with self._cache_lock:
+            self._cache["data"] = data
+            self._cache["signature"] = self.engine.signature()
+
+    def compact(self):
+        """Fold the change journal into a fresh snapshot (journal engine only)"""
+        with self.write_transaction() as data:
+            if hasattr(self.engine, 'compact'):
+                self.engine.compact(data)
+                with self._cache_lock:
+                    self._cache["signature"] = self.engine.signature()
+
+    def invalidate_cache(self):
+        """Drop the cached jobs data so the next access re-reads the file"""
+        with self._cache_lock:
+            self._cache["data"] = None
+            self._cache["signature"] = None
+            self._generation += 1
+
+    def commit_batch(self, batch):
+        """
+        Apply a group commit batch in one write transaction and persist it with one write
+
+        A mutation that raises is reported to its caller alone; the others
+        are still saved. Mutations change the catalog in place, so one that
+        raises halfway may leave part of its changes behind: the catalog is
+        then reloaded from storage and the other mutations applied again
+        without it.
+        """
+        with self.write_transaction() as data:
+            pending = list(batch)
+            with self._catalog_lock.writing():
+                while True:
+                    changes = []
+                    for request in pending:
+                        try:
+                            request.result, request_changes = request.mutate(data)
+                        except Exception as e:
+                            request.error = e
+                        else:
+                            changes.extend(request_changes)
+
+                    if all(request.error is None for request in pending):
+                        break
+
+                    pending = [request for request in pending if request.error is None]
+                    self.invalidate_cache()
+                    data = self.load_jobs()
+
+            if changes:
+                self.save_jobs(data, changes)
+
+    def mutate(self, mutate):
+        """
+        Run `mutate(data)` -> (result, changes) through the group commit
+
+        Returns the result once the changes are persisted.
+        """
+        return self.group_commit.submit(mutate)
+
+    def add_new_job(self, data, job_data, bulk=False):
+        """Give a new job its ID and timestamps and add it to the catalog"""
+        job_id = str(uuid.uuid4())
+
+        timestamp = datetime.now().isoformat()
+        job_data["id"] = job_id
+        job_data["created_at"] = timestamp
+        job_data["updated_at"] = timestamp
+        self.derive_fields(job_data)
+
+        job = data["jobs"][job_id] = JobRecord(job_data)
+        data["index"].add(job, bulk)
+        return job
+
+    def replace_job(self, data, job_data):
+        """Store the new version of an existing job and reindex it"""
+        self.derive_fields(job_data)
+
+        job = data["jobs"][job_data["id"]] = JobRecord(job_data)
+        data["index"].replace(job)
+        return job
+
+    @staticmethod
+    def derive_fields(job_data):
+        """Split a comma-separated skills string and parse the salary bounds"""
+        if isinstance(job_data.get('skills'), str):
+            job_data['skills'] = split_skills(job_data['skills'])
+        job_data["salary_min"], job_data["salary_max"] = parse_salary_range(job_data.get("salary_range"))
+
+    def create_job(self, job_data):
+        def create(data):
+            job = self.add_new_job(data, job_data)
+            data["meta"]["total_count"] = len(data["jobs"])
+
+            return dict(job), [("put", job_data)]
+
+        return self.mutate(create)
+
+    def create_jobs(self, jobs_data):
+        def create(data):
+            # Sort the indexes once for the whole batch
+            jobs = [self.add_new_job(data, job_data, bulk=True) for job_data in jobs_data]
+            data["index"].finish_bulk()
+            data["meta"]["total_count"] = len(data["jobs"])
+
+            return [dict(job) for job in jobs], [("put", job_data) for job_data in jobs_data]
+
+        return self.mutate(create)
+
+    def get_jobs(self, page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+        with self._catalog_lock.reading():
+            return query_jobs(CatalogView(self.load_jobs()), page, per_page, filters, sort, facets, after)
+
+    def get_job_by_id(self, job_id):
+        with self._catalog_lock.reading():
+            job = self.load_jobs()["jobs"].get(job_id)
+        if job is None:
+            return None
+
+        # Return a copy so callers can annotate it without touching the cache
+        return dict(job)
+
+    def get_jobs_by_ids(self, job_ids):
+        found = {}
+        with self._catalog_lock.reading():
+            jobs = self.load_jobs()["jobs"]
+            for job_id in job_ids:
+                job = jobs.get(job_id)
+                if job is not None:
+                    found[job_id] = dict(job)
+        return found
+
+    def iter_jobs(self):
+        # Writers replace records rather than changing them, so a list of
+        # the current ones is a consistent snapshot that costs one pointer per job
+        with self._catalog_lock.reading():
+            jobs = list(self.load_jobs()["jobs"].values())
+        for job in jobs:
+            yield dict(job)
+
+    def update_job(self, job_id, job_data):
+        def update(data):
+            job = data["jobs"].get(job_id)
+            if job is None:
+                return None, []
+
+            job_data["id"] = job_id
+            job_data["created_at"] = job["created_at"]
+            job_data["updated_at"] = datetime.now().isoformat()
+
+            job = self.replace_job(data, job_data)
+
+            return dict(job), [("put", job_data)]
+
+        return self.mutate(update)
+
+    def update_jobs(self, employer_id, job_ids, changes):
+        def update(data):
+            owned = set(data["index"].employers.job_ids(employer_id))
+            timestamp = datetime.now().isoformat()
+
+            updated = {}
+            for job_id in job_ids:
+                if job_id not in owned or job_id in updated:
+                    continue
+
+                job_data = dict(data["jobs"][job_id])
+                job_data.update(changes)
+                job_data["updated_at"] = timestamp
+                updated[job_id] = job_data
+
+                self.replace_job(data, job_data)
+
+            return updated, [("put", job_data) for job_data in updated.values()]
+
+        return self.mutate(update)
+
+    def delete_job(self, job_id):
+        def delete(data):
+            # Remove the job
+            deleted_job = data["jobs"].pop(job_id, None)
+            if deleted_job is None:
+                return None, []
+            data["index"].remove(job_id)
+
+            # Update the total count
+            data["meta"]["total_count"] = len(data["jobs"])
+
+            return dict(deleted_job), [("delete", job_id)]
+
+        return self.mutate(delete)
+
+    def delete_jobs(self, employer_id, job_ids):
+        def delete(data):
+            owned = set(data["index"].employers.job_ids(employer_id))
+
+            deleted = {}
+            for job_id in job_ids:
+                if job_id in owned and job_id not in deleted:
+                    deleted[job_id] = dict(data["jobs"].pop(job_id))
+                    data["index"].remove(job_id)
+
+            data["meta"]["total_count"] = len(data["jobs"])
+
+            return deleted, [("delete", job_id) for job_id in deleted]
+
+        return self.mutate(delete)
+
+    def select_archived_jobs(self, data, job_ids, employer_id, cutoff):
+        """Return the IDs of the jobs archive_jobs moves, in the order they are archived"""
+        jobs = data["jobs"]
+        index = data["index"]
+
+        if job_ids is not None:
+            selected = [job_id for job_id in dict.fromkeys(job_ids) if job_id in jobs]
+            if cutoff is not None:
+                selected = [job_id for job_id in selected if (jobs[job_id].get("created_at") or "") < cutoff]
+        else:
+            # Walk the created_at index from the oldest job up to the cutoff
+            selected = []
+            for created_at, job_id in index.created.entries:
+                if created_at >= cutoff:
+                    break
+                selected.append(job_id)
+
+        if employer_id is not None:
+            owned = set(index.employers.job_ids(employer_id))
+            selected = [job_id for job_id in selected if job_id in owned]
+
+        return selected
+
+    def archive_jobs(self, job_ids=None, employer_id=None, created_before=None):
+        cutoff = created_before.isoformat() if created_before is not None else None
+
+        with self._catalog_lock.reading():
+            data = self.load_jobs()
+            pending = {
+                job_id: dict(data["jobs"][job_id])
+                for job_id in self.select_archived_jobs(data, job_ids, employer_id, cutoff)
+            }
+
+        def remove(data):
+            # Only jobs still as they were archived leave the catalog; jobs
+            # updated in the meantime are handed back to be archived again
+            jobs = data["jobs"]
+            removed = {}
+            changed = {}
+            for job_id, job in pending.items():
+                current = jobs.get(job_id)
+                if current is None:
+                    continue
+                if dict(current) != job:
+                    changed[job_id] = dict(current)
+                    continue
+
+                removed[job_id] = job
+                del jobs[job_id]
+                data["index"].remove(job_id)
+            data["meta"]["total_count"] = len(jobs)
+
+            return (removed, changed), [("delete", job_id) for job_id in removed]
+
+        archived = {}
+        while pending:
+            # Archive first and without holding the catalog lock, so readers
+            # aren't held up by the archive I/O and a failure leaves the jobs
+            # in both stores rather than in neither
+            get_archive().add(pending.values())
+            removed, pending = self.mutate(remove)
+            archived.update(removed)
+
+        return archived
+
+    def get_jobs_by_employer(self, employer_id, page=1, per_page=10, after=None):
+        # Only this employer's jobs are looked at, however large the catalog
+        with self._catalog_lock.reading():
+            data = self.load_jobs()
+            job_ids = data["index"].employers.job_ids(employer_id)
+
+            if after is not None:
+                return cursor_page(CatalogView(data), set(job_ids), {}, per_page, after, walk=False)
+            return paginate(job_ids, page, per_page, lambda job_id: dict(data["jobs"][job_id]))
+
+    def get_job_ids_by_employer(self, employer_id):
+        with self._catalog_lock.reading():
+            return list(self.load_jobs()["index"].employers.job_ids(employer_id))
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+from .job_query import cursor_page, query_jobs
+from .job_shared_index import SharedJobIndex, signature_key, write_shared_index
+from .job_storage import paginate
+from .json_job_backend import JsonJobBackend
+
+class SharedJobBackend(JsonJobBackend):
+    """
+    JSON job storage whose reads are served from one index file shared by all workers
+
+    The catalog is stored by the same engines as the 'json' backend, but
+    instead of every worker parsing and indexing it into its own heap, the
+    worker that writes publishes a read-optimized copy next to it (see
+    job_shared_index) and every worker maps that file read-only. The pages of
+    the mapping are shared through the page cache, so memory no longer grows
+    with the number of workers.
+
+    Each write loads a private copy of the catalog under the write lock,
+    persists it, then atomically replaces the index file before the lock is
+    released. Readers compare the engine signature with the one recorded in
+    the file they have mapped and switch to the new generation when it
+    changed; a reader still using the previous mapping keeps a consistent
+    view until it lets go of it. If the file is missing or stale (e.g. after
+    the catalog was edited by hand) the first reader rebuilds it under the
+    write lock.
+
+    Writes cost a full load and index of the catalog, which the 'json'
+    backend avoids with its process cache: this backend trades write
+    latency for memory.
+    """
+
+    def __init__(self, path, engine=None):
+        super().__init__(path, engine)
+        self.index_path = Path(self.path).with_suffix('.index')
+        self._shared = None
+
+    def load_jobs(self):
+        """Load a private copy of the catalog for a write; reads go through attach()"""
+        return self.index_jobs(self.engine.load())
+
+    def save_jobs(self, data, changes=None):
+        super().save_jobs(data, changes)
+        # Publish the next generation before the write lock is released,
+        # then drop the private copy
+        write_shared_index(self.index_path, data, self.engine.signature())
+        self.invalidate_cache()
+
+    def open_index(self, signature):
+        """Map the index file if it was built from the catalog version `signature`"""
+        try:
+            index = SharedJobIndex(self.index_path)
+        except (OSError, ValueError):
+            return None
+        return index if index.source == signature_key(signature) else None
+
+    def attach(self):
+        """Return the mapped index for the current catalog, rebuilding the file if it is stale"""
+        signature = self.engine.signature()
+        with self._cache_lock:
+            shared = self._shared
+            if shared is not None and shared.source == signature_key(signature):
+                return shared
+
+        shared = self.open_index(signature)
+        if shared is None:
+            with self._write_lock, self.engine.write_lock():
+                # Another worker may have published it while we waited
+                signature = self.engine.signature()
+                shared = self.open_index(signature)
+                if shared is None:
+                    write_shared_index(self.index_path, self.load_jobs(), signature)
+                    shared = SharedJobIndex(self.index_path)
+
+        with self._cache_lock:
+            self._shared = shared
+        return shared
+
+    def catalog_version(self):
+        index = self.attach()
+        return index.source, index.meta.get("last_updated")
+
+    def get_jobs(self, page=1, per_page=10, filters=None, sort=None, facets=None, after=None):
+        return query_jobs(self.attach(), page, per_page, filters, sort, facets, after)
+
+    def get_job_by_id(self, job_id):
+        index = self.attach()
+
+        number = index.number(job_id)
+        if number is None:
+            return None
+        return index.job(number)
+
+    def get_jobs_by_ids(self, job_ids):
+        index = self.attach()
+
+        found = {}
+        for job_id in job_ids:
+            number = index.number(job_id)
+            if number is not None:
+                found[job_id] = index.job(number)
+        return found
+
+    def iter_jobs(self):
+        index = self.attach()
+        for number in range(index.count):
+            yield index.job(number)
+
+    def get_jobs_by_employer(self, employer_id, page=1, per_page=10, after=None):
+        index = self.attach()
+        numbers = index.employer_jobs(employer_id)
+
+        if after is not None:
+            return cursor_page(index, set(numbers), {}, per_page, after, walk=False)
+        return paginate(numbers, page, per_page, index.job)
+
+    def get_job_ids_by_employer(self, employer_id):
+        index = self.attach()
+        return [index.ids[number] for number in index.employer_jobs(employer_id)]
@@ -3,11 +3,10 @@ from django.http import JsonResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.db import models
 
 from api.models import JobApplication, Jobseeker, Employer, Job
 from api.utils.jwt_middleware import get_user_from_token
-from api.utils.job_storage import get_job_by_id
+from api.utils.job_storage import get_job_by_id, get_job_ids_by_employer, get_jobs_by_ids
 
 @method_decorator(csrf_exempt, name='dispatch')
 class JobApplicationView(View):
@@ -25,11 +24,14 @@ class JobApplicationView(View):
                 jobseeker = Jobseeker.objects.get(user=user)
                 
                 # Get applications
-                applications = JobApplication.objects.filter(jobseeker=jobseeker).order_by('-applied_at')
+                applications = list(JobApplication.objects.filter(jobseeker=jobseeker).order_by('-applied_at'))
+                
+                # Fetch the details of every applied job in a single lookup
+                job_details = get_jobs_by_ids([application.job_id for application in applications], include_archived=True)
                 
                 # Format the response
                 for application in applications:
-                    job_detail = get_job_by_id(application.job_id)
+                    job_detail = job_details.get(application.job_id)
                     applications_data.append({
                         'id': application.id,
                         'job_id': application.job_id,
@@ -71,9 +73,8 @@ class JobApplicationView(View):
                 # Debug what applications we found
                 print(f"Found {applications.count()} applications by company name")
                 
-                # Also get applications for employer's jobs (UUID or ID)
-                employer_jobs = Job.objects.filter(employer=employer)
-                job_ids = [str(job.id) for job in employer_jobs]
+                # Also get applications for employer's jobs from the job store
+                job_ids = get_job_ids_by_employer(employer.id)
                 print(f"Employer job IDs: {job_ids}")
                 
                 # Use | operator to combine querysets
@@ -81,24 +82,32 @@ class JobApplicationView(View):
                 print(f"Found {applications_by_job.count()} applications by job ID")
                 
                 # Combine both querysets
-                applications = (applications | applications_by_job).distinct()
+                applications = list(
+                    (applications | applications_by_job).distinct().select_related('jobseeker__user')
+                )
+                
+                # Fetch the details of every job applied for in a single lookup
+                job_details = get_jobs_by_ids([application.job_id for application in applications], include_archived=True)
+
+                # Jobs the store doesn't know may still be in the local table
+                missing_ids = {application.job_id for application in applications} - set(job_details)
+                local_jobs = {
+                    local_job.id: {
+                        'title': local_job.title,
+                        'company_name': employer.company_name,
+                    }
+                    for local_job in Job.objects.filter(id__in=missing_ids, employer=employer)
+                } if missing_ids else {}
 
                 for application in applications:
                     jobseeker_profile = application.jobseeker
-                    job_detail = get_job_by_id(application.job_id)
+                    job_detail = job_details.get(application.job_id) or local_jobs.get(application.job_id)
                     
                     if not job_detail:
-                        try:
-                            local_job = Job.objects.get(id=application.job_id, employer=employer)
-                            job_detail = {
-                                'title': local_job.title,
-                                'company_name': local_job.employer.company_name,
-                            }
-                        except Job.DoesNotExist:
-                            job_detail = {
-                                'title': application.job_title,
-                                'company_name': application.company_name
-                            }
+                        job_detail = {
+                            'title': application.job_title,
+                            'company_name': application.company_name
+                        }
 
                     applications_data.append({
                         'id': application.id,
@@ -246,15 +255,10 @@ class JobApplicationView(View):
                 application = JobApplication.objects.filter(id=application_id).first()
                 if not application:
                     return JsonResponse({'success': False, 'message': 'Application not found'}, status=404)
-                try:
-                    job = Job.objects.filter(employer=employer).filter(
-                        models.Q(id=application.job_id) | models.Q(id=str(application.job_id))
-                    ).first()
-                    if not job and application.company_name != employer.company_name:
-                        return JsonResponse({'success': False, 'message': 'Application does not belong to one of your jobs'}, status=403)
-                except Exception:
-                    if application.company_name != employer.company_name:
-                        return JsonResponse({'success': False, 'message': 'Application does not belong to one of your jobs'}, status=403)
+                job = get_job_by_id(application.job_id, include_archived=True)
+                owns_job = job is not None and job.get('employer_id') == employer.id
+                if not owns_job and application.company_name != employer.company_name:
+                    return JsonResponse({'success': False, 'message': 'Application does not belong to one of your jobs'}, status=403)
                 allowed_employer_statuses = ['reviewing', 'interview', 'offered', 'rejected']
                 if status not in allowed_employer_statuses:
                     return JsonResponse({'success': False, 'message': f'Employers can only set status to: {", ".join(allowed_employer_statuses)}'}, status=403)
@@ -312,17 +316,11 @@ class EmployerApplicationUpdateView(View):
 
             application = JobApplication.objects.select_related('jobseeker__user').get(id=application_id)
 
-            try:
-                # Try to find a job with the same ID or string representation of ID
-                job = Job.objects.filter(employer=employer).filter(
-                    models.Q(id=application.job_id) | models.Q(id=str(application.job_id))
-                ).first()
-                
-                if not job and application.company_name != employer.company_name:
-                    return JsonResponse({'success': False, 'message': 'Application not found or not associated with your jobs.'}, status=404)
-            except Exception:
-                if application.company_name != employer.company_name:
-                    return JsonResponse({'success': False, 'message': 'Application not found or not associated with your jobs.'}, status=404)
+            # Check the job store for ownership, falling back to the company name
+            job = get_job_by_id(application.job_id, include_archived=True)
+            owns_job = job is not None and job.get('employer_id') == employer.id
+            if not owns_job and application.company_name != employer.company_name:
+                return JsonResponse({'success': False, 'message': 'Application not found or not associated with your jobs.'}, status=404)
 
             application.status = new_status
             application.save()
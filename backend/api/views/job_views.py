@@ -1,22 +1,108 @@
 import json
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.db import transaction
 
 from api.utils.job_storage import (
     create_job,
+    create_jobs,
     get_jobs,
     get_job_by_id,
     update_job,
+    update_jobs,
     delete_job,
-    get_jobs_by_employer
+    delete_jobs,
+    archive_jobs,
+    get_jobs_by_employer,
+    get_catalog_version,
+    get_changes,
+    iter_jobs,
+    InvalidCursor,
+    InvalidSince
 )
+from api.utils.conditional_get import add_validators, make_etag, not_modified
+from api.utils.job_feed import FEED_FORMATS, feed_path, stream_feed
+from api.utils.job_import import BulkImportError, detect_format, iter_rows, parse_boolean
+from api.utils.job_query_cache import get_query_cache
 from api.utils.job_status import get_job_status_for_user
 from api.models import Employer
 from api.utils.jwt_middleware import get_user_from_token
 
+# Fields every job posting must fill in, whether posted alone or in bulk
+REQUIRED_JOB_FIELDS = ['title', 'location', 'job_type', 'experience_level',
+                       'salary_range', 'description', 'requirements', 'responsibilities']
+
+# Keys of a job posting payload and the stored job fields they fill
+JOB_PAYLOAD_FIELDS = {
+    'title': 'title',
+    'location': 'location',
+    'jobType': 'job_type',
+    'experienceLevel': 'experience_level',
+    'salaryRange': 'salary_range',
+    'description': 'description',
+    'requirements': 'requirements',
+    'responsibilities': 'responsibilities',
+    'benefits': 'benefits',
+    'skills': 'skills',
+    'remote': 'remote',
+    'urgent': 'urgent',
+    'featured': 'featured',
+}
+JOB_PAYLOAD_DEFAULTS = {'benefits': '', 'remote': False, 'urgent': False, 'featured': False}
+# Stored job fields holding booleans; skills is a string or a list of strings
+# and every other field is text
+BOOLEAN_JOB_FIELDS = ('remote', 'urgent', 'featured')
+
+def build_job_data(data, employer):
+    """Prepare the stored job fields from a posting's camelCase payload"""
+    job_data = {
+        field: data.get(key, JOB_PAYLOAD_DEFAULTS.get(key))
+        for key, field in JOB_PAYLOAD_FIELDS.items()
+    }
+    job_data['employer_id'] = employer.id
+    job_data['company_name'] = employer.company_name
+    return job_data
+
+def missing_job_fields(job_data):
+    """Return the required fields a job posting left empty"""
+    return [field for field in REQUIRED_JOB_FIELDS if not job_data.get(field)]
+
+def parse_pagination(request):
+    """Read the page and per_page query parameters; raises ValueError if they aren't whole numbers"""
+    return int(request.GET.get('page', 1)), int(request.GET.get('per_page', 10))
+
+def invalid_pagination():
+    """Answer a listing request whose page or per_page isn't a number"""
+    return JsonResponse({
+        'success': False,
+        'message': 'page and per_page must be whole numbers'
+    }, status=400)
+
+def coerce_job_booleans(job_data):
+    """Read the boolean fields with parse_boolean, leaving None where a value isn't a boolean"""
+    for field in BOOLEAN_JOB_FIELDS:
+        if field in job_data:
+            job_data[field] = parse_boolean(job_data[field])
+
+def valid_job_value(field, value):
+    """Check the type of a stored job field's value; None stands for a text field left out"""
+    if field in BOOLEAN_JOB_FIELDS:
+        return isinstance(value, bool)
+    if value is None:
+        return True
+    if field == 'skills' and isinstance(value, list):
+        return all(isinstance(skill, str) for skill in value)
+    return isinstance(value, str)
+
+def invalid_job_fields(job_data):
+    """Return the job posting fields holding a value of the wrong type"""
+    return [
+        field for field in JOB_PAYLOAD_FIELDS.values()
+        if not valid_job_value(field, job_data.get(field))
+    ]
+
 @method_decorator(csrf_exempt, name='dispatch')
 class JobView(View):
     def get(self, request, job_id=None):
@@ -25,7 +111,8 @@ class JobView(View):
         user, role, error = get_user_from_token(request, require_auth=False)
         
         if job_id:
-            job = get_job_by_id(job_id)
+            # Closed jobs stay viewable from saved jobs and applications
+            job = get_job_by_id(job_id, include_archived=True)
             if not job:
                 return JsonResponse({
                     'success': False,
@@ -33,22 +120,34 @@ class JobView(View):
                 }, status=404)
             
             # If user is authenticated, include saved and applied status
-            if user:
-                job_status = get_job_status_for_user(job_id, user)
+            job_status = get_job_status_for_user(job_id, user) if user else None
+            
+            # Answer an unchanged job with a 304 before serializing it. The
+            # per-user status has no timestamp, so only anonymous responses
+            # carry Last-Modified.
+            etag = make_etag(job_id, job.get('updated_at'), job.get('archived', False), job_status)
+            last_modified = job.get('updated_at') if user is None else None
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            
+            if job_status:
                 job.update(job_status)
             
-            return JsonResponse({
+            return add_validators(JsonResponse({
                 'success': True,
                 'data': job
-            })
+            }), etag, last_modified)
         
         # Get pagination parameters
-        page = int(request.GET.get('page', 1))
-        per_page = int(request.GET.get('per_page', 10))
+        try:
+            page, per_page = parse_pagination(request)
+        except ValueError:
+            return invalid_pagination()
         
         # Get filter parameters
         filters = {}
-        for key in ['job_type', 'experience_level', 'remote', 'urgent', 'featured']:
+        for key in ['job_type', 'experience_level', 'remote', 'urgent', 'featured', 'salary_min', 'salary_max']:
             if key in request.GET:
                 filters[key] = request.GET.get(key)
         
@@ -57,18 +156,46 @@ class JobView(View):
         if search:
             filters['search'] = search
             
-        # Handle skills filter
+        # Handle skills filter (comma-separated, all skills required unless skills_match=any)
         skills = request.GET.get('skills')
         if skills:
             filters['skills'] = skills
+            filters['skills_match'] = request.GET.get('skills_match', 'all')
+        
+        # Handle sort parameter (relevance together with search, newest or salary_desc)
+        sort = request.GET.get('sort')
+        
+        # Handle facet counts (e.g. facets=job_type,experience_level)
+        facets = [field.strip() for field in request.GET.get('facets', '').split(',') if field.strip()]
+        
+        # Handle cursor pagination (after=<cursor>, or an empty value for the first page)
+        after = request.GET.get('after')
+        
+        # Answer an unchanged listing with a 304 before running the query
+        version = get_catalog_version()
+        if version is not None:
+            tag, last_modified = version
+            etag = make_etag(tag, sorted(request.GET.lists()))
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
         
         # Get the jobs
-        jobs_data = get_jobs(page, per_page, filters)
+        try:
+            jobs_data = get_jobs(page, per_page, filters, sort, facets, after)
+        except InvalidCursor as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
         
-        return JsonResponse({
+        response = JsonResponse({
             'success': True,
             'data': jobs_data
         })
+        if version is not None:
+            add_validators(response, etag, last_modified)
+        return response
     
     def post(self, request):
         """Create a new job posting"""
@@ -92,29 +219,18 @@ class JobView(View):
             data = json.loads(request.body)
             
             # Prepare the job data with employer information
-            job_data = {
-                'title': data.get('title'),
-                'location': data.get('location'),
-                'job_type': data.get('jobType'),
-                'experience_level': data.get('experienceLevel'),
-                'salary_range': data.get('salaryRange'),
-                'description': data.get('description'),
-                'requirements': data.get('requirements'),
-                'responsibilities': data.get('responsibilities'),
-                'benefits': data.get('benefits', ''),
-                'skills': data.get('skills'),
-                'remote': data.get('remote', False),
-                'urgent': data.get('urgent', False),
-                'featured': data.get('featured', False),
-                'employer_id': employer.id,
-                'company_name': employer.company_name,
-            }
-            
-            # Validate required fields
-            required_fields = ['title', 'location', 'job_type', 'experience_level', 
-                              'salary_range', 'description', 'requirements', 'responsibilities']
-            
-            missing_fields = [field for field in required_fields if not job_data.get(field)]
+            job_data = build_job_data(data, employer)
+            coerce_job_booleans(job_data)
+            
+            # Validate field types and required fields
+            invalid_fields = invalid_job_fields(job_data)
+            if invalid_fields:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Invalid values for fields: {", ".join(invalid_fields)}'
+                }, status=400)
+            
+            missing_fields = missing_job_fields(job_data)
             if missing_fields:
                 return JsonResponse({
                     'success': False,
@@ -183,29 +299,18 @@ class JobView(View):
             data = json.loads(request.body)
             
             # Prepare the job data with employer information
-            job_data = {
-                'title': data.get('title'),
-                'location': data.get('location'),
-                'job_type': data.get('jobType'),
-                'experience_level': data.get('experienceLevel'),
-                'salary_range': data.get('salaryRange'),
-                'description': data.get('description'),
-                'requirements': data.get('requirements'),
-                'responsibilities': data.get('responsibilities'),
-                'benefits': data.get('benefits', ''),
-                'skills': data.get('skills'),
-                'remote': data.get('remote', False),
-                'urgent': data.get('urgent', False),
-                'featured': data.get('featured', False),
-                'employer_id': employer.id,
-                'company_name': employer.company_name,
-            }
-            
-            # Validate required fields
-            required_fields = ['title', 'location', 'job_type', 'experience_level', 
-                              'salary_range', 'description', 'requirements', 'responsibilities']
-            
-            missing_fields = [field for field in required_fields if not job_data.get(field)]
+            job_data = build_job_data(data, employer)
+            coerce_job_booleans(job_data)
+            
+            # Validate field types and required fields
+            invalid_fields = invalid_job_fields(job_data)
+            if invalid_fields:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Invalid values for fields: {", ".join(invalid_fields)}'
+                }, status=400)
+            
+            missing_fields = missing_job_fields(job_data)
             if missing_fields:
                 return JsonResponse({
                     'success': False,
@@ -291,6 +396,127 @@ class JobView(View):
             }, status=500)
 
 
+class JobChangesView(View):
+    def get(self, request):
+        """
+        Get the jobs created, updated or deleted since a generation or time
+
+        Clients keep a local copy of the board current by passing the
+        "generation" of the previous response as `since`, and again while
+        "has_more" is set. Deleted and archived jobs come back as tombstones
+        ({"id", "deleted": true}). With "reset" set the change log doesn't go
+        back far enough, and the client has to reload /api/jobs/ before
+        continuing from the returned generation.
+        """
+        max_limit = getattr(settings, 'JOB_CHANGES_PAGE_SIZE', 500)
+        
+        try:
+            # Get the starting point and page size
+            since = request.GET.get('since', '').strip()
+            limit = int(request.GET.get('limit', max_limit))
+            if limit < 1:
+                raise ValueError
+            
+            changes = get_changes(since, min(limit, max_limit))
+            
+            return JsonResponse({
+                'success': True,
+                'data': changes
+            })
+            
+        except InvalidSince as e:
+            return JsonResponse({
+                'success': False,
+                'message': f'{e}. Pass a generation or an ISO timestamp'
+            }, status=400)
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'message': 'limit must be a positive number'
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+
+class JobFeedView(View):
+    def get(self, request):
+        """
+        Stream every active job as one feed for job aggregators
+
+        format=ndjson (default), json (JSON Feed 1.1) or xml (Indeed-style).
+        The first request after a change renders the feed while streaming it
+        and saves it to disk; the rest get the saved file until the next change.
+        """
+        fmt = request.GET.get('format', 'ndjson')
+        if fmt not in FEED_FORMATS:
+            return JsonResponse({
+                'success': False,
+                'message': f'Unknown feed format: {fmt}. Use one of {", ".join(FEED_FORMATS)}'
+            }, status=400)
+        content_type = FEED_FORMATS[fmt][0]
+        
+        try:
+            version = get_catalog_version()
+            if version is None:
+                # No stable catalog version to cache the feed under
+                return StreamingHttpResponse(stream_feed(fmt, iter_jobs()), content_type=content_type)
+            
+            # Answer an unchanged feed with a 304 before reading it
+            tag, last_modified = version
+            etag = make_etag('feed', fmt, tag)
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+            
+            path = feed_path(fmt, tag)
+            try:
+                response = FileResponse(open(path, 'rb'), content_type=content_type)
+            except FileNotFoundError:
+                last_updated = last_modified.isoformat() if hasattr(last_modified, 'isoformat') else last_modified
+                response = StreamingHttpResponse(
+                    stream_feed(fmt, iter_jobs(), last_updated, path),
+                    content_type=content_type
+                )
+            
+            return add_validators(response, etag, last_modified)
+            
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+
+class JobQueryCacheView(View):
+    def get(self, request):
+        """Report this worker's job listing cache counters, for tuning JOB_QUERY_CACHE_SIZE"""
+        # Staff accounts usually have neither an employer nor a jobseeker
+        # profile, so don't require a role
+        user, role, error = get_user_from_token(request, require_auth=False)
+        if error:
+            return error
+        if user is None:
+            return JsonResponse({
+                'success': False,
+                'message': 'No valid authorization token provided'
+            }, status=401)
+        
+        # Only staff can inspect the cache
+        if not user.is_staff and not user.is_superuser:
+            return JsonResponse({
+                'success': False,
+                'message': 'Only staff can access this endpoint'
+            }, status=403)
+        
+        return JsonResponse({
+            'success': True,
+            'data': get_query_cache().stats()
+        })
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class EmployerJobsView(View):
     def get(self, request):
@@ -312,24 +538,285 @@ class EmployerJobsView(View):
             employer = Employer.objects.get(user=user)
             
             # Get pagination parameters
-            page = int(request.GET.get('page', 1))
-            per_page = int(request.GET.get('per_page', 10))
+            try:
+                page, per_page = parse_pagination(request)
+            except ValueError:
+                return invalid_pagination()
+            after = request.GET.get('after')
+            
+            # Answer an unchanged listing with a 304 before running the query
+            version = get_catalog_version()
+            if version is not None:
+                tag, last_modified = version
+                etag = make_etag(tag, employer.id, sorted(request.GET.lists()))
+                response = not_modified(request, etag, last_modified)
+                if response is not None:
+                    return response
             
             # Get the jobs for this employer
-            jobs_data = get_jobs_by_employer(employer.id, page, per_page)
+            jobs_data = get_jobs_by_employer(employer.id, page, per_page, after)
             
-            return JsonResponse({
+            response = JsonResponse({
                 'success': True,
                 'data': jobs_data
             })
+            if version is not None:
+                add_validators(response, etag, last_modified)
+            return response
             
         except Employer.DoesNotExist:
             return JsonResponse({
                 'success': False,
                 'message': 'Employer profile not found'
             }, status=404)
+        except InvalidCursor as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class EmployerBulkJobsView(View):
+    def post(self, request):
+        """
+        Post many jobs at once from a CSV or NDJSON file
+
+        The file is sent as the request body (Content-Type text/csv or
+        application/x-ndjson) or as the "file" field of a multipart form.
+        Rows use the fields of a single job posting, are validated with the
+        same rules, and the valid ones are created in one storage write.
+        The response reports the outcome of every row.
+        """
+        # Get the user from the token
+        user, role, error = get_user_from_token(request)
+        if error:
+            return error
+        
+        # Only employers can create job postings
+        if role != 'employer':
+            return JsonResponse({
+                'success': False,
+                'message': 'Only employers can create job postings'
+            }, status=403)
+        
+        try:
+            # Get the employer record
+            employer = Employer.objects.get(user=user)
+            
+            # Find the uploaded file and its format
+            if request.content_type == 'multipart/form-data':
+                upload = request.FILES.get('file')
+                if upload is None:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'No file uploaded'
+                    }, status=400)
+                stream = upload
+                fmt = detect_format(upload.content_type, upload.name)
+            else:
+                stream = request
+                fmt = detect_format(request.content_type)
+            
+            fmt = request.GET.get('format', fmt)
+            if fmt not in ('csv', 'ndjson'):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Upload a CSV or NDJSON file'
+                }, status=415)
+            
+            max_rows = getattr(settings, 'JOB_BULK_IMPORT_MAX_ROWS', 10000)
+            
+            # Validate the rows as they are parsed
+            results = []
+            jobs_data = []
+            created_rows = []
+            for row_number, payload, row_error in iter_rows(stream, fmt):
+                if row_number > max_rows:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'A bulk upload can hold at most {max_rows} jobs'
+                    }, status=413)
+                
+                if row_error is None:
+                    job_data = build_job_data(payload, employer)
+                    coerce_job_booleans(job_data)
+                    invalid_fields = invalid_job_fields(job_data)
+                    missing_fields = missing_job_fields(job_data)
+                    if invalid_fields:
+                        row_error = f'Invalid values for fields: {", ".join(invalid_fields)}'
+                    elif missing_fields:
+                        row_error = f'Missing required fields: {", ".join(missing_fields)}'
+                
+                if row_error is not None:
+                    results.append({'row': row_number, 'success': False, 'message': row_error})
+                else:
+                    result = {'row': row_number, 'success': True}
+                    results.append(result)
+                    jobs_data.append(job_data)
+                    created_rows.append(result)
+            
+            # Create every valid job in one transaction
+            created_jobs = create_jobs(jobs_data) if jobs_data else []
+            for result, job in zip(created_rows, created_jobs):
+                result['id'] = job['id']
+                result['title'] = job['title']
+            
+            return JsonResponse({
+                'success': bool(created_jobs),
+                'message': f'Posted {len(created_jobs)} of {len(results)} jobs',
+                'data': {
+                    'created': len(created_jobs),
+                    'failed': len(results) - len(created_jobs),
+                    'results': results
+                }
+            }, status=201 if created_jobs else 400)
+            
+        except Employer.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Employer profile not found'
+            }, status=404)
+        except BulkImportError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+    def patch(self, request):
+        """
+        Apply the same partial change to many of the employer's jobs
+
+        The JSON body holds the job "ids" and the "changes" to apply, using
+        the keys of a job posting (e.g. {"urgent": false, "featured": true}).
+        Boolean fields also accept the text a CSV upload would hold ("false",
+        "yes", ...). Every job is updated in one storage write.
+        """
+        return self.bulk_change(request, 'update')
+
+    def delete(self, request):
+        """Delete many of the employer's jobs, listed as "ids" in the JSON body, in one storage write"""
+        return self.bulk_change(request, 'delete')
+
+    def bulk_change(self, request, action):
+        """Update, delete or close the employer's jobs listed in the JSON body"""
+        # Get the user from the token
+        user, role, error = get_user_from_token(request)
+        if error:
+            return error
+        
+        # Only employers can change job postings
+        if role != 'employer':
+            return JsonResponse({
+                'success': False,
+                'message': f'Only employers can {action} job postings'
+            }, status=403)
+        
+        try:
+            # Get the employer record
+            employer = Employer.objects.get(user=user)
+            
+            # Parse the request data
+            data = json.loads(request.body)
+            job_ids = data.get('ids') if isinstance(data, dict) else None
+            if not job_ids or not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'ids must be a non-empty list of job IDs'
+                }, status=400)
+            
+            if action == 'update':
+                patch = data.get('changes')
+                if not patch or not isinstance(patch, dict):
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'changes must be a non-empty object'
+                    }, status=400)
+                
+                unknown_fields = [key for key in patch if key not in JOB_PAYLOAD_FIELDS]
+                if unknown_fields:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'Unknown fields: {", ".join(unknown_fields)}'
+                    }, status=400)
+                
+                changes = {JOB_PAYLOAD_FIELDS[key]: value for key, value in patch.items()}
+                
+                # Booleans may come as text, like CSV cells; nothing may be set to null
+                coerce_job_booleans(changes)
+                invalid_fields = [
+                    field for field, value in changes.items()
+                    if value is None or not valid_job_value(field, value)
+                ]
+                if invalid_fields:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'Invalid values for fields: {", ".join(invalid_fields)}'
+                    }, status=400)
+                
+                # Required fields can be changed but not emptied
+                emptied_fields = [field for field in REQUIRED_JOB_FIELDS if field in changes and not changes[field]]
+                if emptied_fields:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'Missing required fields: {", ".join(emptied_fields)}'
+                    }, status=400)
+                
+                # Ownership is checked by the storage against the employer's jobs
+                changed_jobs = update_jobs(employer.id, job_ids, changes)
+            elif action == 'close':
+                # Closed jobs leave the live catalog for the archive
+                changed_jobs = archive_jobs(job_ids, employer.id)
+            else:
+                changed_jobs = delete_jobs(employer.id, job_ids)
+            
+            results = []
+            for job_id in dict.fromkeys(job_ids):
+                if job_id in changed_jobs:
+                    results.append({'id': job_id, 'success': True})
+                else:
+                    results.append({'id': job_id, 'success': False, 'message': f'Job with ID {job_id} not found among your postings'})
+            
+            return JsonResponse({
+                'success': bool(changed_jobs),
+                'message': f'{action.capitalize()}d {len(changed_jobs)} of {len(results)} jobs',
+                'data': {
+                    f'{action}d': len(changed_jobs),
+                    'failed': len(results) - len(changed_jobs),
+                    'results': results
+                }
+            }, status=200 if changed_jobs else 404)
+            
+        except Employer.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Employer profile not found'
+            }, status=404)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON data'
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
                 'message': str(e)
-            }, status=500)
\ No newline at end of file
+            }, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class EmployerCloseJobsView(EmployerBulkJobsView):
+    http_method_names = ['post']
+
+    def post(self, request):
+        """Close many of the employer's jobs, listed as "ids" in the JSON body, moving them to the archive"""
+        return self.bulk_change(request, 'close')
@@ -6,7 +6,7 @@ from django.utils.decorators import method_decorator
 
 from api.models import SavedJob, Jobseeker
 from api.utils.jwt_middleware import get_user_from_token
-from api.utils.job_storage import get_job_by_id
+from api.utils.job_storage import get_job_by_id, get_jobs_by_ids
 
 @method_decorator(csrf_exempt, name='dispatch')
 class SavedJobView(View):
@@ -29,12 +29,15 @@ class SavedJobView(View):
             jobseeker = Jobseeker.objects.get(user=user)
             
             # Get saved jobs
-            saved_jobs = SavedJob.objects.filter(jobseeker=jobseeker).order_by('-saved_at')
+            saved_jobs = list(SavedJob.objects.filter(jobseeker=jobseeker).order_by('-saved_at'))
+            
+            # Fetch the details of every saved job in a single lookup
+            job_details = get_jobs_by_ids([saved_job.job_id for saved_job in saved_jobs], include_archived=True)
             
             # Format the response
             jobs_data = []
             for saved_job in saved_jobs:
-                job_detail = get_job_by_id(saved_job.job_id)
+                job_detail = job_details.get(saved_job.job_id)
                 if job_detail:
                     jobs_data.append({
                         'id': saved_job.job_id,
@@ -161,3 +161,66 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Job storage
+# 'json' serves jobs from data/jobs.json, 'database' serves them from the
+# api.Job table (fill it with `manage.py import_jobs`). 'shared' stores jobs
+# like 'json' but serves reads from data/jobs.index, a memory-mapped index
+# shared by all worker processes, so memory doesn't grow with the worker count.
+# Every backend answers ?search= the same way: each term has to start a word
+# of the title, description, company name or location ("java" finds
+# "JavaScript", "script" doesn't).
+JOB_STORAGE_BACKEND = 'json'
+
+# How the 'json' backend writes. 'json' rewrites data/jobs.json on every
+# change. 'journal' appends changes to data/jobs.journal and folds them into
+# jobs.json once the journal grows past JOB_JOURNAL_COMPACT_BYTES. 'snapshot'
+# keeps the catalog in the binary data/jobs.snap, which loads faster on worker
+# start (see `manage.py job_snapshot`).
+JOB_STORAGE_ENGINE = 'json'
+JOB_JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+# Job writes made by concurrent requests in one process are group committed:
+# they are applied together and persisted with a single write and fsync, up to
+# JOB_GROUP_COMMIT_MAX per write. Writes arriving while one is in progress
+# always join the next batch; a window (in seconds) above 0 also holds the
+# first write of a batch back that long to gather more.
+JOB_GROUP_COMMIT_WINDOW = 0.0
+JOB_GROUP_COMMIT_MAX = 100
+
+# Closed jobs, and jobs older than JOB_ARCHIVE_AFTER_DAYS when
+# `manage.py archive_jobs` runs, move out of the live catalog into monthly
+# files in JOB_ARCHIVE_DIR. Saved jobs and applications still show them.
+JOB_ARCHIVE_DIR = BASE_DIR / 'data' / 'archive'
+JOB_ARCHIVE_AFTER_DAYS = 90
+
+# Number of /api/jobs/ listing results each worker keeps in its query
+# cache. The cache is dropped on every job write; 0 disables it.
+JOB_QUERY_CACHE_SIZE = 256
+
+# Most jobs one CSV/NDJSON upload to /api/employer/jobs/bulk/ may hold
+JOB_BULK_IMPORT_MAX_ROWS = 10000
+
+# Change log behind /api/jobs/changes/ (data/jobs.changes). Once it grows
+# past JOB_CHANGE_LOG_MAX_BYTES its older half is dropped, and clients that
+# fell further behind are told to reload the whole catalog.
+JOB_CHANGE_LOG_MAX_BYTES = 8 * 1024 * 1024
+JOB_CHANGES_PAGE_SIZE = 500
+
+# Syndication feeds served by /api/jobs/feed/ are saved here, one file per
+# format for the current catalog version. Job links point at JOB_FEED_SITE_URL.
+JOB_FEED_DIR = BASE_DIR / 'data' / 'feeds'
+JOB_FEED_SITE_URL = 'http://localhost:3000'
+
+# Static copies of the first JOB_STATIC_PAGES pages of /api/jobs/, for the
+# default listing and the JOB_STATIC_PAGE_TOP_VALUES most common values of
+# each JOB_STATIC_PAGE_FACETS field. They are re-rendered in the background
+# JOB_STATIC_PAGES_DELAY seconds after job writes, so a reverse proxy can
+# serve anonymous listings on its own. 0 pages turns this off.
+JOB_STATIC_PAGES = 5
+JOB_STATIC_PAGE_SIZE = 10
+JOB_STATIC_PAGE_FACETS = ['job_type', 'experience_level', 'remote']
+JOB_STATIC_PAGE_TOP_VALUES = 3
+JOB_STATIC_PAGES_DIR = Path(MEDIA_ROOT) / 'job-pages'
+JOB_STATIC_PAGES_GZIP = True
+JOB_STATIC_PAGES_DELAY = 0.5